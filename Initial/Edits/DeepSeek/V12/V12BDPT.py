@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Bidirektionales Path Tracing (BDPT) für V12CodeEdited.py
+
+trace_ray findet Licht nur, wenn ein Streupfad zufällig die 1x1 große
+Deckenlampe trifft; bei kleinen Lampen bleibt das Bild lange verrauscht.
+BDPT erzeugt pro Sample einen Kamerapfad (genau wie trace_ray) und einen
+Lichtpfad, der auf der Lampe beginnt, und verbindet jeden Kameravertex
+mit jedem Lichtvertex über einen Schattenstrahl. Dieselbe Pfadlänge k
+entsteht so auf bis zu k Wegen (s Lichtvertices, t = k - s Kameravertices,
+t >= 1); die Power-Heuristik gewichtet sie, sodass die Summe erwartungstreu
+bleibt:
+
+    L = Σ_(s,t) w_st * f(x) / p_st(x),   w_st = p_st² / Σ_s' p_s't'²
+
+Damit das Ergebnis gegen dasselbe Bild konvergiert wie trace_ray, wird
+dessen Streumodell übernommen. trace_ray streut in Richtung
+normalize(n + v) mit v gleichverteilt in der Hemisphäre; das ergibt einen
+Kegel von 45 Grad um die gespeicherte Normale mit der Dichte 2cos(θ)/π.
+Mit dem Gewicht color/π ist der Kern pro Raumwinkel also
+color * 2cos(θ)/π². Er hängt nur von der Richtung zur Lichtseite ab;
+Lichtpfade streuen daher gleichverteilt über die ganze Kugel und brechen
+ab, wenn ihre Herkunft außerhalb des Kegels liegt. Lampen sind zweiseitige
+Rect-Emitter und werden nach Fläche gezogen.
+
+Aufruf:
+    python V12BDPT.py [Breite] [Samples BDPT] [Samples Standard]
+"""
+
+import math
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from V12CodeEdited import Vec3, Ray, Scene, Rect, random_in_hemisphere, to_pixel, write_png
+from V12View import ViewCamera, render_reference, rmse
+
+INV_2PI = 1.0 / (2.0 * math.pi)
+INV_4PI = 1.0 / (4.0 * math.pi)
+COS_CONE = math.sqrt(0.5)  # normalize(n + v) liegt höchstens 45 Grad neben n
+
+# ============================================================================
+# Pfadvertices und Streukern
+# ============================================================================
+
+class PathVertex:
+    """Trefferpunkt eines Kamera- oder Lichtpfads"""
+    __slots__ = ("point", "normal", "color", "emission")
+
+    def __init__(self, point: Vec3, normal: Vec3, material):
+        self.point = point
+        self.normal = normal
+        self.color = material.color
+        self.emission = material.emission
+
+    def is_emitter(self) -> bool:
+        return self.emission.x > 0 or self.emission.y > 0 or self.emission.z > 0
+
+
+def scatter_pdf(vertex: PathVertex, direction: Vec3) -> float:
+    """Dichte pro Raumwinkel der Streurichtung von trace_ray"""
+    cos_theta = direction.dot(vertex.normal)
+    return 2.0 * cos_theta / math.pi if cos_theta > COS_CONE else 0.0
+
+
+def kernel(vertex: PathVertex, direction: Vec3) -> Optional[Vec3]:
+    """Streukern von trace_ray in Richtung Lichtseite, None außerhalb des Kegels"""
+    pdf = scatter_pdf(vertex, direction)
+    if pdf == 0.0:
+        return None
+    return vertex.color * (pdf / math.pi)
+
+
+def random_on_sphere() -> Vec3:
+    z = 1.0 - 2.0 * random.random()
+    r = math.sqrt(max(0.0, 1.0 - z * z))
+    phi = 2.0 * math.pi * random.random()
+    return Vec3(r * math.cos(phi), r * math.sin(phi), z)
+
+
+def random_cosine_two_sided(normal: Vec3) -> Vec3:
+    """Kosinusverteilt auf einer zufälligen Seite, Dichte |cos|/(2π)"""
+    r = math.sqrt(random.random())
+    phi = 2.0 * math.pi * random.random()
+    n = normal if random.random() < 0.5 else normal * -1.0
+    helper = Vec3(1, 0, 0) if abs(n.x) < 0.9 else Vec3(0, 1, 0)
+    u = helper.cross(n).normalize()
+    v = n.cross(u)
+    return (u * (r * math.cos(phi)) + v * (r * math.sin(phi)) + n * math.sqrt(max(0.0, 1.0 - r * r))).normalize()
+
+# ============================================================================
+# Lampen
+# ============================================================================
+
+def rect_area(rect: Rect) -> float:
+    return (rect.x1 - rect.x0) * (rect.y1 - rect.y0)
+
+
+def rect_point(rect: Rect, a: float, b: float) -> Tuple[Vec3, Vec3]:
+    """Punkt und Normale wie in Rect.hit für a, b in [0, 1)"""
+    s = rect.x0 + a * (rect.x1 - rect.x0)
+    t = rect.y0 + b * (rect.y1 - rect.y0)
+    sign = -1 if rect.flip_normal else 1
+    if rect.axis == 'x':
+        return Vec3(rect.z, t, s), Vec3(sign, 0, 0)
+    if rect.axis == 'y':
+        return Vec3(s, rect.z, t), Vec3(0, sign, 0)
+    return Vec3(s, t, rect.z), Vec3(0, 0, sign)
+
+
+class EmitterSampler:
+    """Zieht Punkte gleichverteilt über die Fläche aller leuchtenden Rects"""
+
+    def __init__(self, scene: Scene):
+        self.emitters = []
+        for obj in scene.objects:
+            e = obj.material.emission
+            if e.x > 0 or e.y > 0 or e.z > 0:
+                if not isinstance(obj, Rect):
+                    raise ValueError(f"Nur Rect-Lampen werden unterstützt, nicht {type(obj).__name__}")
+                self.emitters.append(obj)
+        if not self.emitters:
+            raise ValueError("Szene enthält keine Lampe")
+        self.areas = [rect_area(r) for r in self.emitters]
+        self.total_area = sum(self.areas)
+        self.pdf = 1.0 / self.total_area
+
+    def sample(self) -> PathVertex:
+        u = random.random() * self.total_area
+        for rect, area in zip(self.emitters, self.areas):
+            if u < area:
+                break
+            u -= area
+        point, normal = rect_point(rect, random.random(), random.random())
+        return PathVertex(point, normal, rect.material)
+
+# ============================================================================
+# Teilpfade
+# ============================================================================
+
+def camera_subpath(scene: Scene, ray: Ray, max_vertices: int) -> List[PathVertex]:
+    """Vertices wie in trace_ray: Richtung normalize(n + v), t_min 0.001"""
+    vertices = []
+    while len(vertices) < max_vertices:
+        hit = scene.hit(ray, 0.001, float('inf'))
+        if hit is None:
+            break
+        vertices.append(PathVertex(hit.point, hit.normal, hit.material))
+        target = hit.point + hit.normal + random_in_hemisphere(hit.normal)
+        ray = Ray(hit.point, (target - hit.point).normalize())
+    return vertices
+
+
+def light_subpath(scene: Scene, sampler: EmitterSampler, max_vertices: int) -> List[PathVertex]:
+    """Beginnt auf einer Lampe; Vertices mit Kern 0 zur Herkunft beenden den Pfad"""
+    vertices = [sampler.sample()]
+    direction = random_cosine_two_sided(vertices[0].normal)
+    while len(vertices) < max_vertices:
+        origin = vertices[-1].point
+        hit = scene.hit(Ray(origin, direction), 0.001, float('inf'))
+        if hit is None:
+            break
+        vertex = PathVertex(hit.point, hit.normal, hit.material)
+        if kernel(vertex, (origin - hit.point).normalize()) is None:
+            break  # Kein Pfad über diesen Vertex trägt bei
+        vertices.append(vertex)
+        direction = random_on_sphere()
+    return vertices
+
+# ============================================================================
+# Pfadbeitrag und MIS-Gewichte
+# ============================================================================
+
+def path_contribution(path: List[PathVertex]) -> Vec3:
+    """f(x) ohne den Kameraanteil bis x1; path[-1] ist die Lampe"""
+    f = path[-1].emission
+    for a, b in zip(path, path[1:]):
+        d = b.point - a.point
+        dist2 = d.dot(d)
+        direction = d / math.sqrt(dist2)
+        k = kernel(a, direction)
+        if k is None:
+            return Vec3(0, 0, 0)
+        f = f * k * (abs(direction.dot(b.normal)) / dist2)
+    return f
+
+
+def strategy_pdfs(path: List[PathVertex], light_pdf: float) -> List[float]:
+    """Flächendichte des Pfads für t = 1..k Kameravertices (x1 kürzt sich heraus)"""
+    k = len(path)
+    forward = [0.0] * k   # forward[i]: x_i von x_(i-1) aus gezogen (Kamerapfad)
+    backward = [0.0] * k  # backward[i]: x_i von x_(i+1) aus gezogen (Lichtpfad)
+    backward[k - 1] = light_pdf
+    for i in range(k - 1):
+        a, b = path[i], path[i + 1]
+        d = b.point - a.point
+        dist2 = d.dot(d)
+        direction = d / math.sqrt(dist2)
+        cos_a = abs(direction.dot(a.normal))
+        cos_b = abs(direction.dot(b.normal))
+        forward[i + 1] = scatter_pdf(a, direction) * cos_b / dist2
+        if i + 1 == k - 1:
+            backward[i] = cos_b * INV_2PI * cos_a / dist2  # Abstrahlung der Lampe
+        else:
+            backward[i] = INV_4PI * cos_a / dist2
+
+    pdfs = []
+    for t in range(1, k + 1):
+        p = 1.0
+        for i in range(1, t):
+            p *= forward[i]
+        for i in range(t, k):
+            p *= backward[i]
+        pdfs.append(p)
+    return pdfs
+
+
+def connect(scene: Scene, a: PathVertex, b: PathVertex) -> bool:
+    """Sichtbarkeit zwischen zwei Vertices"""
+    d = b.point - a.point
+    dist = d.length()
+    return scene.hit(Ray(a.point, d / dist), 0.001, dist - 0.001) is None
+
+
+def trace_bdpt(scene: Scene, sampler: EmitterSampler, ray: Ray, max_depth: int = 10) -> Vec3:
+    """Ein Sample: alle Verbindungen aus Kamera- und Lichtpfad, MIS-gewichtet"""
+    camera_path = camera_subpath(scene, ray, max_depth)
+    if not camera_path:
+        return scene.background
+    light_path = light_subpath(scene, sampler, max_depth - 1)
+
+    total = Vec3(0, 0, 0)
+    for t in range(1, len(camera_path) + 1):
+        for s in range(0, min(len(light_path), max_depth - t) + 1):
+            if s == 0:
+                if not camera_path[t - 1].is_emitter():
+                    continue
+                path = camera_path[:t]
+            else:
+                path = camera_path[:t] + light_path[s - 1::-1]
+                if kernel(path[t - 1], (path[t].point - path[t - 1].point).normalize()) is None:
+                    continue
+                if not connect(scene, path[t - 1], path[t]):
+                    continue
+            pdfs = strategy_pdfs(path, sampler.pdf)
+            denominator = sum(p * p for p in pdfs)
+            if pdfs[t - 1] == 0 or denominator == 0:
+                continue
+            total = total + path_contribution(path) * (pdfs[t - 1] / denominator)
+    return total
+
+# ============================================================================
+# Rendern
+# ============================================================================
+
+def render_bdpt(scene: Scene, camera: ViewCamera, width: int, height: int, samples: int,
+                max_depth: int = 10, seed: int = 1) -> List[Vec3]:
+    """HDR-Bild (Zeile für Zeile) wie render_reference, aber mit BDPT"""
+    random.seed(seed)
+    sampler = EmitterSampler(scene)
+    image = []
+    for y in range(height):
+        for x in range(width):
+            color_sum = Vec3(0, 0, 0)
+            for _ in range(samples):
+                ray = camera.ray((x + random.random()) / width, (y + random.random()) / height)
+                color_sum = color_sum + trace_bdpt(scene, sampler, ray, max_depth)
+            image.append(color_sum / samples)
+    return image
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    bdpt_samples = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    standard_samples = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    scene = Scene()
+    camera = ViewCamera(Vec3(0, 1.8, 5), Vec3(0, 1.5, 0))
+
+    print(f"Referenz mit {64 * standard_samples} Samples...")
+    reference = render_reference(scene, camera, width, width, 64 * standard_samples, seed=1)
+
+    start = time.perf_counter()
+    standard = render_reference(scene, camera, width, width, standard_samples, seed=2)
+    seconds = time.perf_counter() - start
+    print(f"Standard ({standard_samples:3d} Samples): {seconds:6.1f} s, RMSE {rmse(standard, reference):.4f}")
+
+    start = time.perf_counter()
+    bdpt = render_bdpt(scene, camera, width, width, bdpt_samples, seed=2)
+    seconds = time.perf_counter() - start
+    print(f"    BDPT ({bdpt_samples:3d} Samples): {seconds:6.1f} s, RMSE {rmse(bdpt, reference):.4f}")
+
+    write_png("cornellbox_bdpt.png", width, width, [to_pixel(c) for c in bdpt])
+    print("Bild gespeichert als 'cornellbox_bdpt.png'")
+
+
+if __name__ == "__main__":
+    main()
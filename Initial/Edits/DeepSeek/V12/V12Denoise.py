@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Kantenerhaltender À-trous-Entrauscher für V12CodeEdited.py
+
+Rendert die Cornell-Box mit wenigen Samples pro Pixel und sammelt dabei im
+selben Durchlauf die Führungspuffer des ersten Treffers (Albedo, Normale,
+Tiefe). Anschließend filtert ein À-trous-Wavelet-Filter (Dammertz et al.,
+"Edge-Avoiding À-Trous Wavelet Transform") das verrauschte HDR-Bild: ein
+5x5-B3-Spline-Kern mit wachsendem Lochabstand 1, 2, 4, ..., dessen Gewichte
+an Helligkeits-, Normalen-, Tiefen- und Albedo-Kanten abfallen. Die
+Beleuchtung wird vor dem Filtern durch die Albedo geteilt und danach wieder
+multipliziert, damit Materialkanten scharf bleiben. Das Filter selbst liegt
+in Initial/Shared/Atrous.py und wird mit V8Denoise.py geteilt.
+
+Das Rohbild und das entrauschte Bild werden nebeneinander gespeichert.
+"""
+
+import math
+import os
+import random
+import sys
+import time
+from typing import Tuple
+
+import numpy as np
+
+from V12CodeEdited import Vec3, Ray, Scene, random_in_hemisphere, trace_ray, write_png
+
+# Filter aus Initial/Shared, gemeinsam mit V8Denoise.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "Shared"))
+from Atrous import atrous_denoise
+
+# ============================================================================
+# Rendern mit Führungspuffern
+# ============================================================================
+
+def trace_first(ray: Ray, scene: Scene, depth: int):
+    """Wie trace_ray, liefert zusätzlich den ersten Treffer (oder None)"""
+    if depth <= 0:
+        return Vec3(0, 0, 0), None
+    hit = scene.hit(ray, 0.001, float('inf'))
+    if hit is None:
+        return scene.background, None
+    target = hit.point + hit.normal + random_in_hemisphere(hit.normal)
+    new_ray = Ray(hit.point, (target - hit.point).normalize())
+    incoming = trace_ray(new_ray, scene, depth - 1)
+    attenuation = hit.material.color * (1.0 / math.pi)
+    return hit.material.emission + (attenuation * incoming), hit
+
+
+def render_with_guides(scene: Scene, width: int, height: int, samples_per_pixel: int,
+                       max_depth: int = 10) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Rendert wie V12CodeEdited.main und gibt (color, albedo, normal, depth) zurück
+
+    Die Führungspuffer sind über alle Samples des Pixels gemittelt und damit
+    an Kanten ebenso geglättet wie das Bild.
+    """
+    camera_pos = Vec3(0, 1.8, 5)
+    look_at = Vec3(0, 1.5, 0)
+    up = Vec3(0, 1, 0)
+    w = (camera_pos - look_at).normalize()
+    u = up.cross(w).normalize()
+    v = w.cross(u)
+
+    color = np.zeros((height, width, 3))
+    albedo = np.zeros((height, width, 3))
+    normal = np.zeros((height, width, 3))
+    depth = np.zeros((height, width))
+    for y in range(height):
+        for x in range(width):
+            for _ in range(samples_per_pixel):
+                u_offset = (x + random.random()) / width
+                v_offset = (y + random.random()) / height
+                ray_direction = w * (-1.5) + u * (2 * u_offset - 1) + v * (2 * v_offset - 1)
+                ray = Ray(camera_pos, ray_direction.normalize())
+                c, hit = trace_first(ray, scene, max_depth)
+                color[y, x] += (c.x, c.y, c.z)
+                if hit is not None:
+                    albedo[y, x] += (hit.material.color.x, hit.material.color.y, hit.material.color.z)
+                    normal[y, x] += (hit.normal.x, hit.normal.y, hit.normal.z)
+                    depth[y, x] += hit.t
+        print(f"Zeile {y + 1}/{height}", end='\r')
+    print()
+
+    color /= samples_per_pixel
+    albedo /= samples_per_pixel
+    depth /= samples_per_pixel
+    length = np.linalg.norm(normal, axis=2, keepdims=True)
+    normal = np.where(length > 0, normal / np.maximum(length, 1e-12), 0.0)
+    return color, albedo, normal, depth
+
+
+def to_pixels(image: np.ndarray) -> list:
+    """HDR-Bild -> Pixelliste für write_png (Tonemapping wie to_pixel)"""
+    mapped = image / (image + 1.0)
+    data = np.clip(mapped * 255, 0, 255).astype(np.uint8).reshape(-1, 3)
+    return [tuple(int(c) for c in p) for p in data]
+
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    """Rendert mit wenigen Samples und speichert Roh- und entrauschtes Bild"""
+    width = height = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    samples_per_pixel = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    print(f"Rendere Cornell-Box mit {width}x{height} Pixeln, {samples_per_pixel} Samples...")
+    scene = Scene()
+    start = time.perf_counter()
+    color, albedo, normal, depth = render_with_guides(scene, width, height, samples_per_pixel)
+    print(f"Renderzeit: {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    denoised = atrous_denoise(color, albedo, normal, depth, iterations)
+    print(f"Entrauschen ({iterations} Iterationen): {time.perf_counter() - start:.2f} s")
+
+    raw_name = f"cornellbox_{samples_per_pixel}spp.png"
+    write_png(raw_name, width, height, to_pixels(color))
+    write_png(raw_name.replace(".png", "_denoised.png"), width, height, to_pixels(denoised))
+    print(f"Gespeichert: {raw_name} und {raw_name.replace('.png', '_denoised.png')}")
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    main()
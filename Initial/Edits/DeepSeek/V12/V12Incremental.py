@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Inkrementelles Neu-Rendern nach Szenenänderungen für V12CodeEdited.py
+
+Beim ersten Rendern merkt sich jeder Pixel zwei Bitmengen (Python-ints):
+
+- prims: welche Objekte (Index in scene.objects) seine Pfade getroffen haben
+- voxels: welche Zellen eines groben Gitters über der Szene seine
+  Pfadsegmente durchquert haben (konservativ, stückweise Hüllquader)
+
+Nach einer Änderung wird die Szene mit describe_scene aus V12RenderCache.py
+verglichen. Neu gerendert werden nur Pixel, die ein geändertes Objekt
+getroffen haben (alte Lage, Material) oder deren Segmente durch die neue Lage
+laufen (Verdeckung, neue Treffer). Alle anderen Pfade verlaufen exakt wie
+vorher. Die Zufallszahlen werden pro Pixel aus Seed und Koordinaten gesetzt,
+das Ergebnis ist daher bitgleich zu einem vollständigen Neu-Rendern der
+geänderten Szene.
+
+Hintergrund, unendliche Ebenen und Objekte außerhalb des Gitters führen zu
+einem vollständigen Neu-Rendern.
+
+Aufruf:
+    python V12Incremental.py [Breite] [Samples] [vergleichen]
+"""
+
+import math
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from V12CodeEdited import Vec3, Ray, Sphere, Plane, Rect, Scene, random_in_hemisphere, to_pixel, write_png
+from V12RenderCache import CAMERA, describe_scene
+
+# ============================================================================
+# Abhängigkeitsgitter
+# ============================================================================
+
+def object_bounds(obj) -> Optional[Tuple[Vec3, Vec3]]:
+    """Hüllquader eines Objekts; None für unbeschränkte Objekte (Plane)"""
+    if isinstance(obj, Sphere):
+        r = Vec3(obj.radius, obj.radius, obj.radius)
+        return obj.center - r, obj.center + r
+    if isinstance(obj, Rect):
+        # Zuordnung der Grenzen wie in Rect.hit
+        if obj.axis == 'z':
+            return Vec3(obj.x0, obj.y0, obj.z), Vec3(obj.x1, obj.y1, obj.z)
+        if obj.axis == 'x':
+            return Vec3(obj.z, obj.y0, obj.x0), Vec3(obj.z, obj.y1, obj.x1)
+        if obj.axis == 'y':
+            return Vec3(obj.x0, obj.z, obj.y0), Vec3(obj.x1, obj.z, obj.y1)
+    return None
+
+
+class DependencyGrid:
+    """n x n x n Zellen über einem Hüllquader, Zellmengen als Bitmasken"""
+
+    def __init__(self, lo: Vec3, hi: Vec3, n: int = 8):
+        self.n = n
+        self.lo = (lo.x, lo.y, lo.z)
+        self.hi = (hi.x, hi.y, hi.z)
+        self.inv = tuple(n / max(h - l, 1e-12) for l, h in zip(self.lo, self.hi))
+        self.step = min(h - l for l, h in zip(self.lo, self.hi)) / n
+
+        # ranges[axis][a][b]: alle Zellen mit Index a..b auf dieser Achse,
+        # Bit der Zelle (ix, iy, iz) ist ix + n * iy + n² * iz
+        layers = [[0] * n for _ in range(3)]
+        for iz in range(n):
+            for iy in range(n):
+                for ix in range(n):
+                    bit = 1 << (ix + n * iy + n * n * iz)
+                    layers[0][ix] |= bit
+                    layers[1][iy] |= bit
+                    layers[2][iz] |= bit
+        self.ranges = []
+        for layer in layers:
+            table = [[0] * n for _ in range(n)]
+            for a in range(n):
+                mask = 0
+                for b in range(a, n):
+                    mask |= layer[b]
+                    table[a][b] = mask
+            self.ranges.append(table)
+        self.all = (1 << (n ** 3)) - 1
+
+    @classmethod
+    def for_scene(cls, scene: Scene, n: int = 8) -> "DependencyGrid":
+        boxes = [b for b in map(object_bounds, scene.objects) if b is not None]
+        lo = Vec3(min(b[0].x for b in boxes), min(b[0].y for b in boxes), min(b[0].z for b in boxes))
+        hi = Vec3(max(b[1].x for b in boxes), max(b[1].y for b in boxes), max(b[1].z for b in boxes))
+        pad = 1e-3 * max(hi.x - lo.x, hi.y - lo.y, hi.z - lo.z)
+        return cls(lo - Vec3(pad, pad, pad), hi + Vec3(pad, pad, pad), n)
+
+    def contains(self, lo: Vec3, hi: Vec3) -> bool:
+        return all(l >= gl and h <= gh for l, h, gl, gh in zip((lo.x, lo.y, lo.z), (hi.x, hi.y, hi.z),
+                                                               self.lo, self.hi))
+
+    def _index(self, value: float, axis: int) -> int:
+        i = int((value - self.lo[axis]) * self.inv[axis])
+        return 0 if i < 0 else (self.n - 1 if i >= self.n else i)
+
+    def box_mask(self, lo: Tuple[float, float, float], hi: Tuple[float, float, float]) -> int:
+        mask = self.all
+        for axis in range(3):
+            mask &= self.ranges[axis][self._index(lo[axis], axis)][self._index(hi[axis], axis)]
+        return mask
+
+    def segment_mask(self, ray: Ray, t_end: float) -> int:
+        """Zellen, die der Strahl zwischen 0 und t_end durchquert (innerhalb des Gitters)"""
+        o = (ray.origin.x, ray.origin.y, ray.origin.z)
+        d = (ray.direction.x, ray.direction.y, ray.direction.z)
+        t0, t1 = 0.0, t_end
+        for axis in range(3):
+            if d[axis] == 0:
+                if not self.lo[axis] <= o[axis] <= self.hi[axis]:
+                    return 0
+                continue
+            a = (self.lo[axis] - o[axis]) / d[axis]
+            b = (self.hi[axis] - o[axis]) / d[axis]
+            if a > b:
+                a, b = b, a
+            t0, t1 = max(t0, a), min(t1, b)
+            if t0 > t1:
+                return 0
+
+        # Stücke nicht länger als eine Zelle, jeweils mit Hüllquader
+        pieces = max(1, math.ceil((t1 - t0) / self.step))
+        dt = (t1 - t0) / pieces
+        mask = 0
+        prev = tuple(o[k] + d[k] * t0 for k in range(3))
+        for i in range(1, pieces + 1):
+            t = t0 + dt * i
+            cur = tuple(o[k] + d[k] * t for k in range(3))
+            mask |= self.box_mask(tuple(map(min, prev, cur)), tuple(map(max, prev, cur)))
+            prev = cur
+        return mask
+
+# ============================================================================
+# Verfolgung mit Abhängigkeiten
+# ============================================================================
+
+def closest_hit(scene: Scene, ray: Ray, t_min: float, t_max: float):
+    """Wie Scene.hit, zusätzlich mit Objektindex"""
+    hit_record, index = None, -1
+    closest_t = t_max
+    for i, obj in enumerate(scene.objects):
+        record = obj.hit(ray, t_min, closest_t)
+        if record is not None:
+            closest_t = record.t
+            hit_record, index = record, i
+    return hit_record, index
+
+
+def trace_tracked(ray: Ray, scene: Scene, depth: int, grid: DependencyGrid) -> Tuple[Vec3, int, int]:
+    """trace_ray mit denselben Zufallszahlen; liefert (Farbe, prims, voxels)"""
+    if depth <= 0:
+        return Vec3(0, 0, 0), 0, 0
+
+    hit, index = closest_hit(scene, ray, 0.001, float('inf'))
+    if hit is None:
+        return scene.background, 0, grid.segment_mask(ray, float('inf'))
+    segment = grid.segment_mask(ray, hit.t)
+
+    emitted = hit.material.emission
+    target = hit.point + hit.normal + random_in_hemisphere(hit.normal)
+    new_ray = Ray(hit.point, (target - hit.point).normalize())
+    incoming, prims, voxels = trace_tracked(new_ray, scene, depth - 1, grid)
+    attenuation = hit.material.color * (1.0 / math.pi)
+
+    return emitted + (attenuation * incoming), prims | (1 << index), voxels | segment
+
+# ============================================================================
+# Inkrementeller Renderer
+# ============================================================================
+
+class IncrementalRenderer:
+    """Hält Bild und Abhängigkeiten; update() rendert nur betroffene Pixel neu"""
+
+    def __init__(self, scene: Scene, width: int, height: int, samples_per_pixel: int = 50,
+                 max_depth: int = 10, seed: int = 42, grid_size: int = 8):
+        self.scene = scene
+        self.width = width
+        self.height = height
+        self.samples_per_pixel = samples_per_pixel
+        self.max_depth = max_depth
+        self.seed = seed
+        self.grid = DependencyGrid.for_scene(scene, grid_size)
+
+        camera_pos = Vec3(*CAMERA["position"])
+        look_at = Vec3(*CAMERA["look_at"])
+        up = Vec3(*CAMERA["up"])
+        self.camera_pos = camera_pos
+        self.w = (camera_pos - look_at).normalize()
+        self.u = up.cross(self.w).normalize()
+        self.v = self.w.cross(self.u)
+
+        n = width * height
+        self.colors: List[Vec3] = [Vec3(0, 0, 0)] * n
+        self.prims = [0] * n
+        self.voxels = [0] * n
+        self.description = None
+
+    def render_pixel(self, x: int, y: int):
+        random.seed(f"{self.seed}:{x}:{y}")
+        color_sum = Vec3(0, 0, 0)
+        prims = voxels = 0
+        for _ in range(self.samples_per_pixel):
+            u_offset = (x + random.random()) / self.width
+            v_offset = (y + random.random()) / self.height
+            ray_direction = (self.w * (-CAMERA["distance"]) + self.u * (2 * u_offset - 1)
+                             + self.v * (2 * v_offset - 1))
+            color, p, v = trace_tracked(Ray(self.camera_pos, ray_direction.normalize()),
+                                        self.scene, self.max_depth, self.grid)
+            color_sum = color_sum + color
+            prims |= p
+            voxels |= v
+        i = y * self.width + x
+        self.colors[i] = color_sum / self.samples_per_pixel
+        self.prims[i] = prims
+        self.voxels[i] = voxels
+
+    def render_full(self) -> float:
+        start = time.perf_counter()
+        for y in range(self.height):
+            for x in range(self.width):
+                self.render_pixel(x, y)
+        self.description = describe_scene(self.scene)
+        return time.perf_counter() - start
+
+    def affected(self) -> Optional[List[int]]:
+        """Indizes der betroffenen Pixel; None heißt alles neu rendern"""
+        new = describe_scene(self.scene)
+        old = self.description
+        if old is None or new[0] != old[0]:
+            return None  # Hintergrund geändert
+        changed_prims = 0
+        changed_voxels = 0
+        for i in range(1, max(len(old), len(new))):
+            if i < len(old) and i < len(new) and old[i] == new[i]:
+                continue
+            changed_prims |= 1 << (i - 1)
+            if i < len(new):
+                bounds = object_bounds(self.scene.objects[i - 1])
+                if bounds is None or not self.grid.contains(*bounds):
+                    return None
+                lo, hi = bounds
+                changed_voxels |= self.grid.box_mask((lo.x, lo.y, lo.z), (hi.x, hi.y, hi.z))
+        return [i for i in range(len(self.colors))
+                if self.prims[i] & changed_prims or self.voxels[i] & changed_voxels]
+
+    def update(self) -> dict:
+        """Rendert nach einer Änderung an self.scene die betroffenen Pixel neu"""
+        pixels = self.affected()
+        if pixels is None:
+            self.grid = DependencyGrid.for_scene(self.scene, self.grid.n)
+            seconds = self.render_full()
+            return {"pixels": len(self.colors), "full": True, "seconds": seconds}
+        start = time.perf_counter()
+        for i in pixels:
+            self.render_pixel(i % self.width, i // self.width)
+        self.description = describe_scene(self.scene)
+        return {"pixels": len(pixels), "full": False, "seconds": time.perf_counter() - start}
+
+    def pixels(self) -> List[Tuple[int, int, int]]:
+        return [to_pixel(c) for c in self.colors]
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    samples_per_pixel = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    compare = len(sys.argv) > 3 and sys.argv[3] == "vergleichen"
+
+    scene = Scene()
+    renderer = IncrementalRenderer(scene, width, width, samples_per_pixel)
+    print(f"Vollständig: {renderer.render_full():.2f} s")
+    write_png("cornellbox_vorher.png", width, width, renderer.pixels())
+
+    # Blaue Kugel etwas verschieben
+    scene.objects[7].center = scene.objects[7].center + Vec3(-0.3, 0, 0.2)
+    stats = renderer.update()
+    share = stats["pixels"] / (width * width)
+    print(f"Nach Änderung: {stats['pixels']} Pixel ({share:.1%}) in {stats['seconds']:.2f} s neu gerendert")
+    write_png("cornellbox_nachher.png", width, width, renderer.pixels())
+
+    if compare:
+        reference = IncrementalRenderer(scene, width, width, samples_per_pixel)
+        print(f"Zum Vergleich vollständig: {reference.render_full():.2f} s")
+        diff = sum(a != b for a, b in zip(renderer.pixels(), reference.pixels()))
+        print(f"Abweichende Pixel: {diff}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Inhaltsadressierter Render-Cache für V12CodeEdited.py
+
+Vergleichsläufe rendern oft exakt dieselbe Konfiguration mehrmals. Hier
+wird das Ergebnis unter dem SHA-256 von Szeneninhalt (Geometrie und
+Materialwerte), Kamera, Auflösung, Tiefe, Seed und Codeversion (Hash der
+Quelltexte) auf der Platte abgelegt. Gespeichert wird nicht das fertige Bild,
+sondern die Summe aller Samples pro Pixel zusammen mit der Sampleanzahl:
+
+- Anfrage mit gleicher Sampleanzahl: Bild direkt aus dem Cache
+- Anfrage mit mehr Samples (z.B. 16 bei gecachten 8): es werden nur die
+  fehlenden Durchgänge gerendert und auf die Summe addiert
+
+Damit das Fortsetzen dasselbe Ergebnis liefert wie ein Neustart, wird pro
+Durchgang (ein Sample für jeden Pixel) der Zufallsgenerator mit Seed und
+Durchgangsnummer neu gesetzt. Die Pixel unterscheiden sich deshalb von
+main(), das alle Samples eines Pixels hintereinander zieht.
+
+Der Cache-Ordner wird auf max_bytes begrenzt; verdrängt werden die am
+längsten nicht benutzten Dateien (Änderungszeit, wird bei jedem Treffer
+aktualisiert).
+
+Aufruf:
+    python V12RenderCache.py [Breite] [Höhe] [Samples] [Ausgabe.png]
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+import V12CodeEdited
+from V12CodeEdited import Vec3, Ray, Sphere, Plane, Rect, Scene, trace_ray, to_pixel, write_png
+
+MAGIC = b"V12ACC1\n"
+CACHE_DIR = ".render_cache"
+
+# Kamera aus main()
+CAMERA = {"position": (0, 1.8, 5), "look_at": (0, 1.5, 0), "up": (0, 1, 0), "distance": 1.5}
+
+# ============================================================================
+# Schlüssel
+# ============================================================================
+
+def _vec(v: Vec3) -> list:
+    return [v.x, v.y, v.z]
+
+
+def describe_scene(scene: Scene) -> list:
+    """Inhalt der Szene als JSON-fähige Liste, inklusive Materialwerten"""
+    desc = [["background", _vec(scene.background)]]
+    for obj in scene.objects:
+        material = obj.material
+        mat = [_vec(material.color), _vec(material.emission)]
+        if isinstance(obj, Rect):
+            desc.append(["rect", obj.axis, obj.x0, obj.x1, obj.y0, obj.y1, obj.z, bool(obj.flip_normal), mat])
+        elif isinstance(obj, Sphere):
+            desc.append(["sphere", _vec(obj.center), obj.radius, mat])
+        elif isinstance(obj, Plane):
+            desc.append(["plane", _vec(obj.point), _vec(obj.normal), mat])
+        else:
+            raise TypeError(f"Unbekannter Objekttyp für den Cache: {type(obj).__name__}")
+    return desc
+
+
+def code_version() -> str:
+    """Hash über die Quelltexte, die das Ergebnis bestimmen"""
+    h = hashlib.sha256()
+    for path in (V12CodeEdited.__file__, __file__):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def render_key(scene: Scene, width: int, height: int, max_depth: int, seed: int) -> str:
+    """Schlüssel ohne Sampleanzahl; die steht im Dateinamen"""
+    desc = {"scene": describe_scene(scene), "camera": CAMERA, "width": width, "height": height,
+            "max_depth": max_depth, "seed": seed, "code": code_version()}
+    return hashlib.sha256(json.dumps(desc, sort_keys=True).encode()).hexdigest()
+
+# ============================================================================
+# Cache auf der Platte
+# ============================================================================
+
+class RenderCache:
+    """Akkumulationspuffer pro Schlüssel und Sampleanzahl, LRU nach Dateigröße"""
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = 512 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str, samples: int) -> str:
+        return os.path.join(self.directory, f"{key}-{samples:06d}.acc")
+
+    def lookup(self, key: str, samples: int) -> Tuple[Optional[array], int]:
+        """Größte gecachte Akkumulation mit höchstens samples Samples"""
+        if not os.path.isdir(self.directory):
+            return None, 0
+        best = 0
+        for name in os.listdir(self.directory):
+            if name.startswith(key + "-") and name.endswith(".acc"):
+                count = int(name[len(key) + 1:-4])
+                if best < count <= samples:
+                    best = count
+        if best == 0:
+            return None, 0
+        path = self._path(key, best)
+        with open(path, 'rb') as f:
+            if f.readline() != MAGIC:
+                return None, 0
+            header = json.loads(f.readline())
+            accum = array('d')
+            accum.frombytes(f.read())
+        if len(accum) != 3 * header["width"] * header["height"]:
+            return None, 0
+        os.utime(path)  # zuletzt benutzt
+        return accum, best
+
+    def store(self, key: str, samples: int, accum: array, width: int, height: int):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, samples)
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(json.dumps({"width": width, "height": height, "samples": samples}).encode() + b"\n")
+            f.write(accum.tobytes())
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self) -> int:
+        """Löscht die am längsten unbenutzten Einträge bis max_bytes; gibt die Anzahl zurück"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".acc"):
+                st = os.stat(os.path.join(self.directory, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+            removed += 1
+        return removed
+
+# ============================================================================
+# Rendern in Durchgängen
+# ============================================================================
+
+def render_passes(scene: Scene, width: int, height: int, accum: array, start: int, stop: int,
+                  max_depth: int = 10, seed: int = 42):
+    """Addiert die Durchgänge start..stop-1 auf accum (ein Sample pro Pixel und Durchgang)"""
+    camera_pos = Vec3(*CAMERA["position"])
+    look_at = Vec3(*CAMERA["look_at"])
+    up = Vec3(*CAMERA["up"])
+    w = (camera_pos - look_at).normalize()
+    u = up.cross(w).normalize()
+    v = w.cross(u)
+
+    for p in range(start, stop):
+        random.seed(f"{seed}:{p}")
+        i = 0
+        for y in range(height):
+            for x in range(width):
+                u_offset = (x + random.random()) / width
+                v_offset = (y + random.random()) / height
+                ray_direction = w * (-CAMERA["distance"]) + u * (2 * u_offset - 1) + v * (2 * v_offset - 1)
+                color = trace_ray(Ray(camera_pos, ray_direction.normalize()), scene, max_depth)
+                accum[i] += color.x
+                accum[i + 1] += color.y
+                accum[i + 2] += color.z
+                i += 3
+
+
+def render_cached(scene: Scene, width: int, height: int, samples_per_pixel: int,
+                  max_depth: int = 10, seed: int = 42,
+                  cache: Optional[RenderCache] = None) -> Tuple[List[Tuple[int, int, int]], dict]:
+    """Pixel wie für write_png plus Statistik (gecachte und neu gerenderte Samples)"""
+    cache = cache or RenderCache()
+    key = render_key(scene, width, height, max_depth, seed)
+    accum, cached = cache.lookup(key, samples_per_pixel)
+    if accum is None:
+        accum = array('d', bytes(8 * 3 * width * height))
+
+    start = time.perf_counter()
+    render_passes(scene, width, height, accum, cached, samples_per_pixel, max_depth, seed)
+    if cached < samples_per_pixel:
+        cache.store(key, samples_per_pixel, accum, width, height)
+    stats = {"key": key, "cached_samples": cached, "rendered_samples": samples_per_pixel - cached,
+             "seconds": time.perf_counter() - start}
+
+    pixels = [to_pixel(Vec3(accum[i], accum[i + 1], accum[i + 2]) / samples_per_pixel)
+              for i in range(0, len(accum), 3)]
+    return pixels, stats
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else width
+    samples_per_pixel = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    filename = sys.argv[4] if len(sys.argv) > 4 else "cornellbox.png"
+
+    scene = Scene()
+    pixels, stats = render_cached(scene, width, height, samples_per_pixel)
+    if stats["rendered_samples"] == 0:
+        print(f"Aus dem Cache: {samples_per_pixel} Samples pro Pixel")
+    else:
+        print(f"{stats['cached_samples']} Samples aus dem Cache, {stats['rendered_samples']} neu gerendert "
+              f"in {stats['seconds']:.1f} s")
+    write_png(filename, width, height, pixels)
+    print(f"Bild gespeichert als '{filename}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Szenen-Compiler für V12CodeEdited.py
+
+Erzeugt für eine feste Szene spezialisierten Python-Quelltext der
+Schnittpunktsuche: eine ausgerollte Folge von Tests pro Objekt, alle
+Konstanten (Ebenenlage, Grenzen, Kugelmittelpunkt, Radius²) direkt im Code
+und ohne die Achsen-Abfragen von Rect.hit. Der Quelltext wird per exec in ein
+Funktionspaar closest_hit/any_hit übersetzt. Der übersetzte Code wird über
+einen Hash der Szenenbeschreibung zwischengespeichert, so dass eine
+gleich aufgebaute Szene nicht erneut übersetzt werden muss.
+
+Die Ergebnisse sind bitgleich zu Scene.hit (gleiche Rechenreihenfolge,
+gleiche Vergleichsgrenzen).
+"""
+
+import hashlib
+import math
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from V12CodeEdited import (Vec3, Ray, HitRecord, Sphere, Plane, Rect, Scene,
+                           trace_ray, to_pixel, write_png)
+
+# ============================================================================
+# Code-Erzeugung pro Objekttyp
+# ============================================================================
+
+# Achse -> (Normalenachse, (Koordinate, untere, obere Grenze) der beiden
+# anderen Achsen).
+# Entspricht den Zweigen in Rect.hit: 'x' prüft y gegen (y0, y1) und z gegen
+# (x0, x1), 'y' prüft x gegen (x0, x1) und z gegen (y0, y1).
+RECT_AXES = {
+    'z': ('z', ('x', 'x0', 'x1'), ('y', 'y0', 'y1')),
+    'x': ('x', ('y', 'y0', 'y1'), ('z', 'x0', 'x1')),
+    'y': ('y', ('x', 'x0', 'x1'), ('z', 'y0', 'y1')),
+}
+
+
+def _num(value: float) -> str:
+    """Zahl als exakt rückübersetzbares Literal"""
+    return f"({float(value)!r})"
+
+
+def _describe(obj, index: int, materials: Dict[int, int]) -> tuple:
+    """Inhaltliche Beschreibung eines Objekts für den Szenen-Hash"""
+    mat = materials.setdefault(id(obj.material), len(materials)) if hasattr(obj, "material") else -1
+    if isinstance(obj, Rect):
+        return ("rect", obj.axis, obj.x0, obj.x1, obj.y0, obj.y1, obj.z,
+                bool(obj.flip_normal), mat)
+    if isinstance(obj, Sphere):
+        c = obj.center
+        return ("sphere", c.x, c.y, c.z, obj.radius, mat)
+    if isinstance(obj, Plane):
+        p, n = obj.point, obj.normal
+        return ("plane", p.x, p.y, p.z, n.x, n.y, n.z, mat)
+    # Unbekannte Typen werden über ihre eigene hit-Methode aufgerufen
+    return ("object", type(obj).__name__, index)
+
+
+def _rect_test(obj: Rect, i: int, on_hit: List[str]) -> List[str]:
+    axis, (a, a0, a1), (b, b0, b1) = RECT_AXES[obj.axis]
+    lines = [
+        f"if d{axis} != 0:",
+        f"    t = ({_num(obj.z)} - o{axis}) / d{axis}",
+        f"    if t_min <= t <= t_max:",
+        f"        {a} = o{a} + t * d{a}",
+        f"        {b} = o{b} + t * d{b}",
+        f"        if {_num(getattr(obj, a0))} <= {a} <= {_num(getattr(obj, a1))} and "
+        f"{_num(getattr(obj, b0))} <= {b} <= {_num(getattr(obj, b1))}:",
+    ]
+    return lines + ["            " + line for line in on_hit]
+
+
+def _sphere_test(obj: Sphere, i: int, on_hit: List[str]) -> List[str]:
+    c = obj.center
+    lines = [
+        f"ocx = ox - {_num(c.x)}",
+        f"ocy = oy - {_num(c.y)}",
+        f"ocz = oz - {_num(c.z)}",
+        f"b = ocx * dx + ocy * dy + ocz * dz",
+        f"c = ocx * ocx + ocy * ocy + ocz * ocz - {_num(obj.radius * obj.radius)}",
+        f"disc = b * b - a * c",
+        f"if disc > 0:",
+        f"    s = sqrt(disc)",
+        f"    t = (-b - s) / a",
+        f"    if not t_min < t < t_max:",
+        f"        t = (-b + s) / a",
+        f"    if t_min < t < t_max:",
+    ]
+    return lines + ["        " + line for line in on_hit]
+
+
+def _plane_test(obj: Plane, i: int, on_hit: List[str]) -> List[str]:
+    p, n = obj.point, obj.normal
+    lines = [
+        f"denom = {_num(n.x)} * dx + {_num(n.y)} * dy + {_num(n.z)} * dz",
+        f"if abs(denom) >= 1e-6:",
+        f"    t = (({_num(p.x)} - ox) * {_num(n.x)} + ({_num(p.y)} - oy) * {_num(n.y)}"
+        f" + ({_num(p.z)} - oz) * {_num(n.z)}) / denom",
+        f"    if t_min < t < t_max:",
+    ]
+    return lines + ["        " + line for line in on_hit]
+
+
+def _generic_test(obj, i: int, on_hit: List[str]) -> List[str]:
+    return [
+        f"r{i} = O{i}.hit(ray, t_min, t_max)",
+        f"if r{i} is not None:",
+        f"    t = r{i}.t",
+    ] + ["    " + line for line in on_hit]
+
+
+def _finish(obj, i: int) -> List[str]:
+    """Erzeugt den HitRecord, nachdem Objekt i als nächstes feststeht"""
+    point = "Vec3(ox + dx * t_max, oy + dy * t_max, oz + dz * t_max)"
+    if isinstance(obj, Rect) and obj.axis in RECT_AXES:
+        sign = -1 if obj.flip_normal else 1
+        normal = {'x': f"Vec3({sign}, 0, 0)", 'y': f"Vec3(0, {sign}, 0)",
+                  'z': f"Vec3(0, 0, {sign})"}[obj.axis]
+        return [f"return HitRecord(t_max, {point}, {normal}, M{i})"]
+    if isinstance(obj, Sphere):
+        c, r = obj.center, _num(obj.radius)
+        return [
+            f"p = {point}",
+            f"return HitRecord(t_max, p, Vec3((p.x - {_num(c.x)}) / {r}, "
+            f"(p.y - {_num(c.y)}) / {r}, (p.z - {_num(c.z)}) / {r}), M{i})",
+        ]
+    if isinstance(obj, Plane):
+        return [f"return HitRecord(t_max, {point}, N{i}, M{i})"]
+    return [f"return r{i}"]
+
+
+def _test_for(obj):
+    if isinstance(obj, Rect) and obj.axis in RECT_AXES:
+        return _rect_test
+    if isinstance(obj, Sphere):
+        return _sphere_test
+    if isinstance(obj, Plane):
+        return _plane_test
+    return _generic_test
+
+
+def generate_source(objects: list) -> str:
+    """Erzeugt den Quelltext von closest_hit und any_hit für die Objektliste"""
+    header = [
+        "o = ray.origin",
+        "d = ray.direction",
+        "ox = o.x; oy = o.y; oz = o.z",
+        "dx = d.x; dy = d.y; dz = d.z",
+    ]
+    if any(isinstance(obj, Sphere) for obj in objects):
+        header.append("a = dx * dx + dy * dy + dz * dz")
+
+    closest = ["def closest_hit(ray, t_min, t_max):"]
+    closest += ["    " + line for line in header]
+    closest.append("    k = -1")
+    for i, obj in enumerate(objects):
+        closest.append(f"    # {i}: {type(obj).__name__}")
+        test = _test_for(obj)(obj, i, ["t_max = t", f"k = {i}"])
+        closest += ["    " + line for line in test]
+    closest.append("    if k < 0:")
+    closest.append("        return None")
+    for i, obj in enumerate(objects):
+        closest.append(f"    {'if' if i == 0 else 'elif'} k == {i}:")
+        closest += ["        " + line for line in _finish(obj, i)]
+
+    any_hit = ["def any_hit(ray, t_min, t_max):"]
+    any_hit += ["    " + line for line in header]
+    for i, obj in enumerate(objects):
+        any_hit.append(f"    # {i}: {type(obj).__name__}")
+        any_hit += ["    " + line for line in _test_for(obj)(obj, i, ["return True"])]
+    any_hit.append("    return False")
+
+    return "\n".join(closest) + "\n\n\n" + "\n".join(any_hit) + "\n"
+
+
+# ============================================================================
+# Übersetzen und Zwischenspeichern
+# ============================================================================
+
+# Szenen-Hash -> (Quelltext, Code-Objekt)
+_CODE_CACHE: Dict[str, Tuple[str, object]] = {}
+
+
+def scene_hash(objects: list) -> str:
+    """SHA-256 über Geometrie, Normalenrichtung und Materialzuordnung"""
+    materials: Dict[int, int] = {}
+    desc = [_describe(obj, i, materials) for i, obj in enumerate(objects)]
+    return hashlib.sha256(repr(desc).encode("utf-8")).hexdigest()
+
+
+class CompiledScene:
+    """Eingefrorene Szene mit erzeugten Schnittfunktionen
+
+    Kann überall statt Scene verwendet werden, wo nur hit() und background
+    gebraucht werden (z.B. trace_ray). Ändert sich die Szene, muss neu
+    übersetzt werden.
+    """
+
+    def __init__(self, scene: Scene):
+        self.objects = list(scene.objects)
+        self.background = scene.background
+        self.key = scene_hash(self.objects)
+
+        cached = _CODE_CACHE.get(self.key)
+        self.from_cache = cached is not None
+        if cached is None:
+            source = generate_source(self.objects)
+            cached = (source, compile(source, f"<scene {self.key[:12]}>", "exec"))
+            _CODE_CACHE[self.key] = cached
+        self.source, code = cached
+
+        # Materialien, Normalen und unbekannte Objekte als globale Namen
+        namespace = {"Vec3": Vec3, "HitRecord": HitRecord, "sqrt": math.sqrt}
+        for i, obj in enumerate(self.objects):
+            namespace[f"O{i}"] = obj
+            namespace[f"M{i}"] = getattr(obj, "material", None)
+            if isinstance(obj, Plane):
+                namespace[f"N{i}"] = obj.normal
+        exec(code, namespace)
+        self.closest_hit = namespace["closest_hit"]
+        self.any_hit = namespace["any_hit"]
+        self.hit = self.closest_hit
+
+
+def compile_scene(scene: Scene) -> CompiledScene:
+    """Übersetzt die aktuelle Objektliste der Szene"""
+    return CompiledScene(scene)
+
+
+# ============================================================================
+# Vergleich und Hauptprogramm
+# ============================================================================
+
+def benchmark(scene: Scene, compiled: CompiledScene, count: int = 20000) -> None:
+    """Vergleicht Scene.hit mit closest_hit auf zufälligen Strahlen"""
+    rng = random.Random(1)
+    rays = []
+    for _ in range(count):
+        origin = Vec3(rng.uniform(-1.9, 1.9), rng.uniform(0.1, 3.9), rng.uniform(-1.9, 4.0))
+        direction = Vec3(rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1)).normalize()
+        rays.append(Ray(origin, direction))
+
+    start = time.perf_counter()
+    reference = [scene.hit(ray, 0.001, float('inf')) for ray in rays]
+    t_scene = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = [compiled.closest_hit(ray, 0.001, float('inf')) for ray in rays]
+    t_compiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for ray in rays:
+        compiled.any_hit(ray, 0.001, float('inf'))
+    t_any = time.perf_counter() - start
+
+    mismatches = 0
+    for a, b in zip(reference, result):
+        if (a is None) != (b is None):
+            mismatches += 1
+        elif a is not None and (a.t != b.t or a.point != b.point or
+                                a.normal != b.normal or a.material is not b.material):
+            mismatches += 1
+
+    print(f"{count} Strahlen, {len(scene.objects)} Objekte")
+    print(f"  Scene.hit:    {t_scene:.3f} s")
+    print(f"  closest_hit:  {t_compiled:.3f} s  (Faktor {t_scene / t_compiled:.2f})")
+    print(f"  any_hit:      {t_any:.3f} s")
+    print(f"  Abweichungen: {mismatches}")
+
+
+def main():
+    """Übersetzt die Cornell-Box, vergleicht und rendert mit closest_hit"""
+    width = height = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    samples_per_pixel = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    max_depth = 10
+
+    scene = Scene()
+    start = time.perf_counter()
+    compiled = compile_scene(scene)
+    print(f"Szene {compiled.key[:12]} übersetzt in {1000 * (time.perf_counter() - start):.1f} ms "
+          f"({len(compiled.source.splitlines())} Zeilen)")
+    benchmark(scene, compiled)
+
+    # Kamera wie in V12CodeEdited.main
+    camera_pos = Vec3(0, 1.8, 5)
+    look_at = Vec3(0, 1.5, 0)
+    up = Vec3(0, 1, 0)
+    w = (camera_pos - look_at).normalize()
+    u = up.cross(w).normalize()
+    v = w.cross(u)
+
+    print(f"Rendere Cornell-Box mit {width}x{height} Pixeln, {samples_per_pixel} Samples...")
+    start = time.perf_counter()
+    pixels = []
+    for y in range(height):
+        for x in range(width):
+            color_sum = Vec3(0, 0, 0)
+            for _ in range(samples_per_pixel):
+                u_offset = (x + random.random()) / width
+                v_offset = (y + random.random()) / height
+                ray_direction = w * (-1.5) + u * (2 * u_offset - 1) + v * (2 * v_offset - 1)
+                ray = Ray(camera_pos, ray_direction.normalize())
+                color_sum = color_sum + trace_ray(ray, compiled, max_depth)
+            pixels.append(to_pixel(color_sum / samples_per_pixel))
+    print(f"Renderzeit: {time.perf_counter() - start:.1f} s")
+
+    write_png("cornellbox_compiled.png", width, height, pixels)
+    print("Bild gespeichert als 'cornellbox_compiled.png'")
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Aufteilung am ersten Treffer (Splitting) für V12CodeEdited.py
+
+In main() verfolgt jedes der 50 Samples eines Pixels seinen Kamerastrahl
+und den ersten Treffer erneut, bevor es gestreut wird. render_split
+verfolgt stattdessen primary Kamerastrahlen pro Pixel und setzt an jedem
+ersten Treffer secondary unabhängige Streupfade fort:
+
+    L = 1/N * Σ_i [ emitted_i + attenuation_i * 1/M * Σ_j L_in(i, j) ]
+
+Das ist derselbe Erwartungswert wie trace_ray. Der erste Treffer kostet so
+pro Pixel nur N statt N*M Schnitttests. N steuert Kantenglättung und
+Sichtbarkeit, M das indirekte Licht; über beide lässt sich die Varianz
+gezielt verteilen.
+
+CountingScene zählt die Schnitttests (Scene.hit-Aufrufe) für den
+Vergleich bei gleicher Sampleanzahl.
+
+Aufruf:
+    python V12Splitting.py [Breite] [N] [M]
+"""
+
+import math
+import random
+import sys
+import time
+from typing import List
+
+from V12CodeEdited import Vec3, Ray, Scene, random_in_hemisphere, trace_ray, to_pixel, write_png
+from V12View import ViewCamera, rmse
+
+# ============================================================================
+# Zählende Szene
+# ============================================================================
+
+class CountingScene:
+    """Reicht hit() an die Szene weiter und zählt die Aufrufe"""
+
+    def __init__(self, scene: Scene):
+        self.scene = scene
+        self.background = scene.background
+        self.hits = 0
+
+    def hit(self, ray: Ray, t_min: float, t_max: float):
+        self.hits += 1
+        return self.scene.hit(ray, t_min, t_max)
+
+# ============================================================================
+# Rendern
+# ============================================================================
+
+def trace_split(ray: Ray, scene, max_depth: int, secondary: int) -> Vec3:
+    """trace_ray mit secondary Fortsetzungen am ersten Treffer"""
+    if max_depth <= 0:
+        return Vec3(0, 0, 0)
+    hit = scene.hit(ray, 0.001, float('inf'))
+    if hit is None:
+        return scene.background
+
+    incoming = Vec3(0, 0, 0)
+    for _ in range(secondary):
+        target = hit.point + hit.normal + random_in_hemisphere(hit.normal)
+        new_ray = Ray(hit.point, (target - hit.point).normalize())
+        incoming = incoming + trace_ray(new_ray, scene, max_depth - 1)
+    attenuation = hit.material.color * (1.0 / math.pi)
+    return hit.material.emission + attenuation * (incoming / secondary)
+
+
+def render_split(scene, camera: ViewCamera, width: int, height: int, primary: int, secondary: int,
+                 max_depth: int = 10) -> List[Vec3]:
+    """HDR-Bild (Zeile für Zeile) mit primary x secondary Pfaden pro Pixel"""
+    image = []
+    for y in range(height):
+        for x in range(width):
+            color_sum = Vec3(0, 0, 0)
+            for _ in range(primary):
+                ray = camera.ray((x + random.random()) / width, (y + random.random()) / height)
+                color_sum = color_sum + trace_split(ray, scene, max_depth, secondary)
+            image.append(color_sum / primary)
+    return image
+
+
+def render_standard(scene, camera: ViewCamera, width: int, height: int, samples: int,
+                    max_depth: int = 10) -> List[Vec3]:
+    """Wie main(): jedes Sample mit eigenem Kamerastrahl"""
+    return render_split(scene, camera, width, height, samples, 1, max_depth)
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    primary = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    secondary = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    samples = primary * secondary
+
+    scene = Scene()
+    camera = ViewCamera(Vec3(0, 1.8, 5), Vec3(0, 1.5, 0))
+
+    random.seed(1)
+    print(f"Referenz mit {8 * samples} Samples...")
+    reference = render_standard(scene, camera, width, width, 8 * samples)
+
+    for name, render in (("Standard", lambda s: render_standard(s, camera, width, width, samples)),
+                         (f"Split {primary}x{secondary}",
+                          lambda s: render_split(s, camera, width, width, primary, secondary))):
+        random.seed(2)
+        counting = CountingScene(scene)
+        start = time.perf_counter()
+        image = render(counting)
+        seconds = time.perf_counter() - start
+        print(f"{name:>12}: {seconds:6.1f} s, {counting.hits:9d} Schnitttests, "
+              f"RMSE {rmse(image, reference):.4f}")
+        write_png(f"cornellbox_{'split' if 'Split' in name else 'standard'}.png", width, width,
+                  [to_pixel(c) for c in image])
+
+
+if __name__ == "__main__":
+    main()
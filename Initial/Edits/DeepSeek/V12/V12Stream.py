@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Zeilenweises Rendern mit Streaming-Ausgabe für V12CodeEdited.py
+
+main() in V12CodeEdited.py sammelt alle Pixel in einer Liste und schreibt
+erst danach das PNG; der Speicherbedarf wächst also mit der Auflösung.
+Hier erzeugt render_rows die Bildzeilen als Generator (fertige RGB-Bytes),
+ein Schreib-Thread holt sie über eine begrenzte Queue ab und gibt sie
+sofort an einen Streaming-Encoder weiter:
+
+- PNGStreamWriter komprimiert mit zlib.compressobj fortlaufend und schreibt
+  IDAT-Chunks, sobald genug komprimierte Daten anliegen
+- PPMStreamWriter schreibt binäres PPM (P6) Zeile für Zeile
+
+Im Speicher liegen höchstens queue_size Zeilen plus der zlib-Puffer, auch
+für 16K x 16K. Mit gleichem Seed entstehen dieselben Pixel wie in main().
+
+Aufruf:
+    python V12Stream.py [Breite] [Höhe] [Samples] [Ausgabe.png|.ppm]
+"""
+
+import queue
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Iterable, Iterator
+
+from V12CodeEdited import Vec3, Ray, Scene, trace_ray, to_pixel
+
+# ============================================================================
+# Streaming-Encoder
+# ============================================================================
+
+class PNGStreamWriter:
+    """Schreibt ein 8-Bit-RGB-PNG zeilenweise (Filter-Typ 0 wie write_png)"""
+
+    def __init__(self, filename: str, width: int, height: int, chunk_size: int = 1 << 16):
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.file = open(filename, 'wb')
+        self.compressor = zlib.compressobj()
+        self.pending = bytearray()
+
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, chunk_type: bytes, data: bytes):
+        self.file.write(struct.pack('>I', len(data)) + chunk_type)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+    def write_row(self, row: bytes):
+        if len(row) != self.width * 3:
+            raise ValueError(f"Zeile mit {len(row)} Bytes, erwartet {self.width * 3}")
+        self.pending += self.compressor.compress(b'\x00' + row)
+        self.rows += 1
+        if len(self.pending) >= self.chunk_size:
+            self._chunk(b'IDAT', bytes(self.pending))
+            self.pending.clear()
+
+    def close(self):
+        if self.rows != self.height:
+            self.file.close()
+            raise ValueError(f"{self.rows} von {self.height} Zeilen geschrieben")
+        self.pending += self.compressor.flush()
+        self._chunk(b'IDAT', bytes(self.pending))
+        self.pending.clear()
+        self._chunk(b'IEND', b'')
+        self.file.close()
+
+    def abort(self):
+        """Schließt die Datei nach einem Fehler, ohne das Bild abzuschließen"""
+        self.file.close()
+
+
+class PPMStreamWriter:
+    """Schreibt ein binäres PPM (P6) zeilenweise"""
+
+    def __init__(self, filename: str, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.rows = 0
+        self.file = open(filename, 'wb')
+        self.file.write(f"P6\n{width} {height}\n255\n".encode())
+
+    def write_row(self, row: bytes):
+        if len(row) != self.width * 3:
+            raise ValueError(f"Zeile mit {len(row)} Bytes, erwartet {self.width * 3}")
+        self.file.write(row)
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+        if self.rows != self.height:
+            raise ValueError(f"{self.rows} von {self.height} Zeilen geschrieben")
+
+    def abort(self):
+        """Schließt die Datei nach einem Fehler"""
+        self.file.close()
+
+
+def open_writer(filename: str, width: int, height: int):
+    """Encoder passend zur Dateiendung"""
+    if filename.lower().endswith(".ppm"):
+        return PPMStreamWriter(filename, width, height)
+    return PNGStreamWriter(filename, width, height)
+
+# ============================================================================
+# Zeilen-Generator und Pipeline
+# ============================================================================
+
+def render_rows(scene: Scene, width: int, height: int, samples_per_pixel: int = 50,
+                max_depth: int = 10) -> Iterator[bytes]:
+    """Liefert die Bildzeilen von oben nach unten als RGB-Bytes
+
+    Kamera, Abtastung und Reihenfolge der Zufallszahlen wie in main().
+    """
+    camera_pos = Vec3(0, 1.8, 5)
+    look_at = Vec3(0, 1.5, 0)
+    up = Vec3(0, 1, 0)
+    w = (camera_pos - look_at).normalize()
+    u = up.cross(w).normalize()
+    v = w.cross(u)
+
+    for y in range(height):
+        row = bytearray(width * 3)
+        for x in range(width):
+            color_sum = Vec3(0, 0, 0)
+            for _ in range(samples_per_pixel):
+                u_offset = (x + random.random()) / width
+                v_offset = (y + random.random()) / height
+                ray_direction = w * (-1.5) + u * (2 * u_offset - 1) + v * (2 * v_offset - 1)
+                ray = Ray(camera_pos, ray_direction.normalize())
+                color_sum = color_sum + trace_ray(ray, scene, max_depth)
+            row[3 * x:3 * x + 3] = bytes(to_pixel(color_sum / samples_per_pixel))
+        yield bytes(row)
+
+
+def stream_rows(rows: Iterable[bytes], writer, queue_size: int = 8) -> int:
+    """Schiebt die Zeilen über eine begrenzte Queue in einen Schreib-Thread
+
+    Der Renderer blockiert, sobald queue_size Zeilen auf das Schreiben
+    warten. Fehler des Schreib-Threads werden im Aufrufer erneut ausgelöst.
+    Gibt die Anzahl geschriebener Zeilen zurück.
+    """
+    buffer = queue.Queue(maxsize=queue_size)
+    done = object()
+    errors = []
+
+    def consume():
+        finished = False
+        try:
+            while True:
+                row = buffer.get()
+                if row is done:
+                    finished = True
+                    break
+                writer.write_row(row)
+            writer.close()
+        except BaseException as e:
+            errors.append(e)
+            if not finished:
+                writer.abort()
+                # Queue leeren, damit der Renderer nicht ewig blockiert
+                while buffer.get() is not done:
+                    pass
+
+    thread = threading.Thread(target=consume, name="row-writer", daemon=True)
+    thread.start()
+    count = 0
+    try:
+        for row in rows:
+            if errors:
+                break
+            buffer.put(row)
+            count += 1
+    finally:
+        buffer.put(done)
+        thread.join()
+    if errors:
+        raise errors[0]
+    return count
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else width
+    samples_per_pixel = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    filename = sys.argv[4] if len(sys.argv) > 4 else "cornellbox.png"
+
+    print(f"Rendere Cornell-Box mit {width}x{height} Pixeln, {samples_per_pixel} Samples...")
+    scene = Scene()
+
+    def progress(rows: Iterable[bytes]) -> Iterator[bytes]:
+        for y, row in enumerate(rows, 1):
+            print(f"Zeile {y}/{height}", end='\r')
+            yield row
+
+    start = time.perf_counter()
+    rows = render_rows(scene, width, height, samples_per_pixel)
+    stream_rows(progress(rows), open_writer(filename, width, height))
+    print()
+    print(f"Fertig nach {time.perf_counter() - start:.1f} s, Bild gespeichert als '{filename}'")
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    main()
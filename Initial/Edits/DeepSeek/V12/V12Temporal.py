@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Zeitliche Wiederverwendung von Samples für Kamerafahrten mit V12CodeEdited.py
+
+Bei langsamen Kamerabewegungen beginnt sonst jedes Bild wieder bei null
+Samples. TemporalRenderer hält pro Pixel die Summe der Radianz und die
+Sampleanzahl und überträgt beide ins nächste Bild:
+
+1. G-Buffer des neuen Bildes: erster Treffer durch die Pixelmitte
+   (Punkt, Normale, Objektindex)
+2. Jeder Treffpunkt wird in die vorige Kamera projiziert; gültig ist die
+   Übernahme nur, wenn dort dasselbe Objekt mit ähnlicher Normale an fast
+   derselben Stelle lag. Sonst (Disokklusion, Bildrand) wird verworfen.
+3. Pixel ohne Historie bekommen die vollen Samples (target), gültige nur
+   so viele, dass sie target erreichen, mindestens aber min_samples
+
+Die Szene ist rein diffus, die Radianz hängt also nicht von der
+Blickrichtung ab und darf übernommen werden. max_history begrenzt die
+Gewichtung der Vergangenheit.
+
+Aufruf:
+    python V12Temporal.py [Bilder] [Breite] [Samples] [vergleichen]
+"""
+
+import math
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from V12CodeEdited import Vec3, Scene, trace_ray, to_pixel, write_png
+from V12Incremental import closest_hit
+from V12View import ViewCamera, render_reference, rmse
+
+# ============================================================================
+# Zeitliche Akkumulation
+# ============================================================================
+
+class TemporalRenderer:
+    """Rendert eine Bildfolge und übernimmt gültige Samples des Vorgängerbildes"""
+
+    def __init__(self, scene: Scene, width: int, height: int, target: int = 16, min_samples: int = 1,
+                 max_history: int = 64, max_depth: int = 10, position_tolerance: float = 0.02,
+                 normal_tolerance: float = 0.9, seed: int = 42):
+        self.scene = scene
+        self.width = width
+        self.height = height
+        self.target = target
+        self.min_samples = min_samples
+        self.max_history = max_history
+        self.max_depth = max_depth
+        self.position_tolerance = position_tolerance
+        self.normal_tolerance = normal_tolerance
+        self.seed = seed
+        self.frame = 0
+        self.camera: Optional[ViewCamera] = None
+        self.gbuffer: List[Optional[tuple]] = []
+        self.sums: List[Vec3] = []
+        self.counts: List[int] = []
+
+    def build_gbuffer(self, camera: ViewCamera) -> List[Optional[tuple]]:
+        """(Punkt, Normale, Objektindex, Abstand) des ersten Treffers pro Pixelmitte"""
+        gbuffer = []
+        for y in range(self.height):
+            for x in range(self.width):
+                ray = camera.ray((x + 0.5) / self.width, (y + 0.5) / self.height)
+                hit, index = closest_hit(self.scene, ray, 0.001, float('inf'))
+                gbuffer.append(None if hit is None else (hit.point, hit.normal, index, hit.t))
+        return gbuffer
+
+    def reproject(self, camera: ViewCamera, gbuffer: List[Optional[tuple]]) -> Tuple[List[Vec3], List[int]]:
+        """Summen und Zähler des vorigen Bildes in der neuen Ansicht (0 = verworfen)"""
+        sums = [Vec3(0, 0, 0)] * len(gbuffer)
+        counts = [0] * len(gbuffer)
+        if self.camera is None:
+            return sums, counts
+        for i, g in enumerate(gbuffer):
+            if g is None:
+                continue
+            point, normal, index, distance = g
+            pixel = self.camera.project(point, self.width, self.height)
+            if pixel is None:
+                continue
+            j = pixel[1] * self.width + pixel[0]
+            prev = self.gbuffer[j]
+            if prev is None or prev[2] != index or prev[1].dot(normal) < self.normal_tolerance:
+                continue
+            if (prev[0] - point).length() > self.position_tolerance * distance:
+                continue  # Disokklusion oder andere Stelle der Fläche
+            sums[i], counts[i] = self.sums[j], self.counts[j]
+            if counts[i] > self.max_history:
+                sums[i] = sums[i] * (self.max_history / counts[i])
+                counts[i] = self.max_history
+        return sums, counts
+
+    def render(self, camera: ViewCamera) -> dict:
+        """Rendert das nächste Bild; gibt Statistik (Samples, übernommene Pixel) zurück"""
+        start = time.perf_counter()
+        gbuffer = self.build_gbuffer(camera)
+        sums, counts = self.reproject(camera, gbuffer)
+        reused = sum(1 for c in counts if c > 0)
+
+        random.seed(f"{self.seed}:{self.frame}")
+        traced = 0
+        i = 0
+        for y in range(self.height):
+            for x in range(self.width):
+                if gbuffer[i] is None:
+                    # Kein Treffer: Hintergrund, ohne Rauschen
+                    sums[i], counts[i] = self.scene.background, 1
+                    i += 1
+                    continue
+                n = max(self.min_samples, self.target - counts[i])
+                color_sum = Vec3(0, 0, 0)
+                for _ in range(n):
+                    ray = camera.ray((x + random.random()) / self.width, (y + random.random()) / self.height)
+                    color_sum = color_sum + trace_ray(ray, self.scene, self.max_depth)
+                sums[i] = sums[i] + color_sum
+                counts[i] += n
+                traced += n
+                i += 1
+
+        self.camera, self.gbuffer, self.sums, self.counts = camera, gbuffer, sums, counts
+        self.frame += 1
+        return {"samples": traced, "samples_per_pixel": traced / len(counts), "reused_pixels": reused,
+                "seconds": time.perf_counter() - start}
+
+    def image(self) -> List[Vec3]:
+        return [s / c for s, c in zip(self.sums, self.counts)]
+
+    def pixels(self) -> List[Tuple[int, int, int]]:
+        return [to_pixel(c) for c in self.image()]
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def orbit(frame: int, frames: int) -> ViewCamera:
+    """Langsame Kamerafahrt um die Box (insgesamt 6 Grad)"""
+    angle = math.radians(-3 + 6 * frame / max(frames - 1, 1))
+    position = Vec3(5 * math.sin(angle), 1.8, 5 * math.cos(angle))
+    return ViewCamera(position, Vec3(0, 1.5, 0))
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 96
+    target = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    compare = len(sys.argv) > 4 and sys.argv[4] == "vergleichen"
+
+    scene = Scene()
+    temporal = TemporalRenderer(scene, width, width, target=target)
+    for f in range(frames):
+        stats = temporal.render(orbit(f, frames))
+        print(f"Bild {f}: {stats['samples_per_pixel']:.2f} Samples/Pixel, "
+              f"{stats['reused_pixels']} Pixel übernommen, {stats['seconds']:.1f} s")
+        write_png(f"temporal_{f:04d}.png", width, width, temporal.pixels())
+
+    if compare:
+        camera = orbit(frames - 1, frames)
+        reference = render_reference(scene, camera, width, width, 8 * target)
+        single = render_reference(scene, camera, width, width, target, seed=2)
+        print(f"RMSE letztes Bild: zeitlich {rmse(temporal.image(), reference):.4f}, "
+              f"einzeln mit {target} Samples {rmse(single, reference):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Kamera und Bildvergleich für die Erweiterungen von V12CodeEdited.py
+
+ViewCamera ist die Kamera aus main() mit frei wählbarer Position,
+render_reference rendert damit wie main() (ein Kamerastrahl pro Sample)
+und rmse vergleicht zwei HDR-Bilder. V12Temporal.py, V12Splitting.py und
+V12BDPT.py benutzen alle drei, ohne voneinander abzuhängen.
+"""
+
+import math
+import random
+from typing import List, Optional, Tuple
+
+from V12CodeEdited import Vec3, Ray, Scene, trace_ray
+
+# ============================================================================
+# Kamera wie in main()
+# ============================================================================
+
+class ViewCamera:
+    """Kamera aus main() (Bildebene im Abstand 1.5, Ausdehnung [-1, 1]²)"""
+
+    def __init__(self, position: Vec3, look_at: Vec3, up: Vec3 = Vec3(0, 1, 0), distance: float = 1.5):
+        self.position = position
+        self.distance = distance
+        self.w = (position - look_at).normalize()
+        self.u = up.cross(self.w).normalize()
+        self.v = self.w.cross(self.u)
+
+    def ray(self, u_offset: float, v_offset: float) -> Ray:
+        direction = self.w * (-self.distance) + self.u * (2 * u_offset - 1) + self.v * (2 * v_offset - 1)
+        return Ray(self.position, direction.normalize())
+
+    def project(self, point: Vec3, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """Pixel, durch den point gesehen wird, oder None außerhalb des Bildes"""
+        d = point - self.position
+        depth = -d.dot(self.w)
+        if depth <= 0:
+            return None
+        scale = self.distance / depth
+        x = int(math.floor((d.dot(self.u) * scale + 1) / 2 * width))
+        y = int(math.floor((d.dot(self.v) * scale + 1) / 2 * height))
+        if 0 <= x < width and 0 <= y < height:
+            return x, y
+        return None
+
+# ============================================================================
+# Referenzbild und Fehlermaß
+# ============================================================================
+
+def render_reference(scene: Scene, camera: ViewCamera, width: int, height: int, samples: int,
+                     seed: int = 1) -> List[Vec3]:
+    """HDR-Bild (Zeile für Zeile) wie main(), mit eigenem Startwert"""
+    random.seed(seed)
+    image = []
+    for y in range(height):
+        for x in range(width):
+            color_sum = Vec3(0, 0, 0)
+            for _ in range(samples):
+                ray = camera.ray((x + random.random()) / width, (y + random.random()) / height)
+                color_sum = color_sum + trace_ray(ray, scene, 10)
+            image.append(color_sum / samples)
+    return image
+
+
+def rmse(image: List[Vec3], reference: List[Vec3]) -> float:
+    """Wurzel des mittleren quadratischen Fehlers über alle Farbkanäle"""
+    total = sum((a - b).dot(a - b) for a, b in zip(image, reference))
+    return math.sqrt(total / (3 * len(image)))
@@ -0,0 +1,459 @@
+"""
+Langlebiger Worker-Pool mit LRU-Cache für V3CodeEdited.py
+
+Jeder Render in V3CodeEdited.py beginnt bei null: Szene aufbauen,
+Kamerabasis berechnen, Strahlen erzeugen. WarmPool hält dagegen Worker-
+Prozesse am Leben, die alles Vorbereitete in einem LRU-Cache behalten:
+
+- kompilierte Szene (Objekte aus der Beschreibung) samt BVH
+- Strahlentabelle der Kamera (alle Primärstrahlen für Auflösung und Samples)
+- Sampletabelle (geschichtete Subpixel-Offsets für samples > 1)
+
+Schlüssel ist jeweils der SHA-256 des Inhalts (Beschreibung als JSON), nicht
+der Objektname: eine geänderte Szene mit gleicher Kamera verwendet die
+Strahlentabelle weiter und umgekehrt. Der Cache hat eine Speichergrenze
+(geschätzte Bytes) und verdrängt die am längsten unbenutzten Einträge.
+Aufträge mit gleicher Kamera, Auflösung und Sampleanzahl gehen immer an
+denselben Worker, dessen Strahlentabelle (der größte Eintrag) dann schon
+bereitliegt.
+
+Mit samples=1 entstehen dieselben Pixel wie in main().
+
+Aufruf:
+    python V3WarmPool.py [Worker] [Breite] [Höhe]
+"""
+
+import hashlib
+import json
+import math
+import multiprocessing
+import queue
+import random
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from V3CodeEdited import Vec3, Ray, Material, HitRecord, Hittable, Sphere, Quad, Camera, Scene, RayTracer
+
+# ============================================================================
+# LRU-Cache mit Speichergrenze
+# ============================================================================
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """Grobe Größe eines Objektgraphen in Bytes (Listen, Dicts, __dict__)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(obj.__dict__, seen)
+    return size
+
+
+class LRUCache:
+    """LRU-Cache, begrenzt durch die Summe der geschätzten Eintragsgrößen"""
+
+    def __init__(self, max_bytes: int = 256 << 20):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[object, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key: str, build: Callable[[], object],
+                     sizeof: Callable[[object], int] = deep_sizeof) -> Tuple[object, bool]:
+        """(Wert, Treffer); baut und speichert bei Fehlschlag"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0], True
+        self.misses += 1
+        value = build()
+        self.put(key, value, sizeof(value))
+        return value, False
+
+    def put(self, key: str, value: object, nbytes: int):
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            return  # passt nie hinein, nicht cachen
+        self.entries[key] = (value, nbytes)
+        self.bytes += nbytes
+        while self.bytes > self.max_bytes:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def summary(self) -> Dict[str, int]:
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+def content_hash(kind: str, desc) -> str:
+    data = json.dumps(desc, sort_keys=True, separators=(',', ':')).encode()
+    return kind + ":" + hashlib.sha256(data).hexdigest()
+
+# ============================================================================
+# Szenenbeschreibung und BVH
+# ============================================================================
+
+def cornell_box_description() -> dict:
+    """Die Szene aus create_cornell_box als Beschreibung"""
+    size, light_size = 550, 100
+    corner = [size / 2 - light_size / 2, size - 1, size / 2 - light_size / 2]
+    return {
+        "materials": {
+            "red": {"color": [0.8, 0.2, 0.2]},
+            "green": {"color": [0.2, 0.8, 0.2]},
+            "white": {"color": [0.8, 0.8, 0.8]},
+            "light": {"color": [0.8, 0.8, 0.8], "emissive": [15, 15, 15]},
+            "mirror": {"color": [1, 1, 1], "reflective": 0.9},
+        },
+        "objects": [
+            {"type": "quad", "corner": [0, 0, 0], "u": [size, 0, 0], "v": [0, 0, size], "material": "white"},
+            {"type": "quad", "corner": [0, size, 0], "u": [size, 0, 0], "v": [0, 0, size], "material": "white"},
+            {"type": "quad", "corner": [0, 0, 0], "u": [0, size, 0], "v": [0, 0, size], "material": "red"},
+            {"type": "quad", "corner": [size, 0, 0], "u": [0, size, 0], "v": [0, 0, size], "material": "green"},
+            {"type": "quad", "corner": [0, 0, size], "u": [size, 0, 0], "v": [0, size, 0], "material": "white"},
+            {"type": "quad", "corner": corner, "u": [light_size, 0, 0], "v": [0, 0, light_size], "material": "light"},
+            {"type": "quad", "corner": [100, 0, 400], "u": [150, 0, 0], "v": [0, 150, 0], "material": "white"},
+            {"type": "quad", "corner": [100, 150, 400], "u": [150, 0, 0], "v": [0, 0, 150], "material": "white"},
+            {"type": "quad", "corner": [250, 0, 400], "u": [0, 150, 0], "v": [0, 0, 150], "material": "white"},
+            {"type": "sphere", "center": [400, 100, 200], "radius": 100, "material": "mirror"},
+        ],
+    }
+
+
+def default_camera(width: int, height: int) -> dict:
+    """Kamera aus main()"""
+    return {"lookfrom": [275, 275, -600], "lookat": [275, 275, 275], "vup": [0, 1, 0],
+            "vfov": 40, "aspect_ratio": width / height}
+
+
+def _bounds(obj) -> Tuple[Vec3, Vec3]:
+    if isinstance(obj, Sphere):
+        r = Vec3(obj.radius, obj.radius, obj.radius)
+        return obj.center - r, obj.center + r
+    points = [obj.corner, obj.corner + obj.u, obj.corner + obj.v, obj.corner + obj.u + obj.v]
+    pad = 1e-6
+    return (Vec3(min(p.x for p in points) - pad, min(p.y for p in points) - pad, min(p.z for p in points) - pad),
+            Vec3(max(p.x for p in points) + pad, max(p.y for p in points) + pad, max(p.z for p in points) + pad))
+
+
+class BVHNode:
+    """Knoten mit Hüllquader; Blätter halten (Index, Objekt)-Paare"""
+    def __init__(self, items: List[Tuple[int, Hittable]], leaf_size: int = 2):
+        boxes = [_bounds(obj) for _, obj in items]
+        self.lo = Vec3(min(b[0].x for b in boxes), min(b[0].y for b in boxes), min(b[0].z for b in boxes))
+        self.hi = Vec3(max(b[1].x for b in boxes), max(b[1].y for b in boxes), max(b[1].z for b in boxes))
+        self.items = None
+        self.left = self.right = None
+        if len(items) <= leaf_size:
+            self.items = items
+            return
+        extent = self.hi - self.lo
+        axis = max(('x', 'y', 'z'), key=lambda a: getattr(extent, a))
+        centers = [(getattr(b[0], axis) + getattr(b[1], axis), item) for b, item in zip(boxes, items)]
+        centers.sort(key=lambda c: c[0])
+        half = len(centers) // 2
+        self.left = BVHNode([item for _, item in centers[:half]], leaf_size)
+        self.right = BVHNode([item for _, item in centers[half:]], leaf_size)
+
+    def entry(self, ray: Ray, inv: Tuple[float, float, float], t_max: float) -> float:
+        """Eintritts-t in den Hüllquader oder inf"""
+        t0, t1 = 0.0, t_max
+        for o, d_inv, lo, hi in ((ray.origin.x, inv[0], self.lo.x, self.hi.x),
+                                 (ray.origin.y, inv[1], self.lo.y, self.hi.y),
+                                 (ray.origin.z, inv[2], self.lo.z, self.hi.z)):
+            a, b = (lo - o) * d_inv, (hi - o) * d_inv
+            if a > b:
+                a, b = b, a
+            t0, t1 = max(t0, a), min(t1, b)
+            if t0 > t1:
+                return float('inf')
+        return t0
+
+
+class BVHScene(Scene):
+    """Scene mit BVH über die Hüllquader der Objekte"""
+    def __init__(self, objects: List[Hittable]):
+        super().__init__()
+        self.objects = objects
+        self.root = BVHNode(list(enumerate(objects))) if objects else None
+
+    def hit(self, ray: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        if self.root is None:
+            return None
+        d = ray.direction
+        inv = tuple(1.0 / c if c != 0 else math.copysign(float('inf'), c) for c in (d.x, d.y, d.z))
+        closest_hit, closest_t = None, t_max
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.entry(ray, inv, closest_t) > closest_t:
+                continue
+            if node.items is not None:
+                for _, obj in node.items:
+                    hit = obj.hit(ray, t_min, closest_t)
+                    if hit:
+                        closest_hit, closest_t = hit, hit.t
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+        return closest_hit
+
+
+def compile_scene(desc: dict) -> BVHScene:
+    materials = {name: Material(Vec3(*m["color"]), Vec3(*m.get("emissive", (0, 0, 0))),
+                                m.get("reflective", 0.0))
+                 for name, m in desc["materials"].items()}
+    objects = []
+    for obj in desc["objects"]:
+        material = materials[obj["material"]]
+        if obj["type"] == "sphere":
+            objects.append(Sphere(Vec3(*obj["center"]), obj["radius"], material))
+        elif obj["type"] == "quad":
+            objects.append(Quad(Vec3(*obj["corner"]), Vec3(*obj["u"]), Vec3(*obj["v"]), material))
+        else:
+            raise ValueError(f"Unbekannter Objekttyp: {obj['type']}")
+    return BVHScene(objects)
+
+# ============================================================================
+# Sample- und Strahlentabellen
+# ============================================================================
+
+def sample_table(samples: int, seed: int = 0) -> List[Tuple[float, float]]:
+    """Geschichtete Subpixel-Offsets; ein Sample liegt in der Pixelmitte wie in main()"""
+    if samples == 1:
+        return [(0.5, 0.5)]
+    rng = random.Random(seed)
+    n = math.ceil(math.sqrt(samples))
+    cells = [(i, j) for j in range(n) for i in range(n)]
+    rng.shuffle(cells)
+    return [((i + rng.random()) / n, (j + rng.random()) / n) for i, j in cells[:samples]]
+
+
+def ray_table(camera_desc: dict, width: int, height: int,
+              samples: List[Tuple[float, float]]) -> List[Ray]:
+    """Alle Primärstrahlen, Zeile für Zeile und je Pixel alle Samples"""
+    camera = Camera(Vec3(*camera_desc["lookfrom"]), Vec3(*camera_desc["lookat"]),
+                    Vec3(*camera_desc["vup"]), camera_desc["vfov"], camera_desc["aspect_ratio"])
+    return [camera.get_ray((i + du) / width, (j + dv) / height)
+            for j in range(height) for i in range(width) for du, dv in samples]
+
+
+def _table_sizeof(table: list) -> int:
+    # Alle Einträge sind gleich aufgebaut, einer reicht zum Schätzen
+    return sys.getsizeof(table) + len(table) * deep_sizeof(table[0]) if table else sys.getsizeof(table)
+
+# ============================================================================
+# Auftrag im Worker
+# ============================================================================
+
+def encode_ppm(width: int, height: int, pixels: List[Vec3]) -> bytes:
+    """Wie write_ppm, aber als Bytes"""
+    data = bytearray(f"P6\n{width} {height}\n255\n".encode())
+    for pixel in pixels:
+        data += struct.pack('BBB',
+                            int(255 * math.sqrt(max(0, min(1, pixel.x)))),
+                            int(255 * math.sqrt(max(0, min(1, pixel.y)))),
+                            int(255 * math.sqrt(max(0, min(1, pixel.z)))))
+    return bytes(data)
+
+
+def run_job(job: dict, cache: LRUCache) -> Tuple[bytes, dict]:
+    """Rendert einen Auftrag mit allem, was der Cache schon hat"""
+    width, height = job["width"], job["height"]
+    samples = job.get("samples", 1)
+    camera_desc = job.get("camera") or default_camera(width, height)
+    stats = {}
+
+    start = time.perf_counter()
+    scene_key = content_hash("scene", job["scene"])
+    scene, stats["scene_cached"] = cache.get_or_build(scene_key, lambda: compile_scene(job["scene"]))
+    sample_key = content_hash("samples", [samples, job.get("seed", 0)])
+    offsets, stats["samples_cached"] = cache.get_or_build(
+        sample_key, lambda: sample_table(samples, job.get("seed", 0)), _table_sizeof)
+    rays_key = content_hash("rays", [camera_desc, width, height, sample_key])
+    rays, stats["rays_cached"] = cache.get_or_build(
+        rays_key, lambda: ray_table(camera_desc, width, height, offsets), _table_sizeof)
+    stats["setup_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tracer = RayTracer(scene, None, max_depth=job.get("max_depth", 3))
+    pixels = []
+    count = len(offsets)
+    for p in range(width * height):
+        color = Vec3(0, 0, 0)
+        for ray in rays[p * count:(p + 1) * count]:
+            color = color + tracer.trace(ray)
+        pixels.append(color / count if count > 1 else color)
+    stats["render_seconds"] = time.perf_counter() - start
+    stats["cache"] = cache.summary()
+    return encode_ppm(width, height, pixels), stats
+
+
+def _worker_main(tasks, results, max_bytes: int):
+    cache = LRUCache(max_bytes)
+    while True:
+        item = tasks.get()
+        if item is None:
+            return
+        job_id, job = item
+        try:
+            ppm, stats = run_job(job, cache)
+            stats["worker"] = multiprocessing.current_process().name
+            results.put((job_id, True, (ppm, stats)))
+        except Exception as e:
+            results.put((job_id, False, f"{type(e).__name__}: {e}"))
+
+# ============================================================================
+# Pool
+# ============================================================================
+
+class WarmPool:
+    """Feste Anzahl langlebiger Worker, jeder mit eigenem LRUCache
+
+    Aufträge werden nach Kamera, Auflösung und Samples einem Worker
+    zugeordnet, damit dessen Cache die Strahlentabelle schon kennt.
+    Stirbt ein Worker, scheitern seine offenen Aufträge mit RuntimeError
+    und der Collector startet ihn (mit leerem Cache) neu.
+    """
+    def __init__(self, workers: int = 2, max_bytes: int = 256 << 20, poll: float = 0.2):
+        self.max_bytes = max_bytes
+        self.poll = poll
+        self.results = multiprocessing.Queue()
+        self.tasks: List[multiprocessing.Queue] = [None] * workers
+        self.processes: List[multiprocessing.Process] = [None] * workers
+        self.assigned: List[set] = [set() for _ in range(workers)]
+        self.restarts = [0] * workers
+        for i in range(workers):
+            self._start_worker(i)
+        self.futures: Dict[int, Future] = {}
+        self.next_id = 0
+        self.closing = False
+        self.lock = threading.Lock()
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+
+    def _start_worker(self, i: int):
+        # Neue Queue: Aufträge in der alten gehörten dem toten Worker
+        self.tasks[i] = multiprocessing.Queue()
+        self.processes[i] = multiprocessing.Process(target=_worker_main,
+                                                    args=(self.tasks[i], self.results, self.max_bytes),
+                                                    name=f"warm-{i}", daemon=True)
+        self.processes[i].start()
+
+    def _collect(self):
+        checked = time.monotonic()
+        while True:
+            # Auch bei stetem Ergebnisstrom regelmäßig nach toten Workern sehen
+            if time.monotonic() - checked >= self.poll:
+                self._check_workers()
+                checked = time.monotonic()
+            try:
+                item = self.results.get(timeout=self.poll)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            job_id, ok, value = item
+            with self.lock:
+                future = self.futures.pop(job_id, None)
+                for assigned in self.assigned:
+                    assigned.discard(job_id)
+            if future is None:
+                continue  # Auftrag schon wegen Absturz gescheitert
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(value))
+
+    def _check_workers(self):
+        """Startet tote Worker neu und lässt deren offene Aufträge scheitern"""
+        failed = []
+        with self.lock:
+            if self.closing:
+                return
+            for i, proc in enumerate(self.processes):
+                if proc.is_alive():
+                    continue
+                proc.join()
+                self.restarts[i] += 1
+                error = RuntimeError(f"Worker {proc.name} abgestürzt (Exitcode {proc.exitcode})")
+                failed += [(self.futures.pop(job_id), error) for job_id in self.assigned[i]]
+                self.assigned[i].clear()
+                self._start_worker(i)
+        for future, error in failed:
+            future.set_exception(error)
+
+    def submit(self, job: dict) -> Future:
+        """Stellt einen Auftrag ein; Future liefert (PPM-Bytes, Statistik)"""
+        future = Future()
+        with self.lock:
+            job_id = self.next_id
+            self.next_id += 1
+            self.futures[job_id] = future
+        width, height = job["width"], job["height"]
+        affinity = content_hash("rays", [job.get("camera") or default_camera(width, height), width, height,
+                                         job.get("samples", 1), job.get("seed", 0)])
+        worker = int(affinity.split(":")[1][:8], 16) % len(self.tasks)
+        with self.lock:
+            self.assigned[worker].add(job_id)
+            self.tasks[worker].put((job_id, job))
+        return future
+
+    def render(self, job: dict) -> Tuple[bytes, dict]:
+        return self.submit(job).result()
+
+    def close(self):
+        with self.lock:
+            self.closing = True
+        for q in self.tasks:
+            q.put(None)
+        for p in self.processes:
+            p.join()
+        self.results.put(None)
+        self.collector.join()
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    height = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+
+    pool = WarmPool(workers)
+    scene = cornell_box_description()
+    # Ähnliche Szene: anderer Kugelradius, gleiche Kamera
+    similar = json.loads(json.dumps(scene))
+    similar["objects"][-1]["radius"] = 80
+
+    try:
+        for name, desc in (("erster Render", scene), ("gleiche Szene", scene), ("ähnliche Szene", similar)):
+            start = time.perf_counter()
+            ppm, stats = pool.render({"scene": desc, "width": width, "height": height})
+            print(f"{name}: {time.perf_counter() - start:.2f} s (Vorbereitung {stats['setup_seconds']:.3f} s, "
+                  f"Szene {'Cache' if stats['scene_cached'] else 'neu'}, "
+                  f"Strahlen {'Cache' if stats['rays_cached'] else 'neu'}, {stats['worker']})")
+        with open("cornell_box.ppm", "wb") as f:
+            f.write(ppm)
+        print("Bild gespeichert als 'cornell_box.ppm'")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Zusatzausgaben (AOVs) für V6CodeEdited.py in einem einzigen Renderdurchlauf
+
+Neben dem Bild füllt AOVRaytracer auf Wunsch weitere Puffer vom ersten
+Treffer: Tiefe, Normale, Albedo, Objekt- und Material-ID, direktes und
+indirektes Licht sowie die Sample-Anzahl. Alle Puffer landen in einem
+mehrkanaligen float32-Array (H, W, C) und werden als NPZ (ein Array plus
+Kanalnamen) oder als geschichtete PFM-Dateien (eine Datei pro AOV)
+gespeichert.
+
+Ohne aktivierte AOVs rendert AOVRaytracer exakt wie Raytracer. Mit AOVs wird
+nur die erste Ebene von trace in trace_first nachgebildet, um direktes und
+indirektes Licht zu trennen; alle tieferen Ebenen laufen unverändert über
+trace.
+
+Aufruf:
+    python V6AOV.py [AOVs, z.B. depth,normal,albedo] [Ausgabe.npz|.pfm]
+"""
+
+import math
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from V6CodeEdited import Vec3, Ray, Raytracer, random, setup_cornell_box
+
+# ============= AOV-Definitionen =============
+# Name -> Anzahl Kanäle; "color" ist immer enthalten
+AOV_CHANNELS = {
+    "color": 3,
+    "depth": 1,
+    "normal": 3,
+    "albedo": 3,
+    "object_id": 1,
+    "material_id": 1,
+    "direct": 3,
+    "indirect": 3,
+    "samples": 1,
+}
+ALL_AOVS = [name for name in AOV_CHANNELS if name != "color"]
+
+def channel_names(aovs: List[str]) -> List[str]:
+    """Kanalnamen des Gesamtpuffers, z.B. color.r, depth, normal.x"""
+    suffixes = {1: [""], 3: [".r", ".g", ".b"]}
+    names = []
+    for aov in ["color"] + aovs:
+        parts = [".x", ".y", ".z"] if aov == "normal" else suffixes[AOV_CHANNELS[aov]]
+        names += [aov + s for s in parts]
+    return names
+
+# ============= Speichern =============
+def write_pfm(filename: str, data: np.ndarray):
+    """PFM mit 1 (Pf) oder 3 (PF) Kanälen, little endian, unterste Zeile zuerst"""
+    data = np.asarray(data, dtype=np.float32)
+    channels = 1 if data.ndim == 2 else data.shape[2]
+    with open(filename, 'wb') as f:
+        f.write(f"{'PF' if channels == 3 else 'Pf'}\n{data.shape[1]} {data.shape[0]}\n-1.0\n".encode())
+        f.write(np.ascontiguousarray(data[::-1]).astype('<f4').tobytes())
+
+def save_aovs(filename: str, buffer: np.ndarray, aovs: List[str]) -> List[str]:
+    """Speichert den AOV-Puffer als NPZ oder als PFM-Schichten"""
+    if filename.endswith(".pfm"):
+        stem = filename[:-len(".pfm")]
+        written, c = [], 0
+        for aov in ["color"] + aovs:
+            n = AOV_CHANNELS[aov]
+            layer = buffer[:, :, c] if n == 1 else buffer[:, :, c:c + n]
+            path = f"{stem}.{aov}.pfm"
+            write_pfm(path, layer)
+            written.append(path)
+            c += n
+        return written
+    np.savez_compressed(filename, data=buffer, channels=np.array(channel_names(aovs)))
+    return [filename]
+
+def load_aovs(filename: str) -> Dict[str, np.ndarray]:
+    """Liest eine AOV-NPZ wieder ein: Name -> (H, W) oder (H, W, 3)"""
+    archive = np.load(filename)
+    data, names = archive["data"], list(archive["channels"])
+    result, c = {}, 0
+    while c < len(names):
+        aov = names[c].split(".")[0]
+        n = AOV_CHANNELS[aov]
+        result[aov] = data[:, :, c] if n == 1 else data[:, :, c:c + n]
+        c += n
+    return result
+
+# ============= Raytracer mit AOVs =============
+class AOVRaytracer(Raytracer):
+    def __init__(self, width: int, height: int, samples: int = 4, max_depth: int = 5,
+                 aovs: Optional[List[str]] = None):
+        super().__init__(width, height, samples, max_depth)
+        aovs = list(aovs or [])
+        unknown = [a for a in aovs if a not in AOV_CHANNELS or a == "color"]
+        if unknown:
+            raise ValueError(f"Unbekannte AOVs: {', '.join(unknown)}")
+        # Reihenfolge wie in AOV_CHANNELS, damit die Kanäle stabil bleiben
+        self.aovs = [a for a in ALL_AOVS if a in aovs]
+        self.buffer = None
+
+    def trace_first(self, ray: Ray) -> Tuple[Vec3, Vec3, Optional[tuple]]:
+        """Erste Ebene von trace, getrennt nach direktem und indirektem Licht
+
+        Gibt (direct, indirect, (record, obj)) zurück; direct + indirect
+        entspricht trace(ray, 0).
+        """
+        if self.max_depth <= 0:
+            return Vec3(0, 0, 0), Vec3(0, 0, 0), None
+
+        hit_result = self.scene.hit(ray, 0.001, float('inf'))
+        if not hit_result:
+            return Vec3(0.1, 0.1, 0.2), Vec3(0, 0, 0), None
+        record, obj = hit_result
+
+        if obj.material.emissive.norm() > 0:
+            return obj.material.emissive, Vec3(0, 0, 0), hit_result
+
+        direct = Vec3(0, 0, 0)
+        for light in self.scene.lights:
+            if light == obj:
+                continue
+            light_pos = light.center if hasattr(light, 'center') else light.corner + light.u * random() + light.v * random()
+            light_dir = (light_pos - record.point).normalize()
+            light_distance = (light_pos - record.point).norm()
+            shadow_ray = Ray(record.point + record.normal * 0.001, light_dir)
+            if not self.scene.hit(shadow_ray, 0.001, light_distance - 0.001):
+                diff = max(0, record.normal.dot(light_dir))
+                direct = direct + obj.material.color * light.material.emissive * diff
+
+        indirect = Vec3(0, 0, 0)
+        if obj.material.reflective > 0:
+            reflected = ray.direction - record.normal * 2 * ray.direction.dot(record.normal)
+            reflected_ray = Ray(record.point + record.normal * 0.001, reflected)
+            indirect = indirect + self.trace(reflected_ray, 1) * obj.material.reflective
+        if obj.material.reflective < 1:
+            scattered_dir = self.random_in_hemisphere(record.normal)
+            scattered_ray = Ray(record.point + record.normal * 0.001, scattered_dir)
+            indirect = indirect + obj.material.color * self.trace(scattered_ray, 1) * 0.5
+
+        return direct, indirect, hit_result
+
+    def render(self, filename: str):
+        # Kamera wie Raytracer.render
+        lookfrom = Vec3(278, 278, -800)
+        lookat = Vec3(278, 278, 0)
+        vup = Vec3(0, 1, 0)
+        w = (lookfrom - lookat).normalize()
+        u = vup.cross(w).normalize()
+        v = w.cross(u)
+        aspect = self.width / self.height
+        theta = 40 * math.pi / 180
+        half_height = math.tan(theta / 2)
+        half_width = aspect * half_height
+
+        aovs = self.aovs
+        want = set(aovs)
+        offsets, channels = {}, 0
+        for aov in ["color"] + aovs:
+            offsets[aov] = channels
+            channels += AOV_CHANNELS[aov]
+        self.buffer = np.zeros((self.height, self.width, channels), dtype=np.float32)
+        object_ids = {id(obj): i for i, obj in enumerate(self.scene.objects)}
+        material_ids = {}
+        for obj in self.scene.objects:
+            material_ids.setdefault(id(obj.material), len(material_ids))
+
+        # Offsets als lokale Variablen (-1 = AOV aus); summiert wird in einer
+        # Python-Liste, ins NumPy-Array geschrieben einmal pro Pixel
+        o_depth = offsets.get("depth", -1)
+        o_normal = offsets.get("normal", -1)
+        o_albedo = offsets.get("albedo", -1)
+        o_object = offsets.get("object_id", -1)
+        o_material = offsets.get("material_id", -1)
+        o_direct = offsets.get("direct", -1)
+        o_indirect = offsets.get("indirect", -1)
+        o_samples = offsets.get("samples", -1)
+        geometry = o_depth >= 0 or o_normal >= 0 or o_albedo >= 0
+
+        image_data = bytearray(self.width * self.height * 3)
+        for y in range(self.height):
+            for x in range(self.width):
+                color = Vec3(0, 0, 0)
+                acc = [0.0] * channels
+                hits = 0
+                for _ in range(self.samples):
+                    u_offset = (x + random()) / (self.width - 1) * 2 - 1
+                    v_offset = (y + random()) / (self.height - 1) * 2 - 1
+                    ray_dir = w * -1 + u * u_offset * half_width + v * v_offset * half_height
+                    ray = Ray(lookfrom, ray_dir.normalize())
+
+                    if not aovs:
+                        color = color + self.trace(ray, 0)
+                        continue
+
+                    direct, indirect, hit_result = self.trace_first(ray)
+                    color = color + direct + indirect
+                    if o_direct >= 0:
+                        acc[o_direct] += direct.x
+                        acc[o_direct + 1] += direct.y
+                        acc[o_direct + 2] += direct.z
+                    if o_indirect >= 0:
+                        acc[o_indirect] += indirect.x
+                        acc[o_indirect + 1] += indirect.y
+                        acc[o_indirect + 2] += indirect.z
+                    if hit_result is None:
+                        continue
+                    record, obj = hit_result
+                    hits += 1
+                    if geometry:
+                        if o_depth >= 0:
+                            acc[o_depth] += record.t
+                        if o_normal >= 0:
+                            acc[o_normal] += record.normal.x
+                            acc[o_normal + 1] += record.normal.y
+                            acc[o_normal + 2] += record.normal.z
+                        if o_albedo >= 0:
+                            acc[o_albedo] += obj.material.color.x
+                            acc[o_albedo + 1] += obj.material.color.y
+                            acc[o_albedo + 2] += obj.material.color.z
+                    # IDs lassen sich nicht mitteln: erstes Sample mit Treffer
+                    if hits == 1:
+                        if o_object >= 0:
+                            acc[o_object] = object_ids[id(obj)] + 1
+                        if o_material >= 0:
+                            acc[o_material] = material_ids[id(obj.material)] + 1
+
+                color = color / self.samples
+                if aovs:
+                    acc[0], acc[1], acc[2] = color.x, color.y, color.z
+                    for o in (o_direct, o_indirect):
+                        if o >= 0:
+                            acc[o] /= self.samples
+                            acc[o + 1] /= self.samples
+                            acc[o + 2] /= self.samples
+                    if hits:
+                        for o, n in ((o_depth, 1), (o_normal, 3), (o_albedo, 3)):
+                            if o >= 0:
+                                for k in range(o, o + n):
+                                    acc[k] /= hits
+                    # ohne Treffer -1
+                    for o in (o_object, o_material):
+                        if o >= 0:
+                            acc[o] -= 1
+                    if o_samples >= 0:
+                        acc[o_samples] = self.samples
+                    self.buffer[y, x] = acc
+                else:
+                    self.buffer[y, x] = (color.x, color.y, color.z)
+
+                # Gammakorrektur wie Raytracer.render
+                idx = (y * self.width + x) * 3
+                image_data[idx] = min(255, int(math.sqrt(color.x) * 255))
+                image_data[idx + 1] = min(255, int(math.sqrt(color.y) * 255))
+                image_data[idx + 2] = min(255, int(math.sqrt(color.z) * 255))
+            print(f"Zeile {y + 1}/{self.height}", end='\r')
+        print()
+
+        if "normal" in want:
+            n = self.buffer[:, :, offsets["normal"]:offsets["normal"] + 3]
+            length = np.linalg.norm(n, axis=2, keepdims=True)
+            n /= np.where(length > 0, length, 1.0)
+
+        with open(filename, 'wb') as f:
+            f.write(f'P6\n{self.width} {self.height}\n255\n'.encode())
+            f.write(bytes(image_data))
+
+# ============= Hauptprogramm =============
+def main():
+    aovs = sys.argv[1].split(",") if len(sys.argv) > 1 else ALL_AOVS
+    output = sys.argv[2] if len(sys.argv) > 2 else "cornell_box_aov.npz"
+
+    rt = AOVRaytracer(400, 300, samples=4, max_depth=5, aovs=aovs)
+    setup_cornell_box(rt.scene)
+
+    start = time.perf_counter()
+    rt.render("cornell_box.ppm")
+    print(f"Renderzeit: {time.perf_counter() - start:.1f} s")
+    for path in save_aovs(output, rt.buffer, rt.aovs):
+        print(f"AOVs gespeichert: {path}")
+
+if __name__ == "__main__":
+    main()
@@ -256,10 +256,7 @@ class Raytracer:
 def random():
     return random_module.random()
 
-def main():
-    # Szene erstellen (Cornell-Box Variante)
-    rt = Raytracer(400, 300, samples=4, max_depth=5)
-    
+def setup_cornell_box(scene: Scene):
     # Materialien
     white = Material(Vec3(0.8, 0.8, 0.8))
     red = Material(Vec3(0.8, 0.2, 0.2))
@@ -268,18 +265,23 @@ def main():
     mirror = Material(Vec3(0.9, 0.9, 0.9), reflective=0.9)
     
     # Wände
-    rt.scene.add_object(Quad(Vec3(0, 0, 0), Vec3(550, 0, 0), Vec3(0, 550, 0), white))  # Boden
-    rt.scene.add_object(Quad(Vec3(0, 550, 0), Vec3(550, 0, 0), Vec3(0, 0, 550), white))  # Decke
-    rt.scene.add_object(Quad(Vec3(0, 0, 0), Vec3(0, 0, 550), Vec3(0, 550, 0), green))  # Linke Wand
-    rt.scene.add_object(Quad(Vec3(550, 0, 0), Vec3(0, 0, 550), Vec3(0, 550, 0), red))  # Rechte Wand
-    rt.scene.add_object(Quad(Vec3(0, 0, 550), Vec3(550, 0, 0), Vec3(0, 550, 0), white))  # Hintere Wand
+    scene.add_object(Quad(Vec3(0, 0, 0), Vec3(550, 0, 0), Vec3(0, 550, 0), white))  # Boden
+    scene.add_object(Quad(Vec3(0, 550, 0), Vec3(550, 0, 0), Vec3(0, 0, 550), white))  # Decke
+    scene.add_object(Quad(Vec3(0, 0, 0), Vec3(0, 0, 550), Vec3(0, 550, 0), green))  # Linke Wand
+    scene.add_object(Quad(Vec3(550, 0, 0), Vec3(0, 0, 550), Vec3(0, 550, 0), red))  # Rechte Wand
+    scene.add_object(Quad(Vec3(0, 0, 550), Vec3(550, 0, 0), Vec3(0, 550, 0), white))  # Hintere Wand
     
     # Licht
-    rt.scene.add_object(Quad(Vec3(200, 549, 200), Vec3(150, 0, 0), Vec3(0, 0, 150), light))
+    scene.add_object(Quad(Vec3(200, 549, 200), Vec3(150, 0, 0), Vec3(0, 0, 150), light))
     
     # Objekte
-    rt.scene.add_object(Sphere(Vec3(200, 100, 300), 100, mirror))
-    rt.scene.add_object(Sphere(Vec3(350, 150, 200), 150, white))
+    scene.add_object(Sphere(Vec3(200, 100, 300), 100, mirror))
+    scene.add_object(Sphere(Vec3(350, 150, 200), 150, white))
+
+def main():
+    # Szene erstellen (Cornell-Box Variante)
+    rt = Raytracer(400, 300, samples=4, max_depth=5)
+    setup_cornell_box(rt.scene)
     
     # Rendern
     rt.render("cornell_box.ppm")
@@ -0,0 +1,336 @@
+"""
+Irradiance Cache (Ward) für V6CodeEdited.py
+
+Raytracer.trace schickt an jedem diffusen Treffer einen neuen zufälligen
+Hemisphären-Strahl los, obwohl sich das indirekte Licht über die flachen
+Wände der Cornell-Box kaum ändert. Hier wird die indirekte Bestrahlungsstärke
+an wenigen Punkten mit vielen geschichteten Strahlen berechnet, samt
+Rotations- und Translationsgradienten (Ward & Heckbert, "Irradiance
+Gradients", 1992), und in einem Octree abgelegt. Andere Trefferpunkte
+interpolieren daraus mit Wards Gewicht
+
+    w_i = 1 / (|p - p_i| / R_i + sqrt(1 - n·n_i))
+
+und nur wo kein Eintrag mit w_i > 1/a existiert, wird ein neuer berechnet.
+
+Abweichung vom Original: der Cache speichert die kosinusgewichtete
+Bestrahlungsstärke E (Lambert), der diffuse Anteil wird als
+Farbe * 0.5 * E / pi angesetzt. Bei gleichmäßig einfallendem Licht ist das
+identisch mit dem Erwartungswert von trace (gleichverteilte Richtungen).
+
+Aufruf:
+    python V6IrradianceCache.py [Genauigkeit a] [Breite] [Samples]
+"""
+
+import math
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from V6CodeEdited import Vec3, Ray, Raytracer, random, setup_cornell_box
+
+# ============= Cache-Einträge =============
+class IrradianceRecord:
+    __slots__ = ("point", "normal", "irradiance", "radius", "rot_grad", "trans_grad")
+
+    def __init__(self, point: Vec3, normal: Vec3, irradiance: Vec3, radius: float,
+                 rot_grad: Tuple[Vec3, Vec3, Vec3], trans_grad: Tuple[Vec3, Vec3, Vec3]):
+        self.point = point
+        self.normal = normal
+        self.irradiance = irradiance
+        self.radius = radius            # harmonisches Mittel der Trefferabstände
+        self.rot_grad = rot_grad        # Gradient je Farbkanal (r, g, b)
+        self.trans_grad = trans_grad
+
+# ============= Octree =============
+class OctreeNode:
+    """Loser Octree: ein Eintrag liegt im tiefsten Knoten, dessen halbe
+    Kantenlänge noch mindestens seinem Einflussradius entspricht. Da der
+    Einflussbereich so höchstens um eine halbe Kante über den Knoten
+    hinausragt, genügt bei der Suche der um die Hälfte vergrößerte Würfel.
+    Einträge außerhalb der Wurzel bleiben in der Wurzel."""
+    __slots__ = ("center", "half", "records", "children")
+
+    def __init__(self, center: Vec3, half: float):
+        self.center = center
+        self.half = half
+        self.records: List[IrradianceRecord] = []
+        self.children: Optional[List[Optional['OctreeNode']]] = None
+
+    def insert(self, record: IrradianceRecord, influence: float):
+        node = self
+        p = record.point
+        while node.half / 2 >= influence:
+            c = node.center
+            # außerhalb des Würfels (nur an der Wurzel möglich): hier ablegen
+            if abs(p.x - c.x) > node.half or abs(p.y - c.y) > node.half or abs(p.z - c.z) > node.half:
+                break
+            index = (p.x > c.x) | ((p.y > c.y) << 1) | ((p.z > c.z) << 2)
+            if node.children is None:
+                node.children = [None] * 8
+            child = node.children[index]
+            if child is None:
+                h = node.half / 2
+                child = OctreeNode(Vec3(c.x + (h if index & 1 else -h),
+                                        c.y + (h if index & 2 else -h),
+                                        c.z + (h if index & 4 else -h)), h)
+                node.children[index] = child
+            node = child
+        node.records.append(record)
+
+    def lookup(self, p: Vec3, out: List[IrradianceRecord]):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            out.extend(node.records)
+            if node.children is None:
+                continue
+            for child in node.children:
+                if child is None:
+                    continue
+                reach = child.half * 2   # halbe Kante + Überhang
+                c = child.center
+                if abs(p.x - c.x) <= reach and abs(p.y - c.y) <= reach and abs(p.z - c.z) <= reach:
+                    stack.append(child)
+
+# ============= Irradiance Cache =============
+class IrradianceCache:
+    def __init__(self, center: Vec3, half: float, accuracy: float = 0.25,
+                 min_radius: float = 5.0, max_radius: float = 150.0):
+        self.root = OctreeNode(center, half)
+        self.accuracy = accuracy
+        self.min_radius = min_radius
+        self.max_radius = max_radius
+        self.count = 0
+        self.lookups = 0
+        self.misses = 0
+
+    def add(self, record: IrradianceRecord):
+        record.radius = min(max(record.radius, self.min_radius), self.max_radius)
+        self.root.insert(record, self.accuracy * record.radius)
+        self.count += 1
+
+    def interpolate(self, p: Vec3, n: Vec3) -> Optional[Vec3]:
+        """Gewichtetes Mittel gültiger Einträge oder None"""
+        self.lookups += 1
+        candidates: List[IrradianceRecord] = []
+        self.root.lookup(p, candidates)
+        inv_a = 1.0 / self.accuracy
+        total_w = 0.0
+        r = g = b = 0.0
+        for rec in candidates:
+            d = p - rec.point
+            dist = d.norm()
+            ndot = n.dot(rec.normal)
+            if ndot <= 0.0:
+                continue
+            error = dist / rec.radius + math.sqrt(max(0.0, 1.0 - ndot))
+            if error * inv_a >= 1.0:
+                continue
+            # Punkt liegt vor dem Eintrag (Ward): nicht verwenden
+            if d.dot(n + rec.normal) * 0.5 < -0.01 * rec.radius:
+                continue
+            w = 1.0 / max(error, 1e-6)
+            axis = rec.normal.cross(n)
+            gr, gg, gb = rec.rot_grad
+            tr, tg, tb = rec.trans_grad
+            e = rec.irradiance
+            r += w * (e.x + axis.dot(gr) + d.dot(tr))
+            g += w * (e.y + axis.dot(gg) + d.dot(tg))
+            b += w * (e.z + axis.dot(gb) + d.dot(tb))
+            total_w += w
+        if total_w == 0.0:
+            self.misses += 1
+            return None
+        return Vec3(max(0.0, r / total_w), max(0.0, g / total_w), max(0.0, b / total_w))
+
+# ============= Raytracer mit Cache =============
+def tangent_frame(n: Vec3) -> Tuple[Vec3, Vec3]:
+    a = Vec3(1, 0, 0) if abs(n.x) < 0.9 else Vec3(0, 1, 0)
+    t = n.cross(a).normalize()
+    return t, n.cross(t)
+
+class IrradianceCacheRaytracer(Raytracer):
+    def __init__(self, width: int, height: int, samples: int = 4, max_depth: int = 5,
+                 accuracy: float = 0.25, strata: Tuple[int, int] = (4, 16),
+                 cache_depth: int = 1):
+        super().__init__(width, height, samples, max_depth)
+        self.accuracy = accuracy
+        self.strata = strata            # (M Ringe in theta, N Sektoren in phi)
+        self.cache_depth = cache_depth  # Cache für Treffer mit depth < cache_depth
+        self.cache: Optional[IrradianceCache] = None
+
+    def build_cache(self):
+        lo = Vec3(float('inf'), float('inf'), float('inf'))
+        hi = Vec3(float('-inf'), float('-inf'), float('-inf'))
+        for obj in self.scene.objects:
+            if hasattr(obj, 'center'):
+                pts = [obj.center - Vec3(obj.radius, obj.radius, obj.radius),
+                       obj.center + Vec3(obj.radius, obj.radius, obj.radius)]
+            else:
+                # Quad.hit rechnet mit w = v x u / |u x v|^2, die getroffene
+                # Fläche liegt daher bei corner - u - v; beide Seiten abdecken
+                pts = [obj.corner + obj.u * a + obj.v * b for a in (-1, 1) for b in (-1, 1)]
+            for q in pts:
+                lo = Vec3(min(lo.x, q.x), min(lo.y, q.y), min(lo.z, q.z))
+                hi = Vec3(max(hi.x, q.x), max(hi.y, q.y), max(hi.z, q.z))
+        half = max(hi.x - lo.x, hi.y - lo.y, hi.z - lo.z) / 2 + 1.0
+        self.cache = IrradianceCache((lo + hi) * 0.5, half, self.accuracy)
+
+    def compute_record(self, point: Vec3, normal: Vec3, depth: int) -> IrradianceRecord:
+        """Geschichtete Hemisphäre, Werte und Gradienten nach Ward & Heckbert"""
+        M, N = self.strata
+        t1, t2 = tangent_frame(normal)
+        origin = point + normal * 0.001
+        L = [[None] * N for _ in range(M)]
+        dist = [[0.0] * N for _ in range(M)]
+        tan_theta = [[0.0] * N for _ in range(M)]
+        inv_dist_sum = 0.0
+        for j in range(M):
+            for k in range(N):
+                sin_t = math.sqrt((j + random()) / M)
+                cos_t = math.sqrt(max(0.0, 1.0 - sin_t * sin_t))
+                phi = 2 * math.pi * (k + random()) / N
+                direction = (t1 * (sin_t * math.cos(phi)) + t2 * (sin_t * math.sin(phi))
+                             + normal * cos_t)
+                ray = Ray(origin, direction)
+                hit = self.scene.hit(ray, 0.001, float('inf'))
+                d = hit[0].t if hit else float('inf')
+                dist[j][k] = d
+                inv_dist_sum += 1.0 / d
+                L[j][k] = self.trace(ray, depth + 1)
+                tan_theta[j][k] = sin_t / max(cos_t, 1e-6)
+
+        scale = math.pi / (M * N)
+        e = Vec3(0, 0, 0)
+        for j in range(M):
+            for k in range(N):
+                e = e + L[j][k]
+        e = e * scale
+
+        # Rotationsgradient: pi/(MN) * sum_k v_k * sum_j (-tan theta_j * L_jk)
+        rot = [Vec3(0, 0, 0), Vec3(0, 0, 0), Vec3(0, 0, 0)]
+        trans = [Vec3(0, 0, 0), Vec3(0, 0, 0), Vec3(0, 0, 0)]
+        for k in range(N):
+            phi_c = 2 * math.pi * (k + 0.5) / N
+            phi_b = 2 * math.pi * k / N
+            u_k = t1 * math.cos(phi_c) + t2 * math.sin(phi_c)
+            v_k = t1 * -math.sin(phi_c) + t2 * math.cos(phi_c)
+            v_b = t1 * -math.sin(phi_b) + t2 * math.cos(phi_b)
+            sr = sg = sb = 0.0
+            for j in range(M):
+                sr -= tan_theta[j][k] * L[j][k].x
+                sg -= tan_theta[j][k] * L[j][k].y
+                sb -= tan_theta[j][k] * L[j][k].z
+            rot[0] = rot[0] + v_k * (sr * scale)
+            rot[1] = rot[1] + v_k * (sg * scale)
+            rot[2] = rot[2] + v_k * (sb * scale)
+
+            # Translationsgradient: Grenzen zwischen Ringen (theta) ...
+            ar = ag = ab = 0.0
+            for j in range(1, M):
+                sin_b = math.sqrt(j / M)
+                cos_b2 = 1.0 - j / M
+                f = (2 * math.pi / N) * sin_b * cos_b2 / min(dist[j][k], dist[j - 1][k])
+                diff = L[j][k] - L[j - 1][k]
+                ar += f * diff.x
+                ag += f * diff.y
+                ab += f * diff.z
+            # ... und zwischen Sektoren (phi)
+            br = bg = bb = 0.0
+            for j in range(M):
+                f = (math.sqrt((j + 1) / M) - math.sqrt(j / M)) / min(dist[j][k], dist[j][k - 1])
+                diff = L[j][k] - L[j][k - 1]
+                br += f * diff.x
+                bg += f * diff.y
+                bb += f * diff.z
+            trans[0] = trans[0] + u_k * ar + v_b * br
+            trans[1] = trans[1] + u_k * ag + v_b * bg
+            trans[2] = trans[2] + u_k * ab + v_b * bb
+
+        radius = (M * N) / inv_dist_sum if inv_dist_sum > 0 else float('inf')
+        # Radius begrenzen, wo der Gradient eine starke Änderung vorhersagt
+        lum = 0.2126 * e.x + 0.7152 * e.y + 0.0722 * e.z
+        grad = (trans[0] * 0.2126 + trans[1] * 0.7152 + trans[2] * 0.0722).norm()
+        if grad > 0:
+            radius = min(radius, lum / grad)
+        return IrradianceRecord(point, normal, e, radius, tuple(rot), tuple(trans))
+
+    def indirect_irradiance(self, point: Vec3, normal: Vec3, depth: int) -> Vec3:
+        e = self.cache.interpolate(point, normal)
+        if e is None:
+            record = self.compute_record(point, normal, depth)
+            self.cache.add(record)
+            e = record.irradiance
+        return e
+
+    def trace(self, ray: Ray, depth: int) -> Vec3:
+        if depth >= self.max_depth:
+            return Vec3(0, 0, 0)
+
+        hit_result = self.scene.hit(ray, 0.001, float('inf'))
+        if not hit_result:
+            return Vec3(0.1, 0.1, 0.2)  # Hintergrund
+
+        record, obj = hit_result
+
+        # Emission
+        if obj.material.emissive.norm() > 0:
+            return obj.material.emissive
+
+        # Direkte Beleuchtung wie Raytracer.trace
+        color = Vec3(0, 0, 0)
+        for light in self.scene.lights:
+            if light == obj:
+                continue
+            light_pos = light.center if hasattr(light, 'center') else light.corner + light.u * random() + light.v * random()
+            light_dir = (light_pos - record.point).normalize()
+            light_distance = (light_pos - record.point).norm()
+            shadow_ray = Ray(record.point + record.normal * 0.001, light_dir)
+            shadow_hit = self.scene.hit(shadow_ray, 0.001, light_distance - 0.001)
+            if not shadow_hit:
+                diff = max(0, record.normal.dot(light_dir))
+                color = color + obj.material.color * light.material.emissive * diff
+
+        # Spiegelung
+        if obj.material.reflective > 0:
+            reflected = ray.direction - record.normal * 2 * ray.direction.dot(record.normal)
+            reflected_ray = Ray(record.point + record.normal * 0.001, reflected)
+            color = color + self.trace(reflected_ray, depth + 1) * obj.material.reflective
+
+        # Diffuse Reflexion: aus dem Cache oder wie bisher ein Zufallsstrahl
+        if obj.material.reflective < 1:
+            if depth < self.cache_depth:
+                e = self.indirect_irradiance(record.point, record.normal, depth)
+                color = color + obj.material.color * e * (0.5 / math.pi)
+            else:
+                scattered_dir = self.random_in_hemisphere(record.normal)
+                scattered_ray = Ray(record.point + record.normal * 0.001, scattered_dir)
+                color = color + obj.material.color * self.trace(scattered_ray, depth + 1) * 0.5
+
+        return color
+
+    def render(self, filename: str):
+        if self.cache is None:
+            self.build_cache()
+        super().render(filename)
+
+# ============= Hauptprogramm =============
+def main():
+    accuracy = float(sys.argv[1]) if len(sys.argv) > 1 else 0.25
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    samples = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    rt = IrradianceCacheRaytracer(width, width * 3 // 4, samples=samples, max_depth=5,
+                                  accuracy=accuracy)
+    setup_cornell_box(rt.scene)
+    start = time.perf_counter()
+    rt.render("cornell_box_ic.ppm")
+    print()
+    print(f"Renderzeit: {time.perf_counter() - start:.1f} s")
+    print(f"Cache: {rt.cache.count} Einträge, {rt.cache.lookups} Abfragen, "
+          f"{rt.cache.misses} Neuberechnungen")
+    print("Bild wurde als 'cornell_box_ic.ppm' gespeichert")
+
+if __name__ == "__main__":
+    main()
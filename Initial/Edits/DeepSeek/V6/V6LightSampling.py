@@ -0,0 +1,228 @@
+"""
+Lichtauswahl mit Alias-Tabelle und Lichtbaum für V6CodeEdited.py
+
+Raytracer.trace schießt an jedem Trefferpunkt einen Schattenstrahl zu jeder
+Lichtquelle in scene.lights. Bei vielen kleinen Lampen wächst die Zeit pro
+Trefferpunkt damit linear. Hier wird beim Kompilieren der Szene ein
+EmitterIndex gebaut, und pro Trefferpunkt wird nur eine Lampe gewählt; ihr
+Beitrag wird durch ihre Auswahlwahrscheinlichkeit geteilt. Der Erwartungswert
+ist derselbe wie die Summe über alle Lampen.
+
+- "alias": Alias-Tabelle (Vose) über die Leistung, Auswahl in O(1)
+- "tree": Lichtbaum (BVH über die Lampen), Abstieg in O(log n). Ein Kind
+  bekommt das Gewicht 0, wenn seine Hülle ganz unter der Tangentialebene
+  liegt, sonst seine Leistung.
+- "all": wie das Original (jede Lampe, zum Vergleich)
+
+Die Leistung einer Lampe ist der Mittelwert ihrer emissive-Werte. trace
+gewichtet den Beitrag nicht mit Fläche oder Abstand, daher gehen beide auch
+nicht in die Auswahl ein.
+
+Aufruf:
+    python V6LightSampling.py [alias|tree|all] [Lampen pro Seite] [Breite] [Samples]
+"""
+
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from V6CodeEdited import Vec3, Ray, Sphere, Quad, Material, Scene, Raytracer, random, setup_cornell_box
+
+# ============= Alias-Tabelle =============
+class AliasTable:
+    """Diskrete Verteilung mit Auswahl in O(1) (Vose)"""
+    def __init__(self, weights: List[float]):
+        n = len(weights)
+        total = sum(weights)
+        if n == 0 or total <= 0:
+            raise ValueError("Alias-Tabelle braucht positive Gewichte")
+        self.pmf = [w / total for w in weights]
+        scaled = [p * n for p in self.pmf]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, s in enumerate(scaled) if s < 1.0]
+        large = [i for i, s in enumerate(scaled) if s >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Reste sind durch Rundung ~1
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, u: float) -> int:
+        """Index für eine gleichverteilte Zahl u in [0, 1)"""
+        n = len(self.prob)
+        scaled = u * n
+        i = min(int(scaled), n - 1)
+        return i if scaled - i < self.prob[i] else self.alias[i]
+
+# ============= Lichtbaum =============
+def emitter_bounds(obj) -> Tuple[Vec3, Vec3]:
+    if isinstance(obj, Sphere):
+        r = Vec3(obj.radius, obj.radius, obj.radius)
+        return obj.center - r, obj.center + r
+    corners = [obj.corner, obj.corner + obj.u, obj.corner + obj.v, obj.corner + obj.u + obj.v]
+    return (Vec3(min(c.x for c in corners), min(c.y for c in corners), min(c.z for c in corners)),
+            Vec3(max(c.x for c in corners), max(c.y for c in corners), max(c.z for c in corners)))
+
+class LightNode:
+    def __init__(self, items: List[Tuple[int, Vec3, Vec3, float]]):
+        self.lo = Vec3(min(i[1].x for i in items), min(i[1].y for i in items), min(i[1].z for i in items))
+        self.hi = Vec3(max(i[2].x for i in items), max(i[2].y for i in items), max(i[2].z for i in items))
+        self.power = sum(i[3] for i in items)
+        self.light = items[0][0] if len(items) == 1 else None
+        self.left = self.right = None
+        if self.light is None:
+            # Teilung am Median der Mittelpunkte entlang der längsten Achse
+            extent = self.hi - self.lo
+            axis = max(('x', 'y', 'z'), key=lambda a: getattr(extent, a))
+            items = sorted(items, key=lambda i: getattr(i[1], axis) + getattr(i[2], axis))
+            half = len(items) // 2
+            self.left = LightNode(items[:half])
+            self.right = LightNode(items[half:])
+
+    def importance(self, point: Vec3, normal: Vec3) -> float:
+        """Leistung, oder 0 wenn die Hülle ganz unter der Tangentialebene liegt"""
+        for x in (self.lo.x, self.hi.x):
+            for y in (self.lo.y, self.hi.y):
+                for z in (self.lo.z, self.hi.z):
+                    if (x - point.x) * normal.x + (y - point.y) * normal.y + (z - point.z) * normal.z > 0:
+                        return self.power
+        return 0.0
+
+# ============= Index =============
+def emitter_power(obj) -> float:
+    e = obj.material.emissive
+    return (e.x + e.y + e.z) / 3
+
+class EmitterIndex:
+    """Einmal pro Szene gebaut: Lampenliste, Alias-Tabelle und Lichtbaum"""
+    def __init__(self, lights: list):
+        self.lights = list(lights)
+        powers = [emitter_power(l) for l in self.lights]
+        self.table = AliasTable(powers) if self.lights else None
+        self.tree = LightNode([(i, *emitter_bounds(l), p) for i, (l, p) in enumerate(zip(self.lights, powers))]) \
+            if self.lights else None
+
+    def sample_alias(self) -> Tuple[Optional[object], float]:
+        if self.table is None:
+            return None, 0.0
+        i = self.table.sample(random())
+        return self.lights[i], self.table.pmf[i]
+
+    def sample_tree(self, point: Vec3, normal: Vec3) -> Tuple[Optional[object], float]:
+        node, pmf = self.tree, 1.0
+        if node is None or node.importance(point, normal) == 0:
+            return None, 0.0
+        while node.light is None:
+            left = node.left.importance(point, normal)
+            right = node.right.importance(point, normal)
+            if left + right == 0:
+                return None, 0.0  # Ecken des Elternknotens über der Ebene, keine Kindhülle
+            p_left = left / (left + right)
+            if random() < p_left:
+                node, pmf = node.left, pmf * p_left
+            else:
+                node, pmf = node.right, pmf * (1 - p_left)
+        return self.lights[node.light], pmf
+
+# ============= Raytracer =============
+class SampledRaytracer(Raytracer):
+    """Raytracer, der pro Trefferpunkt eine Lampe über den EmitterIndex wählt"""
+    def __init__(self, width: int, height: int, samples: int = 4, max_depth: int = 5, strategy: str = "alias"):
+        super().__init__(width, height, samples, max_depth)
+        if strategy not in ("alias", "tree", "all"):
+            raise ValueError(f"Unbekannte Strategie: {strategy}")
+        self.strategy = strategy
+        self.index = None
+
+    def compile(self):
+        self.index = EmitterIndex(self.scene.lights)
+
+    def render(self, filename: str):
+        self.compile()
+        super().render(filename)
+
+    def direct(self, record, obj, light) -> Vec3:
+        """Beitrag einer Lampe wie in Raytracer.trace"""
+        if light == obj:
+            return Vec3(0, 0, 0)
+        light_pos = light.center if hasattr(light, 'center') else light.corner + light.u * random() + light.v * random()
+        light_dir = (light_pos - record.point).normalize()
+        light_distance = (light_pos - record.point).norm()
+        shadow_ray = Ray(record.point + record.normal * 0.001, light_dir)
+        if self.scene.hit(shadow_ray, 0.001, light_distance - 0.001):
+            return Vec3(0, 0, 0)
+        diff = max(0, record.normal.dot(light_dir))
+        return obj.material.color * light.material.emissive * diff
+
+    def trace(self, ray: Ray, depth: int) -> Vec3:
+        if self.strategy == "all":
+            return super().trace(ray, depth)
+        if self.index is None:
+            self.compile()
+        if depth >= self.max_depth:
+            return Vec3(0, 0, 0)
+
+        hit_result = self.scene.hit(ray, 0.001, float('inf'))
+        if not hit_result:
+            return Vec3(0.1, 0.1, 0.2)  # Hintergrund
+
+        record, obj = hit_result
+        if obj.material.emissive.norm() > 0:
+            return obj.material.emissive
+
+        # Direkte Beleuchtung: eine Lampe, geteilt durch ihre Wahrscheinlichkeit
+        if self.strategy == "alias":
+            light, pmf = self.index.sample_alias()
+        else:
+            light, pmf = self.index.sample_tree(record.point, record.normal)
+        color = self.direct(record, obj, light) / pmf if light is not None else Vec3(0, 0, 0)
+
+        if obj.material.reflective > 0:
+            reflected = ray.direction - record.normal * 2 * ray.direction.dot(record.normal)
+            reflected_ray = Ray(record.point + record.normal * 0.001, reflected)
+            color = color + self.trace(reflected_ray, depth + 1) * obj.material.reflective
+
+        if obj.material.reflective < 1:
+            scattered_dir = self.random_in_hemisphere(record.normal)
+            scattered_ray = Ray(record.point + record.normal * 0.001, scattered_dir)
+            color = color + obj.material.color * self.trace(scattered_ray, depth + 1) * 0.5
+
+        return color
+
+# ============= Szene mit vielen Lampen =============
+def setup_many_lights(scene: Scene, per_side: int):
+    """Cornell-Box, Deckenlampe ersetzt durch per_side² kleine Lampen gleicher Gesamtleistung"""
+    setup_cornell_box(scene)
+    big = next(l for l in scene.lights if isinstance(l, Quad))
+    scene.objects.remove(big)
+    scene.lights.remove(big)
+    if per_side < 1:
+        return
+    size = 150 / per_side
+    light = Material(Vec3(1, 1, 1), emissive=big.material.emissive / (per_side * per_side))
+    for i in range(per_side):
+        for j in range(per_side):
+            corner = Vec3(200 + i * size + 0.1 * size, 549, 200 + j * size + 0.1 * size)
+            scene.add_object(Quad(corner, Vec3(0.8 * size, 0, 0), Vec3(0, 0, 0.8 * size), light))
+
+def main():
+    strategy = sys.argv[1] if len(sys.argv) > 1 else "alias"
+    per_side = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    width = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    samples = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+
+    rt = SampledRaytracer(width, width * 3 // 4, samples=samples, max_depth=5, strategy=strategy)
+    setup_many_lights(rt.scene, per_side)
+    print(f"{len(rt.scene.lights)} Lampen, Strategie '{strategy}'")
+    start = time.perf_counter()
+    rt.render("cornell_box_lights.ppm")
+    print()
+    print(f"Fertig nach {time.perf_counter() - start:.1f} s, gespeichert als 'cornell_box_lights.ppm'")
+
+if __name__ == "__main__":
+    main()
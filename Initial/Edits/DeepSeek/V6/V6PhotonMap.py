@@ -0,0 +1,441 @@
+"""
+Photon Mapping für Kaustiken in V6CodeEdited.py
+
+Die Spiegelkugel (Material "mirror") bündelt das Licht der Deckenlampe zu
+Kaustiken. Raytracer.trace findet diese nur, wenn ein zufälliger diffuser
+Strahl über den Spiegel genau die Lampe trifft, und braucht dafür sehr viele
+Samples. Hier läuft vorher ein Photonen-Durchgang (Jensen, "Realistic Image
+Synthesis Using Photon Mapping"):
+
+- Photonen starten auf den leuchtenden Objekten. Für die Kaustik-Karte
+  werden sie gezielt in die Kegel der spiegelnden Objekte geschickt und nur
+  auf Pfaden Licht -> Spiegel+ -> diffus gespeichert.
+- Optional eine globale Karte für indirektes Licht (mindestens eine diffuse
+  Reflexion vor dem Speichern), ausgewertet an sekundären diffusen Treffern
+  statt eines weiteren Zufallsstrahls.
+- Beide Karten liegen als k-d-Baum in flachen Listen vor; beim Shading wird
+  die Bestrahlungsstärke aus den k nächsten Photonen geschätzt (Kegelfilter).
+
+Damit nichts doppelt zählt, liefert trace für Pfade diffus -> Spiegel+ ->
+Licht kein Licht mehr, diese Beiträge stecken in der Kaustik-Karte. Die
+Photonen folgen dabei der indirekten Beleuchtung von trace: Strahldichte der
+Lampe = emissive, diffuse BRDF = Farbe * 0.5 / pi.
+
+Aufruf:
+    python V6PhotonMap.py [Kaustik-Photonen] [globale Photonen] [Breite] [Samples]
+"""
+
+import heapq
+import math
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from V6CodeEdited import Vec3, Ray, Scene, Raytracer, random, setup_cornell_box
+
+# Pfadzustand für trace: vom Auge bzw. nur über Spiegel, direkt nach einer
+# diffusen Reflexion, nach diffus und mindestens einem Spiegel
+PATH_EYE = 0
+PATH_DIFFUSE = 1
+PATH_CAUSTIC = 2
+
+LEAF_SIZE = 8
+CONE_FILTER = 1.1   # Jensens Kegelfilter, Gewicht 1 - d / (k * r)
+
+# ============= Photon Map =============
+class PhotonMap:
+    """Photonen in flachen Listen mit k-d-Baum über Indexbereichen
+
+    Ein Knoten ist ein Bereich [lo, hi) der sortierten Listen; der Median
+    mid = (lo + hi) // 2 teilt entlang axis[mid]. Bereiche mit höchstens
+    LEAF_SIZE Photonen werden linear durchsucht.
+    """
+    def __init__(self):
+        self.positions: List[Tuple[float, float, float]] = []
+        self.powers: List[Tuple[float, float, float]] = []
+        self.directions: List[Tuple[float, float, float]] = []
+        self.axis: List[int] = []
+
+    def __len__(self):
+        return len(self.positions)
+
+    def store(self, point: Vec3, power: Vec3, direction: Vec3):
+        self.positions.append((point.x, point.y, point.z))
+        self.powers.append((power.x, power.y, power.z))
+        self.directions.append((direction.x, direction.y, direction.z))
+
+    def build(self):
+        n = len(self.positions)
+        self.axis = [0] * n
+        if n == 0:
+            self.px = self.py = self.pz = []
+            return
+        pos = np.array(self.positions)
+        order = np.arange(n)
+        axis = np.zeros(n, dtype=np.int64)
+        stack = [(0, n)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            idx = order[lo:hi]
+            pts = pos[idx]
+            a = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+            mid = (lo + hi) // 2
+            order[lo:hi] = idx[np.argpartition(pts[:, a], mid - lo)]
+            axis[mid] = a
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+
+        # Python-Listen statt NumPy: skalare Zugriffe in der Suche sind schneller
+        pos = pos[order]
+        self.px, self.py, self.pz = pos[:, 0].tolist(), pos[:, 1].tolist(), pos[:, 2].tolist()
+        self.powers = np.array(self.powers)[order].tolist()
+        self.directions = np.array(self.directions)[order].tolist()
+        self.positions = pos.tolist()
+        self.axis = axis.tolist()
+
+    def nearest(self, p: Vec3, k: int, max_dist2: float) -> Tuple[List[Tuple[float, int]], float]:
+        """Bis zu k nächste Photonen im Radius: ([(-d2, index)], Suchradius²)"""
+        px, py, pz, axis = self.px, self.py, self.pz, self.axis
+        x, y, z = p.x, p.y, p.z
+        heap: List[Tuple[float, int]] = []
+        r2 = max_dist2
+
+        stack = [(0, len(px), 0.0)]
+        while stack:
+            lo, hi, plane_d2 = stack.pop()
+            if plane_d2 >= r2 or lo >= hi:
+                continue
+            if hi - lo <= LEAF_SIZE:
+                candidates = range(lo, hi)
+            else:
+                mid = (lo + hi) >> 1
+                a = axis[mid]
+                diff = x - px[mid] if a == 0 else (y - py[mid] if a == 1 else z - pz[mid])
+                if diff < 0:
+                    stack.append((mid + 1, hi, diff * diff))
+                    stack.append((lo, mid, 0.0))
+                else:
+                    stack.append((lo, mid, diff * diff))
+                    stack.append((mid + 1, hi, 0.0))
+                candidates = (mid,)
+            for i in candidates:
+                dx, dy, dz = x - px[i], y - py[i], z - pz[i]
+                d2 = dx * dx + dy * dy + dz * dz
+                if d2 >= r2:
+                    continue
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d2, i))
+                    if len(heap) == k:
+                        r2 = -heap[0][0]
+                else:
+                    heapq.heapreplace(heap, (-d2, i))
+                    r2 = -heap[0][0]
+        return heap, r2
+
+    def irradiance(self, p: Vec3, n: Vec3, k: int, max_dist: float) -> Vec3:
+        """Bestrahlungsstärke aus den k nächsten Photonen (Kegelfilter)"""
+        if not self.positions:
+            return Vec3(0, 0, 0)
+        found, r2 = self.nearest(p, k, max_dist * max_dist)
+        if not found:
+            return Vec3(0, 0, 0)
+        inv_kr = 1.0 / (CONE_FILTER * math.sqrt(r2))
+        r = g = b = 0.0
+        for neg_d2, i in found:
+            d = self.directions[i]
+            # nur Photonen, die von der Seite der Normalen kommen
+            if d[0] * n.x + d[1] * n.y + d[2] * n.z >= 0:
+                continue
+            w = 1.0 - math.sqrt(-neg_d2) * inv_kr
+            power = self.powers[i]
+            r += w * power[0]
+            g += w * power[1]
+            b += w * power[2]
+        scale = 1.0 / ((1.0 - 2.0 / (3.0 * CONE_FILTER)) * math.pi * r2)
+        return Vec3(r * scale, g * scale, b * scale)
+
+# ============= Photonen aussenden =============
+def tangent_frame(n: Vec3) -> Tuple[Vec3, Vec3]:
+    a = Vec3(1, 0, 0) if abs(n.x) < 0.9 else Vec3(0, 1, 0)
+    t = n.cross(a).normalize()
+    return t, n.cross(t)
+
+def cosine_direction(normal: Vec3) -> Vec3:
+    t1, t2 = tangent_frame(normal)
+    r = math.sqrt(random())
+    phi = 2 * math.pi * random()
+    return t1 * (r * math.cos(phi)) + t2 * (r * math.sin(phi)) + normal * math.sqrt(max(0.0, 1 - r * r))
+
+def reflect(direction: Vec3, normal: Vec3) -> Vec3:
+    return direction - normal * 2 * direction.dot(normal)
+
+def quad_side(quad) -> float:
+    """+1, wenn Quad.hit die Fläche corner + a*u + b*v trifft, sonst -1
+
+    Quad.w ist in V6CodeEdited als v x u / |u x v|^2 definiert, alpha und
+    beta haben dadurch das falsche Vorzeichen und getroffen wird die an
+    corner gespiegelte Fläche. Photonen müssen dort starten bzw. hinzielen,
+    wo Strahlen die Objekte auch treffen.
+    """
+    return 1.0 if quad.w.dot(quad.u.cross(quad.v)) > 0 else -1.0
+
+def sample_light(light) -> Tuple[Vec3, Vec3, float]:
+    """Zufälliger Punkt auf einer Lichtquelle: (Punkt, Normale, Fläche)"""
+    if hasattr(light, 'center'):
+        while True:
+            d = Vec3(2 * random() - 1, 2 * random() - 1, 2 * random() - 1)
+            if 0 < d.norm() <= 1:
+                break
+        normal = d.normalize()
+        return light.center + normal * light.radius, normal, 4 * math.pi * light.radius ** 2
+    point = light.corner + (light.u * random() + light.v * random()) * quad_side(light)
+    return point, light.normal, light.u.cross(light.v).norm()
+
+def light_powers(scene: Scene) -> List[float]:
+    """Emittierte Leistung (Helligkeit) je Lichtquelle"""
+    powers = []
+    for light in scene.lights:
+        e = light.material.emissive
+        area = sample_light(light)[2]
+        powers.append((e.x + e.y + e.z) / 3 * area * math.pi)
+    return powers
+
+def pick_light(scene: Scene, powers: List[float]):
+    """Lichtquelle proportional zur Leistung: (Licht, Wahrscheinlichkeit)"""
+    total = sum(powers)
+    xi = random() * total
+    for light, power in zip(scene.lights, powers):
+        if xi < power:
+            return light, power / total
+        xi -= power
+    return scene.lights[-1], powers[-1] / total
+
+def specular_targets(scene: Scene) -> List[Tuple[Vec3, float]]:
+    """Hüllkugeln (Mittelpunkt, Radius) der spiegelnden Objekte"""
+    targets = []
+    for obj in scene.objects:
+        if obj.material.reflective <= 0 or obj.material.emissive.norm() > 0:
+            continue
+        if hasattr(obj, 'center'):
+            targets.append((obj.center, obj.radius))
+        else:
+            diagonal = obj.u + obj.v
+            targets.append((obj.corner + diagonal * (0.5 * quad_side(obj)), diagonal.norm() / 2))
+    return targets
+
+def emit_caustic_photons(scene: Scene, count: int, max_bounces: int = 8) -> PhotonMap:
+    """Kaustik-Karte: Photonen gezielt auf die Spiegel, Pfade Licht -> Spiegel+ -> diffus
+
+    Die Richtung wird gleichverteilt im Kegel einer zufällig gewählten
+    Hüllkugel gezogen; die Dichte ist das Mittel über alle Kegel, in denen
+    die Richtung liegt, überlappende Kegel zählen also nicht doppelt.
+    """
+    photon_map = PhotonMap()
+    targets = specular_targets(scene)
+    if not scene.lights or not targets:
+        photon_map.build()
+        return photon_map
+    powers = light_powers(scene)
+
+    for _ in range(count):
+        light, p_light = pick_light(scene, powers)
+        origin, normal, area = sample_light(light)
+        origin = origin + normal * 0.01
+
+        cones = []
+        for center, radius in targets:
+            to_center = center - origin
+            dist = to_center.norm()
+            if dist <= radius:
+                continue
+            cos_max = math.sqrt(1 - (radius / dist) ** 2)
+            cones.append((to_center / dist, cos_max))
+        if not cones:
+            continue
+        axis, cos_max = cones[int(random() * len(cones))]
+        cos_t = 1 - random() * (1 - cos_max)
+        sin_t = math.sqrt(max(0.0, 1 - cos_t * cos_t))
+        phi = 2 * math.pi * random()
+        t1, t2 = tangent_frame(axis)
+        direction = t1 * (sin_t * math.cos(phi)) + t2 * (sin_t * math.sin(phi)) + axis * cos_t
+
+        cos_l = direction.dot(normal)
+        if cos_l <= 0:
+            continue
+        pdf = sum(1 / (2 * math.pi * (1 - c)) for a, c in cones if direction.dot(a) >= c) / len(cones)
+        power = light.material.emissive * (cos_l * area / (pdf * p_light * count))
+
+        # Spiegelkette verfolgen, am ersten diffusen Anteil speichern
+        ray = Ray(origin, direction)
+        specular = False
+        for _ in range(max_bounces):
+            hit = scene.hit(ray, 0.001, float('inf'))
+            if not hit:
+                break
+            record, obj = hit
+            material = obj.material
+            if material.emissive.norm() > 0:
+                break
+            if specular and material.reflective < 1:
+                photon_map.store(record.point, power, ray.direction)
+            # Russisches Roulette mit der Reflektivität, Leistung bleibt gleich
+            if material.reflective <= 0 or random() >= material.reflective:
+                break
+            ray = Ray(record.point + record.normal * 0.001, reflect(ray.direction, record.normal))
+            specular = True
+
+    photon_map.build()
+    return photon_map
+
+def emit_global_photons(scene: Scene, count: int, max_bounces: int = 8) -> PhotonMap:
+    """Globale Karte für indirektes Licht: gespeichert ab der zweiten diffusen Fläche"""
+    photon_map = PhotonMap()
+    if not scene.lights:
+        photon_map.build()
+        return photon_map
+    powers = light_powers(scene)
+
+    for _ in range(count):
+        light, p_light = pick_light(scene, powers)
+        origin, normal, area = sample_light(light)
+        power = light.material.emissive * (area * math.pi / (p_light * count))
+        ray = Ray(origin + normal * 0.01, cosine_direction(normal))
+
+        diffuse = False
+        for _ in range(max_bounces):
+            hit = scene.hit(ray, 0.001, float('inf'))
+            if not hit:
+                break
+            record, obj = hit
+            material = obj.material
+            if material.emissive.norm() > 0:
+                break
+            if diffuse and material.reflective < 1:
+                photon_map.store(record.point, power, ray.direction)
+
+            # Russisches Roulette: spiegeln, diffus streuen oder absorbieren
+            p_specular = material.reflective
+            p_diffuse = 0.0
+            if material.reflective < 1:
+                c = material.color
+                p_diffuse = (c.x + c.y + c.z) / 3 * 0.5
+            total = p_specular + p_diffuse
+            if total > 1:
+                p_specular, p_diffuse = p_specular / total, p_diffuse / total
+            xi = random()
+            if xi < p_specular:
+                power = power * (material.reflective / p_specular)
+                ray = Ray(record.point + record.normal * 0.001, reflect(ray.direction, record.normal))
+            elif xi < p_specular + p_diffuse:
+                power = power * (material.color * (0.5 / p_diffuse))
+                ray = Ray(record.point + record.normal * 0.001, cosine_direction(record.normal))
+                diffuse = True
+            else:
+                break
+
+    photon_map.build()
+    return photon_map
+
+# ============= Raytracer mit Photon Maps =============
+class PhotonMapRaytracer(Raytracer):
+    def __init__(self, width: int, height: int, samples: int = 4, max_depth: int = 5,
+                 caustic_photons: int = 50000, global_photons: int = 0,
+                 k: int = 50, caustic_radius: float = 15.0, global_radius: float = 50.0):
+        super().__init__(width, height, samples, max_depth)
+        self.caustic_photons = caustic_photons
+        self.global_photons = global_photons
+        self.k = k
+        self.caustic_radius = caustic_radius
+        self.global_radius = global_radius
+        self.caustic_map: Optional[PhotonMap] = None
+        self.global_map: Optional[PhotonMap] = None
+
+    def build_photon_maps(self):
+        self.caustic_map = emit_caustic_photons(self.scene, self.caustic_photons)
+        if self.global_photons > 0:
+            self.global_map = emit_global_photons(self.scene, self.global_photons)
+
+    def trace(self, ray: Ray, depth: int, state: int = PATH_EYE) -> Vec3:
+        if depth >= self.max_depth:
+            return Vec3(0, 0, 0)
+
+        hit_result = self.scene.hit(ray, 0.001, float('inf'))
+        if not hit_result:
+            return Vec3(0.1, 0.1, 0.2)  # Hintergrund
+
+        record, obj = hit_result
+
+        # Emission; diffus -> Spiegel+ -> Licht steckt in der Kaustik-Karte
+        if obj.material.emissive.norm() > 0:
+            return Vec3(0, 0, 0) if state == PATH_CAUSTIC else obj.material.emissive
+
+        # Direkte Beleuchtung wie Raytracer.trace
+        color = Vec3(0, 0, 0)
+        for light in self.scene.lights:
+            if light == obj:
+                continue
+            light_pos = light.center if hasattr(light, 'center') else light.corner + light.u * random() + light.v * random()
+            light_dir = (light_pos - record.point).normalize()
+            light_distance = (light_pos - record.point).norm()
+            shadow_ray = Ray(record.point + record.normal * 0.001, light_dir)
+            shadow_hit = self.scene.hit(shadow_ray, 0.001, light_distance - 0.001)
+            if not shadow_hit:
+                diff = max(0, record.normal.dot(light_dir))
+                color = color + obj.material.color * light.material.emissive * diff
+
+        # Spiegelung
+        if obj.material.reflective > 0:
+            reflected = ray.direction - record.normal * 2 * ray.direction.dot(record.normal)
+            reflected_ray = Ray(record.point + record.normal * 0.001, reflected)
+            child = PATH_EYE if state == PATH_EYE else PATH_CAUSTIC
+            color = color + self.trace(reflected_ray, depth + 1, child) * obj.material.reflective
+
+        # Diffuse Reflexion: Kaustiken aus der Karte, Rest wie bisher
+        if obj.material.reflective < 1:
+            brdf = obj.material.color * (0.5 / math.pi)
+            caustic = self.caustic_map.irradiance(record.point, record.normal, self.k, self.caustic_radius)
+            color = color + brdf * caustic
+            if self.global_map is not None and state != PATH_EYE:
+                indirect = self.global_map.irradiance(record.point, record.normal, self.k, self.global_radius)
+                color = color + brdf * indirect
+            else:
+                scattered_dir = self.random_in_hemisphere(record.normal)
+                scattered_ray = Ray(record.point + record.normal * 0.001, scattered_dir)
+                color = color + obj.material.color * self.trace(scattered_ray, depth + 1, PATH_DIFFUSE) * 0.5
+
+        return color
+
+    def render(self, filename: str):
+        if self.caustic_map is None:
+            self.build_photon_maps()
+        super().render(filename)
+
+# ============= Hauptprogramm =============
+def main():
+    caustic_photons = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    global_photons = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    width = int(sys.argv[3]) if len(sys.argv) > 3 else 400
+    samples = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+
+    rt = PhotonMapRaytracer(width, width * 3 // 4, samples=samples, max_depth=5,
+                            caustic_photons=caustic_photons, global_photons=global_photons)
+    setup_cornell_box(rt.scene)
+
+    start = time.perf_counter()
+    rt.build_photon_maps()
+    print(f"Photonen: {len(rt.caustic_map)} Kaustik, "
+          f"{len(rt.global_map) if rt.global_map else 0} global "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    start = time.perf_counter()
+    rt.render("cornell_box_photons.ppm")
+    print()
+    print(f"Renderzeit: {time.perf_counter() - start:.1f} s")
+    print("Bild wurde als 'cornell_box_photons.ppm' gespeichert")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 import math
+import os
 import struct
+import sys
 import zlib
 
+# Shared wall rectangles from Initial/Shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "..", "Shared"))
+import AxisRects as axis_rects
+
 
 # =========================
 # Math & Core Structures
@@ -89,6 +95,18 @@ class Plane:
         return None
 
 
+# =========================
+# Bounded walls (axis-aligned rectangles, Initial/Shared/AxisRects.py)
+# =========================
+
+RectX, RectY, RectZ = axis_rects.rect_classes(Vec3, direction="dir", t_min=1e-4)
+
+
+def planes_to_rects(objects, points=(), margin=4.0):
+    return axis_rects.planes_to_rects(objects, Plane, Sphere, (RectX, RectY, RectZ), points, margin,
+                                      plane_parts=lambda o: (o.p, o.n, o.mat))
+
+
 # =========================
 # Scene Setup
 # =========================
@@ -202,6 +220,10 @@ def main():
     scene.lights.append(Light(Vec3(0, 0.8, -1), 1.5))
 
     cam = Vec3(0, 0, 1)
+
+    # Replace the infinite wall planes by bounded rectangles
+    scene.objects = planes_to_rects(scene.objects, [cam] + [l.pos for l in scene.lights])
+
     pixels = []
 
     for y in range(H):
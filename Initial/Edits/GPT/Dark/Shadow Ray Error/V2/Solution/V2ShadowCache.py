@@ -0,0 +1,233 @@
+import math
+
+from V2codeFixed import Vec3, Ray, Material, Sphere, Plane, RectX, RectY, RectZ, Light, \
+    Scene, RayTracer, planes_to_rects, clamp
+
+# =========================
+# Visibility grid
+# =========================
+
+# In RayTracer.trace only objects other than walls (planes/rects) cast
+# shadows. For a static point light, a grid cell is VISIBLE if no such
+# object touches the shaft, i.e. the convex hull of the light and the cell:
+# every shadow ray from the cell then misses all occluders. Such points skip
+# the shadow ray; all other points use the exact test from trace.
+#
+# The shaft test looks for a separating axis among the box axes, the
+# direction light -> sphere center, the perpendiculars from the shaft edges
+# and from the closest box point to the center. If none separates, the
+# sphere counts as touching (conservative). Cells are classified on first
+# use, so only cells that actually contain hit points cost anything.
+
+VISIBLE = 0
+BOUNDARY = 1
+UNKNOWN = 2
+
+WALLS = (Plane, RectX, RectY, RectZ)
+
+
+class ShadowGrid:
+    def __init__(self, scene, light, lo, hi, resolution=32):
+        self.light = light
+        self.scene = scene
+        # Pad the bounds so points on the box walls fall inside the grid
+        margin = 1e-3 * max(hi.x - lo.x, hi.y - lo.y, hi.z - lo.z)
+        lo = lo - Vec3(margin, margin, margin)
+        hi = hi + Vec3(margin, margin, margin)
+        self.lo = lo
+        self.cell = max(hi.x - lo.x, hi.y - lo.y, hi.z - lo.z) / resolution
+        self.dims = (
+            max(1, math.ceil((hi.x - lo.x) / self.cell)),
+            max(1, math.ceil((hi.y - lo.y) / self.cell)),
+            max(1, math.ceil((hi.z - lo.z) / self.cell)),
+        )
+        self.occluders = [o for o in scene.objects if not isinstance(o, WALLS)]
+        if not all(isinstance(o, Sphere) for o in self.occluders):
+            raise TypeError("Only spheres are supported as shadow casters")
+
+        self.visible_rays = 0
+        self.exact_rays = 0
+        self.states = bytearray([UNKNOWN]) * (self.dims[0] * self.dims[1] * self.dims[2])
+
+    def _classify(self, i, j, k):
+        lo = Vec3(self.lo.x + i * self.cell, self.lo.y + j * self.cell, self.lo.z + k * self.cell)
+        hi = lo + Vec3(self.cell, self.cell, self.cell)
+        touched = any(self._touches(s, lo, hi) for s in self.occluders)
+        return BOUNDARY if touched else VISIBLE
+
+    def _touches(self, sphere, lo, hi):
+        # The shadow ray starts 1e-4 off the surface, so pad the cell
+        pad = 2e-4
+        lx, ly, lz = lo.x - pad, lo.y - pad, lo.z - pad
+        hx, hy, hz = hi.x + pad, hi.y + pad, hi.z + pad
+        L = self.light.position
+        px, py, pz = L.x, L.y, L.z
+        cx, cy, cz, r = sphere.center.x, sphere.center.y, sphere.center.z, sphere.radius
+        wx, wy, wz = cx - px, cy - py, cz - pz
+        # Hits up to 1e-4 past the light still count in trace
+        if wx * wx + wy * wy + wz * wz <= (r + pad) ** 2:
+            return True
+
+        # Box axes
+        if (max(px, hx) < cx - r or min(px, lx) > cx + r or
+                max(py, hy) < cy - r or min(py, ly) > cy + r or
+                max(pz, hz) < cz - r or min(pz, lz) > cz + r):
+            return False
+
+        corners = [(x, y, z) for x in (lx, hx) for y in (ly, hy) for z in (lz, hz)]
+        axes = [(wx, wy, wz)]
+        for x, y, z in corners:
+            ex, ey, ez = x - px, y - py, z - pz
+            f = (wx * ex + wy * ey + wz * ez) / (ex * ex + ey * ey + ez * ez)
+            axes.append((wx - ex * f, wy - ey * f, wz - ez * f))
+        axes.append((cx - min(max(cx, lx), hx), cy - min(max(cy, ly), hy), cz - min(max(cz, lz), hz)))
+
+        hull = [(px, py, pz)] + corners
+        for ax, ay, az in axes:
+            n = math.sqrt(ax * ax + ay * ay + az * az)
+            if n < 1e-12:
+                continue
+            ax, ay, az = ax / n, ay / n, az / n
+            proj = [x * ax + y * ay + z * az for x, y, z in hull]
+            mid = cx * ax + cy * ay + cz * az
+            if max(proj) < mid - r - 1e-9 or min(proj) > mid + r + 1e-9:
+                return False
+        return True
+
+    def is_visible(self, point):
+        i = math.floor((point.x - self.lo.x) / self.cell)
+        j = math.floor((point.y - self.lo.y) / self.cell)
+        k = math.floor((point.z - self.lo.z) / self.cell)
+        if not (0 <= i < self.dims[0] and 0 <= j < self.dims[1] and 0 <= k < self.dims[2]):
+            return False
+        index = (i * self.dims[1] + j) * self.dims[2] + k
+        state = self.states[index]
+        if state == UNKNOWN:
+            state = self.states[index] = self._classify(i, j, k)
+        return state == VISIBLE
+
+
+# =========================
+# Raytracer
+# =========================
+
+class CachedRayTracer(RayTracer):
+    def __init__(self, scene, lo, hi, max_depth=3, resolution=32):
+        super().__init__(scene, max_depth)
+        self.grids = [ShadowGrid(scene, light, lo, hi, resolution) for light in scene.lights]
+
+    def shadowed(self, hit, light, to_light):
+        # Same test as in RayTracer.trace
+        shadow_ray = Ray(hit.point + hit.normal * 1e-4, to_light)
+        shadow_hit = self.scene.intersect(shadow_ray)
+        if shadow_hit:
+            occluder = None
+            for obj in self.scene.objects:
+                h = obj.intersect(shadow_ray)
+                if h and abs(h.t - shadow_hit.t) < 1e-6:
+                    occluder = obj
+                    break
+            if occluder is not None and not isinstance(occluder, WALLS):
+                dist_to_light = (light.position - hit.point).norm()
+                if shadow_hit.t < dist_to_light:
+                    return True
+        return False
+
+    def trace(self, ray, depth):
+        if depth <= 0:
+            return Vec3(0, 0, 0)
+
+        hit = self.scene.intersect(ray)
+        if not hit:
+            return Vec3(0, 0, 0)
+
+        color = Vec3(0, 0, 0)
+
+        for light, grid in zip(self.scene.lights, self.grids):
+            to_light = (light.position - hit.point).normalized()
+
+            if grid.is_visible(hit.point):
+                grid.visible_rays += 1
+            else:
+                grid.exact_rays += 1
+                if self.shadowed(hit, light, to_light):
+                    continue
+
+            diff = max(0.0, hit.normal.dot(to_light))
+            view = (ray.direction).__mul__(-1).normalized()
+            half = (to_light + view).normalized()
+            spec = max(0.0, hit.normal.dot(half)) ** 32
+
+            color += hit.material.color * (
+                hit.material.diffuse * diff * light.intensity
+            )
+            color += Vec3(1, 1, 1) * (
+                hit.material.specular * spec * light.intensity
+            )
+
+        if hit.material.reflection > 0:
+            refl_dir = ray.direction.reflect(hit.normal)
+            refl_ray = Ray(hit.point + hit.normal * 1e-4, refl_dir)
+            refl_col = self.trace(refl_ray, depth - 1)
+            color = color * (1 - hit.material.reflection) + refl_col * hit.material.reflection
+
+        return color
+
+
+# =========================
+# Rendering
+# =========================
+
+def render():
+    width, height = 400, 400
+    fov = math.pi / 3.0
+
+    scene = Scene()
+
+    red   = Material(Vec3(0.75, 0.1, 0.1))
+    green = Material(Vec3(0.1, 0.75, 0.1))
+    white = Material(Vec3(0.75, 0.75, 0.75))
+    mirror = Material(Vec3(1, 1, 1), diffuse=0.2, specular=0.3, reflection=0.6)
+
+    scene.objects += [
+        Plane(Vec3(0, -1, 0), Vec3(0, 1, 0), white),   # floor
+        Plane(Vec3(0, 1, 0), Vec3(0, -1, 0), white),   # ceiling
+        Plane(Vec3(-1, 0, 0), Vec3(1, 0, 0), red),     # left
+        Plane(Vec3(1, 0, 0), Vec3(-1, 0, 0), green),   # right
+        Plane(Vec3(0, 0, -3), Vec3(0, 0, 1), white),   # back
+    ]
+    scene.objects += [
+        Sphere(Vec3(-0.4, -0.6, -1.5), 0.4, mirror),
+        Sphere(Vec3(0.4, -0.7, -2.0), 0.3, red),
+    ]
+    scene.lights.append(Light(Vec3(0, 0.9, -1.5), 1.5))
+    scene.objects = planes_to_rects(scene.objects, [Vec3(0, 0, 1)] + [l.position for l in scene.lights])
+
+    # Grid over the inside of the box; points outside use the exact test
+    tracer = CachedRayTracer(scene, Vec3(-1, -1, -3), Vec3(1, 1, 1))
+
+    pixels = []
+    for y in range(height):
+        for x in range(width):
+            px = (2 * (x + 0.5) / width - 1) * math.tan(fov / 2)
+            py = (1 - 2 * (y + 0.5) / height) * math.tan(fov / 2)
+            ray = Ray(Vec3(0, 0, 1), Vec3(px, py, -1).normalized())
+            col = tracer.trace(ray, tracer.max_depth)
+            pixels.append((
+                int(255 * clamp(col.x)),
+                int(255 * clamp(col.y)),
+                int(255 * clamp(col.z)),
+            ))
+
+    for grid in tracer.grids:
+        total = grid.visible_rays + grid.exact_rays
+        print(f"Shadow rays skipped: {grid.visible_rays}/{total}")
+
+    with open("V2BoxShadowCache.ppm", "w") as f:
+        f.write("P3\n{} {}\n255\n".format(width, height))
+        for r, g, b in pixels:
+            f.write(f"{r} {g} {b}\n")
+
+
+if __name__ == "__main__":
+    render()
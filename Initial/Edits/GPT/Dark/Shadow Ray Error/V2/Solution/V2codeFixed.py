@@ -1,4 +1,10 @@
 import math
+import os
+import sys
+
+# Shared wall rectangles from Initial/Shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "..", "..", "Shared"))
+import AxisRects as axis_rects
 
 # =========================
 # Math / Utility
@@ -123,6 +129,17 @@ class Plane:
         return Hit(t, p, self.normal, self.material)
 
 
+# =========================
+# Bounded walls (axis-aligned rectangles, Initial/Shared/AxisRects.py)
+# =========================
+
+RectX, RectY, RectZ = axis_rects.rect_classes(Vec3, make_hit=lambda t, p, n, m, ray: Hit(t, p, n, m), t_min=1e-4)
+
+
+def planes_to_rects(objects, points=(), margin=4.0):
+    return axis_rects.planes_to_rects(objects, Plane, Sphere, (RectX, RectY, RectZ), points, margin)
+
+
 # =========================
 # Light
 # =========================
@@ -187,7 +204,7 @@ class RayTracer:
                     if h and abs(h.t - shadow_hit.t) < 1e-6:
                         occluder = obj
                         break
-                if occluder is not None and not isinstance(occluder, Plane):
+                if occluder is not None and not isinstance(occluder, (Plane, RectX, RectY, RectZ)):
                     dist_to_light = (light.position - hit.point).norm()
                     if shadow_hit.t < dist_to_light:
                         continue
@@ -245,6 +262,9 @@ def render():
 
     scene.lights.append(Light(Vec3(0, 0.9, -1.5), 1.5))
 
+    # Replace the infinite wall planes by bounded rectangles
+    scene.objects = planes_to_rects(scene.objects, [Vec3(0, 0, 1)] + [l.position for l in scene.lights])
+
     tracer = RayTracer(scene)
 
     pixels = []
@@ -1,7 +1,13 @@
 import math
+import os
 import struct
+import sys
 import zlib
 
+# Gemeinsame Wand-Rechtecke aus Initial/Shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "Shared"))
+import AxisRects as axis_rects
+
 
 # ------------------------------------------------------------
 # Mathematische Grundlagen
@@ -86,6 +92,17 @@ class Plane:
         return t, hit, self.normal, self.material
 
 
+# ------------------------------------------------------------
+# Begrenzte Wände (achsenparallele Rechtecke, Initial/Shared/AxisRects.py)
+# ------------------------------------------------------------
+
+RectX, RectY, RectZ = axis_rects.rect_classes(Vec3)
+
+
+def planes_to_rects(objects, points=(), margin=4.0):
+    return axis_rects.planes_to_rects(objects, Plane, Sphere, (RectX, RectY, RectZ), points, margin)
+
+
 # ------------------------------------------------------------
 # Szene & Licht
 # ------------------------------------------------------------
@@ -203,6 +220,9 @@ def main():
     # Licht
     scene.light = Light(Vec3(0, 0.9, 0.5), 1.2)
 
+    # Unendliche Wand-Ebenen durch begrenzte Rechtecke ersetzen
+    scene.objects = planes_to_rects(scene.objects, [camera, scene.light.position])
+
     tracer = RayTracer(scene)
     pixels = [[(0, 0, 0) for _ in range(W)] for _ in range(H)]
 
@@ -0,0 +1,91 @@
+"""
+Kantenerhaltender À-trous-Entrauscher für die Cornell-Box-Tracer
+
+Ein À-trous-Wavelet-Filter (Dammertz et al., "Edge-Avoiding À-Trous Wavelet
+Transform") glättet ein verrauschtes HDR-Bild: ein 5x5-B3-Spline-Kern mit
+wachsendem Lochabstand 1, 2, 4, ..., dessen Gewichte an Helligkeits-,
+Normalen-, Tiefen- und Albedo-Kanten abfallen. Die Beleuchtung wird vor dem
+Filtern durch die Albedo geteilt und danach wieder multipliziert, damit
+Materialkanten scharf bleiben. Die Führungspuffer (Albedo,
+Normale, Tiefe des ersten Treffers) liefert der jeweilige Tracer, siehe
+render_with_guides in V8Denoise.py und V12Denoise.py.
+"""
+
+import numpy as np
+
+# B3-Spline-Kern (1D), das 5x5-Filter ist das äußere Produkt
+KERNEL = np.array([1.0 / 16, 1.0 / 4, 3.0 / 8, 1.0 / 4, 1.0 / 16])
+
+# Rec. 709-Gewichte für die Helligkeit
+LUMINANCE = np.array([0.2126, 0.7152, 0.0722])
+
+
+def _pad(image: np.ndarray, pad: int) -> np.ndarray:
+    """Randpixel wiederholen (2D und 3D)"""
+    widths = ((pad, pad), (pad, pad)) + ((0, 0),) * (image.ndim - 2)
+    return np.pad(image, widths, mode='edge')
+
+
+def _shift(padded: np.ndarray, pad: int, dy: int, dx: int, height: int, width: int) -> np.ndarray:
+    """Ausschnitt des gepolsterten Arrays, um (dy, dx) verschoben"""
+    return padded[pad + dy:pad + dy + height, pad + dx:pad + dx + width]
+
+
+def _local_variance(image: np.ndarray) -> np.ndarray:
+    """Varianz im 3x3-Fenster"""
+    height, width = image.shape
+    padded, padded_sq = _pad(image, 1), _pad(image * image, 1)
+    mean = sum(_shift(padded, 1, dy, dx, height, width) for dy in (-1, 0, 1) for dx in (-1, 0, 1)) / 9
+    mean_sq = sum(_shift(padded_sq, 1, dy, dx, height, width) for dy in (-1, 0, 1) for dx in (-1, 0, 1)) / 9
+    return np.maximum(mean_sq - mean * mean, 0.0)
+
+
+def atrous_denoise(color: np.ndarray, albedo: np.ndarray, normal: np.ndarray,
+                   depth: np.ndarray, iterations: int = 5, sigma_luminance: float = 4.0,
+                   sigma_normal: float = 64.0, sigma_depth: float = 0.1,
+                   sigma_albedo: float = 0.1) -> np.ndarray:
+    """Entrauscht ein HDR-Bild (H, W, 3) anhand der Führungspuffer
+
+    albedo (H, W, 3), normal (H, W, 3) und depth (H, W) stammen vom ersten
+    Treffer; Pixel ohne Treffer haben Tiefe 0. Der Helligkeitsunterschied
+    wird wie bei SVGF auf die lokale Standardabweichung bezogen, das Filter
+    glättet also nur so stark, wie das Bild noch rauscht. sigma_normal ist
+    der Exponent auf max(0, n_p·n_q), sigma_depth gilt für die relative
+    Tiefendifferenz.
+    """
+    height, width = depth.shape
+    hit = depth > 0
+    # Beleuchtung von der Albedo trennen (ohne Treffer: nicht teilen)
+    safe_albedo = np.where(hit[..., None], np.maximum(albedo, 1e-3), 1.0)
+    irradiance = color / safe_albedo
+    inv_albedo = 1.0 / sigma_albedo ** 2
+
+    for i in range(iterations):
+        step = 1 << i
+        pad = 2 * step
+        luminance = irradiance @ LUMINANCE
+        scale = sigma_luminance * np.sqrt(_local_variance(luminance)) + 1e-10
+        p_irr, p_lum = _pad(irradiance, pad), _pad(luminance, pad)
+        p_nrm, p_dep, p_alb = _pad(normal, pad), _pad(depth, pad), _pad(albedo, pad)
+
+        total = np.zeros_like(irradiance)
+        weights = np.zeros(depth.shape)
+        for ky in range(5):
+            for kx in range(5):
+                dy, dx = (ky - 2) * step, (kx - 2) * step
+                q_dep = _shift(p_dep, pad, dy, dx, height, width)
+
+                d_lum = np.abs(luminance - _shift(p_lum, pad, dy, dx, height, width)) / scale
+                d_albedo = np.sum((albedo - _shift(p_alb, pad, dy, dx, height, width)) ** 2, axis=2) * inv_albedo
+                d_depth = (np.abs(depth - q_dep) / (np.maximum(depth, q_dep) + 1e-6) / sigma_depth) ** 2
+                w_normal = np.maximum(0.0, np.sum(normal * _shift(p_nrm, pad, dy, dx, height, width),
+                                                  axis=2)) ** sigma_normal
+                # Hintergrund hat Normale 0 und wird über die Tiefe getrennt
+                w_normal = np.where(hit, w_normal, 1.0)
+
+                w = KERNEL[ky] * KERNEL[kx] * w_normal * np.exp(-(d_lum + d_albedo + d_depth))
+                total += w[..., None] * _shift(p_irr, pad, dy, dx, height, width)
+                weights += w
+        irradiance = total / weights[..., None]
+
+    return irradiance * safe_albedo
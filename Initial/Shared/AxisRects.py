@@ -0,0 +1,203 @@
+"""
+Begrenzte Wände (achsenparallele Rechtecke) für die Cornell-Box-Tracer
+
+Die Tracer bauen ihre Box aus unendlichen Ebenen. Jeder Strahl schneidet
+dann jede Wand irgendwo; nichts lässt sich vorab aussortieren, und eine
+Größenbegrenzung (V9) greift erst nach dem vollen Ebenentest. RectX, RectY
+und RectZ testen stattdessen mit einer Division und zwei Bereichsprüfungen
+gegen ein begrenztes Rechteck.
+
+Die Tracer unterscheiden sich in Vektor-, Strahl- und Trefferklassen.
+rect_classes erzeugt die drei Klassen passend dazu; planes_to_rects
+ersetzt beim Szenenaufbau die Ebenen durch Rechtecke:
+
+    RectX, RectY, RectZ = rect_classes(Vec3, direction="dir", t_min=1e-4)
+    scene.objects = planes_to_rects(scene.objects, Plane, Sphere, (RectX, RectY, RectZ),
+                                    points=[kamera, licht])
+
+Die Grenzen ergeben sich aus den gegenüberliegenden Wänden oder, falls die
+Ebene selbst eine Größe trägt (V9), aus dieser. Ist eine Seite offen (z.B.
+die Vorderseite zur Kamera), reicht das Rechteck bis hinter alle übrigen
+Objekte und die übergebenen Punkte (Kamera, Lichter) plus margin * Boxgröße.
+Andere Objekte bleiben unverändert.
+"""
+
+from operator import attrgetter
+
+
+def _tuple_hit(t, point, normal, material, ray):
+    return t, point, normal, material
+
+
+def rect_classes(vec3, make_hit=None, direction="direction", t_min=0.0):
+    """RectX, RectY, RectZ für die Klassen eines Tracers
+
+    vec3 baut den Trefferpunkt, direction ist das Richtungsattribut des
+    Strahls. make_hit(t, point, normal, material, ray) baut das
+    Trefferobjekt; ohne Angabe ein Tupel (t, point, normal, material).
+    intersect(ray) prüft t >= t_min wie die Ebene des Tracers,
+    hit(ray, t_min, t_max) dient Tracern mit Intervall.
+    """
+    get_direction = attrgetter(direction)
+    make_hit = make_hit or _tuple_hit
+    inf = float("inf")
+
+    # Rechteck in der Ebene x = k, begrenzt auf y0..y1 und z0..z1
+    class RectX:
+        __slots__ = ("k", "y0", "y1", "z0", "z1", "normal", "material")
+
+        def __init__(self, k, y0, y1, z0, z1, normal, material):
+            self.k = k
+            self.y0, self.y1 = y0, y1
+            self.z0, self.z1 = z0, z1
+            self.normal = normal
+            self.material = material
+
+        def hit(self, ray, t_lo, t_hi):
+            d = get_direction(ray)
+            if abs(d.x) < 1e-6:
+                return None
+            t = (self.k - ray.origin.x) / d.x
+            if t < t_lo or t > t_hi:
+                return None
+            y = ray.origin.y + d.y * t
+            if y < self.y0 or y > self.y1:
+                return None
+            z = ray.origin.z + d.z * t
+            if z < self.z0 or z > self.z1:
+                return None
+            return make_hit(t, vec3(self.k, y, z), self.normal, self.material, ray)
+
+        def intersect(self, ray):
+            return self.hit(ray, t_min, inf)
+
+    # Rechteck in der Ebene y = k, begrenzt auf x0..x1 und z0..z1
+    class RectY:
+        __slots__ = ("k", "x0", "x1", "z0", "z1", "normal", "material")
+
+        def __init__(self, k, x0, x1, z0, z1, normal, material):
+            self.k = k
+            self.x0, self.x1 = x0, x1
+            self.z0, self.z1 = z0, z1
+            self.normal = normal
+            self.material = material
+
+        def hit(self, ray, t_lo, t_hi):
+            d = get_direction(ray)
+            if abs(d.y) < 1e-6:
+                return None
+            t = (self.k - ray.origin.y) / d.y
+            if t < t_lo or t > t_hi:
+                return None
+            x = ray.origin.x + d.x * t
+            if x < self.x0 or x > self.x1:
+                return None
+            z = ray.origin.z + d.z * t
+            if z < self.z0 or z > self.z1:
+                return None
+            return make_hit(t, vec3(x, self.k, z), self.normal, self.material, ray)
+
+        def intersect(self, ray):
+            return self.hit(ray, t_min, inf)
+
+    # Rechteck in der Ebene z = k, begrenzt auf x0..x1 und y0..y1
+    class RectZ:
+        __slots__ = ("k", "x0", "x1", "y0", "y1", "normal", "material")
+
+        def __init__(self, k, x0, x1, y0, y1, normal, material):
+            self.k = k
+            self.x0, self.x1 = x0, x1
+            self.y0, self.y1 = y0, y1
+            self.normal = normal
+            self.material = material
+
+        def hit(self, ray, t_lo, t_hi):
+            d = get_direction(ray)
+            if abs(d.z) < 1e-6:
+                return None
+            t = (self.k - ray.origin.z) / d.z
+            if t < t_lo or t > t_hi:
+                return None
+            x = ray.origin.x + d.x * t
+            if x < self.x0 or x > self.x1:
+                return None
+            y = ray.origin.y + d.y * t
+            if y < self.y0 or y > self.y1:
+                return None
+            return make_hit(t, vec3(x, y, self.k), self.normal, self.material, ray)
+
+        def intersect(self, ray):
+            return self.hit(ray, t_min, inf)
+
+    for cls in (RectX, RectY, RectZ):
+        cls.__qualname__ = cls.__name__
+    return RectX, RectY, RectZ
+
+
+def _plane_parts(plane):
+    return plane.point, plane.normal, plane.material
+
+
+def planes_to_rects(objects, plane_type, sphere_type, rect_types, points=(), margin=4.0,
+                    plane_parts=_plane_parts):
+    """Ersetzt die achsenparallelen Ebenen in objects durch begrenzte Rechtecke
+
+    plane_parts(ebene) liefert (Punkt, Normale, Material), für Tracer mit
+    anderen Attributnamen. Trägt eine Ebene ein Attribut size, gilt das
+    Rechteck Punkt ± size wie in deren hit.
+    """
+    RectX, RectY, RectZ = rect_types
+    lo = [None, None, None]
+    hi = [None, None, None]
+    walls = {}
+    for obj in objects:
+        if not isinstance(obj, plane_type):
+            continue
+        point, normal, material = plane_parts(obj)
+        n = (normal.x, normal.y, normal.z)
+        axis = max(range(3), key=lambda i: abs(n[i]))
+        if abs(n[axis]) < 1 - 1e-9:
+            continue
+        p = (point.x, point.y, point.z)
+        walls[id(obj)] = (axis, p, normal, material, getattr(obj, "size", None))
+        k = p[axis]
+        if n[axis] > 0:
+            lo[axis] = k if lo[axis] is None else max(lo[axis], k)
+        else:
+            hi[axis] = k if hi[axis] is None else min(hi[axis], k)
+
+    # Offene Seiten über Kamera, Lichter und Kugeln hinaus verlängern
+    coords = [[], [], []]
+    for p in points:
+        for i, c in enumerate((p.x, p.y, p.z)):
+            coords[i].append(c)
+    for obj in objects:
+        if isinstance(obj, sphere_type):
+            for i, c in enumerate((obj.center.x, obj.center.y, obj.center.z)):
+                coords[i] += [c - obj.radius, c + obj.radius]
+    size = max([hi[i] - lo[i] for i in range(3) if lo[i] is not None and hi[i] is not None] or [1.0])
+    for i in range(3):
+        known = coords[i] + [v for v in (lo[i], hi[i]) if v is not None]
+        if lo[i] is None:
+            lo[i] = min(known or [0.0]) - margin * size
+        if hi[i] is None:
+            hi[i] = max(known or [0.0]) + margin * size
+
+    result = []
+    for obj in objects:
+        if id(obj) not in walls:
+            result.append(obj)
+            continue
+        axis, p, normal, material, half = walls[id(obj)]
+        if half is None:
+            bounds = [(lo[i], hi[i]) for i in range(3)]
+        else:
+            bounds = [(p[i] - half, p[i] + half) for i in range(3)]
+        k = p[axis]
+        if axis == 0:
+            result.append(RectX(k, *bounds[1], *bounds[2], normal, material))
+        elif axis == 1:
+            result.append(RectY(k, *bounds[0], *bounds[2], normal, material))
+        else:
+            result.append(RectZ(k, *bounds[0], *bounds[1], normal, material))
+    return result
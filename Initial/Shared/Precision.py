@@ -0,0 +1,68 @@
+"""
+Globale Rechengenauigkeit (float32/float64) für Szenen-Arrays, Strahlen und Framebuffer
+
+Die Vorgabe gilt prozessweit: set_precision oder die Umgebungsvariable
+V13_PRECISION legen sie fest, get_dtype liefert den passenden NumPy-Typ.
+V13Precision.py (gebündelte Kernels), V13Kernels.py (Numba) und der
+Framebuffer in Long/V13Code.py folgen ihr.
+
+Die Epsilons aus V13CodeDNS (1e-4 für Strahlversatz und t_min, 1e-8 für
+parallele Strahlen) gelten für float64. Mit float32 wachsen sie mit der
+Maschinengenauigkeit und der Szenengröße mit, siehe epsilons.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+PRECISIONS = ("float32", "float64")
+
+# Werte aus V13CodeDNS (für float64)
+RAY_EPSILON = 1e-4
+PARALLEL_EPSILON = 1e-8
+
+Epsilons = namedtuple("Epsilons", "ray parallel")
+
+_precision = "float64"
+
+
+def set_precision(name):
+    """Setzt die globale Genauigkeit ('float32' oder 'float64')."""
+    global _precision
+    if name not in PRECISIONS:
+        raise ValueError(f"Unbekannte Genauigkeit: {name} (erlaubt: {', '.join(PRECISIONS)})")
+    _precision = name
+
+# Vorgabe aus der Umgebung, geprüft wie set_precision
+try:
+    set_precision(os.environ.get("V13_PRECISION") or "float64")
+except ValueError as e:
+    raise ValueError(f"V13_PRECISION: {e}") from None
+
+
+def get_precision():
+    return _precision
+
+
+def get_dtype(precision=None):
+    return np.dtype(precision or _precision)
+
+
+def epsilons(precision=None, scale=1.0):
+    """Strahlversatz und Parallelitätsschwelle für eine Genauigkeit.
+
+    Der Rundungsfehler eines Trefferpunkts wächst mit eps * |Koordinate|;
+    der Versatz bleibt mit Faktor 256 darüber, aber nie unter dem Wert aus
+    V13CodeDNS. Für float64 ergeben sich so genau die alten Werte.
+    """
+    eps = float(np.finfo(get_dtype(precision)).eps)
+    return Epsilons(ray=max(RAY_EPSILON, 256 * eps * scale),
+                    parallel=max(PARALLEL_EPSILON, 16 * eps))
+
+
+def cast_packed(packed, precision=None):
+    """Dict aus Arrays mit allen Float-Arrays in der gewählten Genauigkeit."""
+    dtype = get_dtype(precision)
+    return {name: arr.astype(dtype) if arr.dtype.kind == "f" else arr
+            for name, arr in packed.items()}
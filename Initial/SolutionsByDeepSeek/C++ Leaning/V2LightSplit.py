@@ -0,0 +1,222 @@
+"""
+Lichtgetrennte Puffer für V2Code.py und Neukombination ohne neues Rendern
+
+Licht ist linear in der Emission: Der Beitrag eines Punktlichts zu einem
+Pixel skaliert kanalweise mit light.color * light.intensity, auch über die
+Reflexionsrekursion hinweg. SplitScene verfolgt jeden Kamerastrahl daher nur
+einmal, rechnet in compute_components aber für jedes Licht mit weißer
+Einheitsfarbe getrennt und schreibt einen linearen HDR-Puffer pro Licht plus
+einen Puffer für Umgebungslicht, Emission und Hintergrund.
+
+combine setzt daraus mit neuen Farben und Intensitäten in Millisekunden ein
+Bild zusammen. Die Positionen der Lichter (und damit die Schatten) sind fest.
+
+Im Unterschied zu Scene.compute_lighting wird pro Treffer nicht auf [0, 1]
+begrenzt, sonst wären die Puffer nicht linear; begrenzt wird erst beim
+Speichern. Wo das Original nicht übersteuert, ist das Ergebnis identisch.
+
+Aufruf:
+    python V2LightSplit.py render [Breite] [Puffer.npz]
+    python V2LightSplit.py combine Puffer.npz Ausgabe.ppm [Licht=r,g,b@Intensität ...] [ambient=Faktor]
+"""
+
+import sys
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from V2Code import Vec3, Ray, HitRecord, Light, Scene, Camera, create_cornell_box_scene
+
+# Anteil des Umgebungslichts wie in Scene.compute_lighting
+AMBIENT = 0.2
+
+# ============================================================================
+# Getrennte Beleuchtung
+# ============================================================================
+
+class SplitScene(Scene):
+    """Scene, deren trace_components eine Farbe pro Komponente liefert
+
+    Komponente 0: Umgebungslicht, Emission und Hintergrund
+    Komponente 1 + i: Licht i mit Farbe (1, 1, 1) und Intensität 1
+    """
+    @classmethod
+    def from_scene(cls, scene: Scene) -> "SplitScene":
+        split = cls()
+        split.objects = scene.objects
+        split.lights = scene.lights
+        split.background_color = scene.background_color
+        return split
+
+    def trace_components(self, ray: Ray, depth: int = 0) -> List[List[float]]:
+        """Wie trace_ray, aber linear und getrennt nach Komponenten"""
+        count = len(self.lights) + 1
+        if depth > 3:
+            return [[0.0, 0.0, 0.0] for _ in range(count)]
+
+        hit_record = self.find_closest_hit(ray, 0.001, float('inf'))
+        if not hit_record:
+            components = [[0.0, 0.0, 0.0] for _ in range(count)]
+            components[0] = list(self.background_color)
+            return components
+
+        components = self.compute_components(hit_record, ray)
+
+        reflection = hit_record.material.reflection
+        if reflection > 0:
+            reflection_dir = ray.direction.reflect(hit_record.normal)
+            reflection_ray = Ray(hit_record.point + hit_record.normal * 0.001,
+                                 reflection_dir)
+            reflected = self.trace_components(reflection_ray, depth + 1)
+            for c, r in zip(components, reflected):
+                for i in range(3):
+                    c[i] = c[i] * (1 - reflection) + r[i] * reflection
+
+        return components
+
+    def compute_components(self, hit_record: HitRecord, view_ray: Ray) -> List[List[float]]:
+        """compute_lighting ohne Lichtfarbe und ohne Begrenzung, je Licht getrennt"""
+        material = hit_record.material
+        components = [[material.color[i] * AMBIENT + material.emission * material.color[i]
+                       for i in range(3)]]
+
+        for light in self.lights:
+            if self.is_shadowed(hit_record.point, light):
+                components.append([0.0, 0.0, 0.0])
+                continue
+
+            light_dir = (light.position - hit_record.point).normalize()
+            diffuse_strength = max(0, hit_record.normal.dot(light_dir))
+
+            view_dir = (view_ray.origin - hit_record.point).normalize()
+            reflect_dir = light_dir.reflect(hit_record.normal)
+            specular_strength = max(0, view_dir.dot(reflect_dir))
+            specular_strength = pow(specular_strength, material.shininess)
+
+            components.append([material.color[i] * material.diffuse * diffuse_strength +
+                               material.specular * specular_strength
+                               for i in range(3)])
+
+        return components
+
+# ============================================================================
+# Rendern und Kombinieren
+# ============================================================================
+
+def render_split(scene: Scene, camera: Camera, width: int, height: int) -> np.ndarray:
+    """Puffer (1 + Lichter, height, width, 3) in Zeilenfolge von Renderer.render"""
+    split = SplitScene.from_scene(scene)
+    buffers = np.zeros((len(scene.lights) + 1, height, width, 3), dtype=np.float32)
+    for j in range(height):
+        for i in range(width):
+            u = (i + 0.5) / width
+            v = (j + 0.5) / height
+            ray = camera.get_ray(u, v)
+            buffers[:, j, i] = split.trace_components(ray)
+        print(f"Zeile {j+1}/{height} gerendert", end='\r')
+    print()
+    return buffers
+
+def combine(buffers: np.ndarray, colors: Sequence, intensities: Sequence[float],
+            ambient: float = 1.0) -> np.ndarray:
+    """Lineares Bild (height, width, 3) für neue Lichtfarben und -intensitäten"""
+    weights = np.empty((len(buffers), 3), dtype=np.float32)
+    weights[0] = ambient
+    weights[1:] = np.asarray(colors, dtype=np.float32).reshape(-1, 3) * \
+        np.asarray(intensities, dtype=np.float32).reshape(-1, 1)
+    return np.einsum('khwc,kc->hwc', buffers, weights)
+
+def save_buffers(filename: str, buffers: np.ndarray, lights: List[Light]):
+    np.savez(filename, buffers=buffers,
+             positions=np.array([[l.position.x, l.position.y, l.position.z] for l in lights]).reshape(-1, 3),
+             colors=np.array([l.color for l in lights], dtype=np.float64).reshape(-1, 3),
+             intensities=np.array([l.intensity for l in lights], dtype=np.float64))
+
+def load_buffers(filename: str) -> dict:
+    with np.load(filename) as archive:
+        return {name: archive[name] for name in archive.files}
+
+def write_ppm(filename: str, image: np.ndarray):
+    """Binäres PPM, Zeilen und Rundung wie Renderer.save_ppm"""
+    height, width = image.shape[:2]
+    pixels = (255.999 * np.clip(image, 0.0, 1.0)).astype(np.uint8)
+    with open(filename, 'wb') as f:
+        f.write(f"P6\n{width} {height}\n255\n".encode())
+        f.write(pixels.tobytes())
+
+def parse_light(arg: str, colors: np.ndarray, intensities: np.ndarray) -> Optional[float]:
+    """'1=r,g,b@i', '1=@i' oder '1=r,g,b' ändert Licht 1; 'ambient=f' gibt f zurück
+
+    Lichter sind ab 1 nummeriert wie ihre Puffer (Puffer 0 ist das Umgebungslicht).
+    Ungültige Angaben lösen ValueError mit verständlicher Meldung aus.
+    """
+    key, _, value = arg.partition("=")
+    if key == "ambient":
+        return float(value)
+    try:
+        index = int(key) - 1
+    except ValueError:
+        raise ValueError(f"Unbekannte Angabe '{arg}', erwartet Licht=r,g,b@Intensität oder ambient=Faktor") from None
+    if not 0 <= index < len(colors):
+        raise ValueError(f"Licht {index + 1} gibt es nicht, die Puffer enthalten Licht 1 bis {len(colors)}")
+    color, _, intensity = value.partition("@")
+    if color:
+        components = [float(c) for c in color.split(",")]
+        if len(components) != 3:
+            raise ValueError(f"Farbe '{color}' braucht drei Komponenten r,g,b")
+        colors[index] = components
+    if intensity:
+        intensities[index] = float(intensity)
+    return None
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "render"
+
+    if mode == "render":
+        aspect_ratio = 4.0 / 3.0
+        width = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+        height = int(width / aspect_ratio)
+        filename = sys.argv[3] if len(sys.argv) > 3 else "cornell_box_lights.npz"
+
+        scene = create_cornell_box_scene()
+        camera = Camera(
+            look_from=Vec3(0, 0, 8),
+            look_at=Vec3(0, 0, 0),
+            vup=Vec3(0, 1, 0),
+            fov=60,
+            aspect_ratio=aspect_ratio
+        )
+        print(f"Rendere {width}x{height} Bild mit {len(scene.lights)} getrennten Lichtern...")
+        start = time.perf_counter()
+        buffers = render_split(scene, camera, width, height)
+        print(f"Renderzeit: {time.perf_counter() - start:.1f} s")
+        save_buffers(filename, buffers, scene.lights)
+        print(f"Puffer gespeichert als {filename}")
+
+    elif mode == "combine":
+        data = load_buffers(sys.argv[2])
+        output = sys.argv[3] if len(sys.argv) > 3 else "cornell_box_relit.ppm"
+        colors, intensities, ambient = data["colors"].copy(), data["intensities"].copy(), 1.0
+        for arg in sys.argv[4:]:
+            try:
+                value = parse_light(arg, colors, intensities)
+            except ValueError as e:
+                sys.exit(f"Fehler: {e}")
+            if value is not None:
+                ambient = value
+
+        start = time.perf_counter()
+        image = combine(data["buffers"], colors, intensities, ambient)
+        write_ppm(output, image)
+        print(f"Kombiniert in {(time.perf_counter() - start) * 1000:.1f} ms, gespeichert als {output}")
+
+    else:
+        raise ValueError(f"Unbekannter Modus: {mode}")
+
+if __name__ == "__main__":
+    main()
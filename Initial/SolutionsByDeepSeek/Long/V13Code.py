@@ -3,6 +3,12 @@ from PIL import Image
 from dataclasses import dataclass
 from typing import Optional, Tuple, List
 import math
+import os
+import sys
+
+# Genauigkeitsvorgabe (float32/float64) aus Initial/Shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Shared"))
+from Precision import get_dtype
 
 # ============================================================================
 # Mathematik-Bibliothek
@@ -169,8 +175,8 @@ class Raytracer:
         viewport_height = 2.0
         viewport_width = aspect_ratio * viewport_height
         
-        # Bildmatrix erstellen
-        image = np.zeros((self.height, self.width, 3))
+        # Bildmatrix erstellen, in der globalen Genauigkeit (V13_PRECISION)
+        image = np.zeros((self.height, self.width, 3), dtype=get_dtype())
         
         # Für jeden Pixel einen Strahl aussenden
         for y in range(self.height):
@@ -0,0 +1,125 @@
+"""
+Emitter-Index für V13Code.py
+
+Raytracer.trace_ray läuft an jedem Trefferpunkt über alle Objekte der Szene
+und sucht per hasattr/isinstance die leuchtenden heraus, um deren
+Lichtposition zu bestimmen. IndexedRaytracer macht das einmal beim
+Kompilieren der Szene: die Liste enthält nur die Emitter samt fertig
+berechneter Lichtposition. Pro Trefferpunkt kostet die Beleuchtung damit
+O(Emitter) statt O(Objekte), das Bild bleibt identisch.
+
+Stichprobenbasierte Lichtauswahl (Alias-Tabelle, Lichtbaum) steht in
+V6LightSampling.py; V13Code.py summiert deterministisch über alle Lichter,
+dort gibt es nichts zu ziehen.
+
+Aufruf:
+    python V13Emitters.py [Breite] [Höhe]
+"""
+
+import sys
+import time
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from V13Code import Vec3, Ray, Sphere, Plane, Scene, Raytracer, create_cornell_box
+
+# ============================================================================
+# Emitter-Index
+# ============================================================================
+
+def build_emitter_index(scene: Scene) -> List[Tuple[object, Vec3]]:
+    """(Objekt, Lichtposition) aller Emitter, Reihenfolge wie scene.objects"""
+    emitters = []
+    for obj in scene.objects:
+        if hasattr(obj, 'material') and obj.material.emissive:
+            if isinstance(obj, Sphere):
+                emitters.append((obj, obj.center))
+            elif isinstance(obj, Plane):
+                emitters.append((obj, obj.point + obj.normal * 0.5))
+    return emitters
+
+# ============================================================================
+# Raytracer mit Index
+# ============================================================================
+
+class IndexedRaytracer(Raytracer):
+    def __init__(self, scene: Scene, width: int = 512, height: int = 512):
+        super().__init__(scene, width, height)
+        self.compile()
+
+    def compile(self):
+        """Nach Änderungen an scene.objects erneut aufrufen"""
+        self.emitters = build_emitter_index(self.scene)
+
+    def trace_ray(self, ray: Ray, depth: int) -> Vec3:
+        """Wie Raytracer.trace_ray, Beleuchtung nur über self.emitters"""
+        if depth >= self.max_depth:
+            return Vec3(0, 0, 0)
+
+        hit_result = self.scene.hit(ray, 0.001, float('inf'))
+        if hit_result is None:
+            return Vec3(0, 0, 0)
+
+        hit_record, _ = hit_result
+        material = hit_record.material
+
+        if material.emissive:
+            return Vec3(
+                material.color[0] * material.emission_strength,
+                material.color[1] * material.emission_strength,
+                material.color[2] * material.emission_strength
+            )
+
+        color = Vec3(0, 0, 0)
+        for _, light_pos in self.emitters:
+            light_dir = (light_pos - hit_record.point).normalize()
+
+            shadow_ray = Ray(hit_record.point + hit_record.normal * 0.001, light_dir)
+            shadow_hit = self.scene.hit(shadow_ray, 0.001, float('inf'))
+
+            if shadow_hit is None:
+                intensity = max(0, hit_record.normal.dot(light_dir))
+                color = color + Vec3(
+                    material.color[0] * intensity * 0.8,
+                    material.color[1] * intensity * 0.8,
+                    material.color[2] * intensity * 0.8
+                )
+
+        # Ambiente Beleuchtung
+        color = color + Vec3(
+            material.color[0] * 0.2,
+            material.color[1] * 0.2,
+            material.color[2] * 0.2
+        )
+
+        # Reflexionen (30%)
+        reflect_dir = ray.direction - hit_record.normal * (2 * ray.direction.dot(hit_record.normal))
+        reflect_ray = Ray(hit_record.point + hit_record.normal * 0.001, reflect_dir)
+        reflect_color = self.trace_ray(reflect_ray, depth + 1)
+
+        return color + reflect_color * 0.3
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else width
+
+    scene = create_cornell_box()
+    raytracer = IndexedRaytracer(scene, width, height)
+    print(f"{len(raytracer.emitters)} Emitter unter {len(scene.objects)} Objekten")
+
+    start = time.perf_counter()
+    image = raytracer.render()
+    print(f"Fertig nach {time.perf_counter() - start:.1f} s")
+
+    image = np.clip(image * 255, 0, 255).astype(np.uint8)
+    Image.fromarray(image).save("cornellbox.png")
+    print("Bild gespeichert als 'cornellbox.png'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Lichtgetrennte HDR-Puffer für V7Code.py und Neukombination ohne neues Rendern
+
+Raytracer.trace ist linear in den Punktlichtern: Jedes Licht trägt
+kanalweise light.color * light.intensity mal einen Faktor bei, der nur von
+Geometrie und Lichtposition abhängt, und die Reflexion mischt linear. Der
+SplitRaytracer verfolgt jeden Kamerastrahl einmal und schreibt pro Licht
+einen Puffer für Farbe (1, 1, 1) und Intensität 1 sowie einen Puffer für die
+Emission leuchtender Flächen.
+
+combine setzt daraus mit neuen Farben und Intensitäten in Millisekunden ein
+Bild zusammen; Positionen und Schatten bleiben die des Renders.
+
+Hinweis: trace multipliziert Material- und Lichtfarbe mit Vec3.__mul__, das
+nur Skalare kann, und bricht deshalb mit einem TypeError ab (V7Errors.txt).
+trace_components rechnet das beabsichtigte kanalweise Produkt.
+
+Aufruf:
+    python V7LightSplit.py render [Breite] [Puffer.npz]
+    python V7LightSplit.py combine Puffer.npz Ausgabe.ppm [Licht=r,g,b@Intensität ...] [emission=Faktor]
+"""
+
+import sys
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from V7Code import Vec3, Ray, Light, Raytracer, create_cornell_box
+
+# ============================================================================
+# Getrennte Beleuchtung
+# ============================================================================
+
+class SplitRaytracer(Raytracer):
+    """Raytracer mit einer Farbe pro Komponente
+
+    Komponente 0: Emission; Komponente 1 + i: Licht i als weißes Einheitslicht
+    """
+    def trace_components(self, ray: Ray, depth: int = 0) -> List[Vec3]:
+        """Wie trace, aber getrennt nach Komponenten"""
+        count = len(self.lights) + 1
+        if depth >= self.max_bounces:
+            return [Vec3(0, 0, 0) for _ in range(count)]
+
+        hit = self.world.hit(ray, 0.001, float('inf'))
+        if not hit:
+            return [Vec3(0, 0, 0) for _ in range(count)]
+
+        material = hit.material
+        color = material.color
+
+        components = [Vec3(0, 0, 0) for _ in range(count)]
+        if material.emission.length() > 0:
+            components[0] = material.emission
+            return components
+
+        for i, light in enumerate(self.lights, 1):
+            light_dir = (light.position - hit.point).normalize()
+            light_distance = (light.position - hit.point).length()
+
+            shadow_ray = Ray(hit.point + hit.normal * 0.001, light_dir)
+            if self.world.hit(shadow_ray, 0.001, light_distance):
+                continue
+
+            diffuse = max(0, hit.normal.dot(light_dir))
+            scale = diffuse / (light_distance * light_distance)
+            components[i] = Vec3(color.x * scale, color.y * scale, color.z * scale)
+
+        if material.reflection > 0:
+            reflected_dir = ray.direction.reflect(hit.normal)
+            reflected_ray = Ray(hit.point + hit.normal * 0.001, reflected_dir)
+            reflected = self.trace_components(reflected_ray, depth + 1)
+            components = [c + r * material.reflection for c, r in zip(components, reflected)]
+
+        return components
+
+    def render_split(self, width: int, height: int) -> np.ndarray:
+        """Puffer (1 + Lichter, height, width, 3), Zeile 0 oben wie in save_ppm"""
+        buffers = np.zeros((len(self.lights) + 1, height, width, 3), dtype=np.float32)
+        for j in range(height):
+            for i in range(width):
+                u = (i + 0.5) / width
+                v = (j + 0.5) / height
+                ray_dir = self.camera.lower_left + \
+                          self.camera.horizontal * u + \
+                          self.camera.vertical * v - \
+                          self.camera.origin
+                ray = Ray(self.camera.origin, ray_dir.normalize())
+
+                # render schickt alle Samples durch die Pixelmitte, der
+                # Mittelwert ist also das Ergebnis eines einzigen Strahls
+                buffers[:, height - 1 - j, i] = [(c.x, c.y, c.z) for c in self.trace_components(ray)]
+            print(f"Zeile {j + 1}/{height}", end='\r')
+        print()
+        return buffers
+
+# ============================================================================
+# Kombinieren und Speichern
+# ============================================================================
+
+def combine(buffers: np.ndarray, colors: Sequence, intensities: Sequence[float],
+            emission: float = 1.0) -> np.ndarray:
+    """Lineares HDR-Bild (height, width, 3) für neue Lichtfarben und -intensitäten"""
+    weights = np.empty((len(buffers), 3), dtype=np.float32)
+    weights[0] = emission
+    weights[1:] = np.asarray(colors, dtype=np.float32).reshape(-1, 3) * \
+        np.asarray(intensities, dtype=np.float32).reshape(-1, 1)
+    return np.einsum('khwc,kc->hwc', buffers, weights)
+
+def save_buffers(filename: str, buffers: np.ndarray, lights: List[Light]):
+    np.savez(filename, buffers=buffers,
+             positions=np.array([[l.position.x, l.position.y, l.position.z] for l in lights]).reshape(-1, 3),
+             colors=np.array([[l.color.x, l.color.y, l.color.z] for l in lights], dtype=np.float64).reshape(-1, 3),
+             intensities=np.array([l.intensity for l in lights], dtype=np.float64))
+
+def load_buffers(filename: str) -> dict:
+    with np.load(filename) as archive:
+        return {name: archive[name] for name in archive.files}
+
+def write_ppm(filename: str, image: np.ndarray):
+    """Binäres PPM mit Gammakorrektur und Rundung wie save_ppm"""
+    height, width = image.shape[:2]
+    pixels = (255.999 * np.sqrt(np.clip(image, 0.0, 1.0))).astype(np.uint8)
+    with open(filename, 'wb') as f:
+        f.write(f"P6\n{width} {height}\n255\n".encode())
+        f.write(pixels.tobytes())
+
+def parse_light(arg: str, colors: np.ndarray, intensities: np.ndarray) -> Optional[float]:
+    """'1=r,g,b@i', '1=@i' oder '1=r,g,b' ändert Licht 1; 'emission=f' gibt f zurück
+
+    Lichter sind ab 1 nummeriert wie ihre Puffer (Puffer 0 ist die Emission).
+    Ungültige Angaben lösen ValueError mit verständlicher Meldung aus.
+    """
+    key, _, value = arg.partition("=")
+    if key == "emission":
+        return float(value)
+    try:
+        index = int(key) - 1
+    except ValueError:
+        raise ValueError(f"Unbekannte Angabe '{arg}', erwartet Licht=r,g,b@Intensität oder emission=Faktor") from None
+    if not 0 <= index < len(colors):
+        raise ValueError(f"Licht {index + 1} gibt es nicht, die Puffer enthalten Licht 1 bis {len(colors)}")
+    color, _, intensity = value.partition("@")
+    if color:
+        components = [float(c) for c in color.split(",")]
+        if len(components) != 3:
+            raise ValueError(f"Farbe '{color}' braucht drei Komponenten r,g,b")
+        colors[index] = components
+    if intensity:
+        intensities[index] = float(intensity)
+    return None
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "render"
+
+    if mode == "render":
+        width = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+        height = int(width * 9 / 16)
+        filename = sys.argv[3] if len(sys.argv) > 3 else "cornell_box_lights.npz"
+
+        world, lights, camera = create_cornell_box()
+        raytracer = SplitRaytracer(world, camera, lights, max_bounces=3, samples=4)
+        print(f"Rendere Bild ({width}x{height}) mit {len(lights)} getrennten Lichtern...")
+        start = time.perf_counter()
+        buffers = raytracer.render_split(width, height)
+        print(f"Renderzeit: {time.perf_counter() - start:.1f} s")
+        save_buffers(filename, buffers, lights)
+        print(f"Puffer gespeichert als {filename}")
+
+    elif mode == "combine":
+        data = load_buffers(sys.argv[2])
+        output = sys.argv[3] if len(sys.argv) > 3 else "cornell_box_relit.ppm"
+        # astype: ältere Archive speichern ganzzahlige Farben als int64
+        colors, intensities, emission = data["colors"].astype(np.float64), data["intensities"].astype(np.float64), 1.0
+        for arg in sys.argv[4:]:
+            try:
+                value = parse_light(arg, colors, intensities)
+            except ValueError as e:
+                sys.exit(f"Fehler: {e}")
+            if value is not None:
+                emission = value
+
+        start = time.perf_counter()
+        image = combine(data["buffers"], colors, intensities, emission)
+        write_ppm(output, image)
+        print(f"Kombiniert in {(time.perf_counter() - start) * 1000:.1f} ms, gespeichert als {output}")
+
+    else:
+        raise ValueError(f"Unbekannter Modus: {mode}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Kantenerhaltender À-trous-Entrauscher für V8Code.py
+
+Rendert die Cornell-Box mit wenigen Samples pro Pixel und sammelt dabei im
+selben Durchlauf die Führungspuffer des ersten Treffers (Albedo, Normale,
+Tiefe). Das verrauschte HDR-Bild wird danach mit einem À-trous-Wavelet-Filter
+(Dammertz et al., "Edge-Avoiding À-Trous Wavelet Transform") geglättet, dessen
+Gewichte an Helligkeits-, Normalen-, Tiefen- und Albedo-Kanten abfallen. Das
+Filter liegt in Initial/Shared/Atrous.py, gemeinsam mit V12Denoise.py.
+
+Rohbild und entrauschtes Bild werden nebeneinander als PPM gespeichert.
+
+Aufruf:
+    python V8Denoise.py [Breite] [Samples] [Iterationen]
+"""
+
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from V8Code import Vec3, Ray, HitRecord, Camera, Hittable, ray_color, compute_lighting, \
+    random_float, create_cornell_box, save_ppm
+
+# Filter aus Initial/Shared, gemeinsam mit V12Denoise.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Shared"))
+from Atrous import atrous_denoise
+
+# ============================================================================
+# Rendern mit Führungspuffern
+# ============================================================================
+
+def ray_color_first(ray: Ray, world: Hittable) -> Tuple[Vec3, Optional[HitRecord]]:
+    """Wie ray_color, liefert zusätzlich den ersten Treffer (oder None)"""
+    hit = world.hit(ray, 0.001, float('inf'))
+    if not hit:
+        t = 0.5 * (ray.direction.y + 1.0)
+        return Vec3(1.0, 1.0, 1.0) * (1.0 - t) + Vec3(0.5, 0.7, 1.0) * t, None
+
+    scattered_valid, scattered, attenuation = hit.material.scatter(ray, hit)
+    if not scattered_valid:
+        return Vec3(0, 0, 0), hit
+    light_color = compute_lighting(hit.point, hit.normal, world)
+    reflected_color = ray_color(scattered, world, 1)
+    return Vec3(
+        attenuation.x * (light_color.x + reflected_color.x),
+        attenuation.y * (light_color.y + reflected_color.y),
+        attenuation.z * (light_color.z + reflected_color.z)
+    ), hit
+
+
+def render_with_guides(world: Hittable, camera: Camera, width: int, height: int,
+                       samples_per_pixel: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Rendert wie V8Code.main und gibt (color, albedo, normal, depth) zurück
+
+    Zeile j entspricht pixels[j] aus V8Code (unten beginnend). Die
+    Führungspuffer sind über alle Samples des Pixels gemittelt.
+    """
+    color = np.zeros((height, width, 3))
+    albedo = np.zeros((height, width, 3))
+    normal = np.zeros((height, width, 3))
+    depth = np.zeros((height, width))
+    for j in range(height):
+        for i in range(width):
+            for _ in range(samples_per_pixel):
+                u = (i + random_float()) / (width - 1)
+                v = (j + random_float()) / (height - 1)
+                c, hit = ray_color_first(camera.get_ray(u, v), world)
+                color[j, i] += (c.x, c.y, c.z)
+                if hit is not None:
+                    a = hit.material.albedo
+                    albedo[j, i] += (a.x, a.y, a.z)
+                    normal[j, i] += (hit.normal.x, hit.normal.y, hit.normal.z)
+                    depth[j, i] += hit.t
+        print(f"Zeile {j + 1}/{height} fertig", end='\r')
+    print()
+
+    color /= samples_per_pixel
+    albedo /= samples_per_pixel
+    depth /= samples_per_pixel
+    length = np.linalg.norm(normal, axis=2, keepdims=True)
+    normal = np.where(length > 0, normal / np.maximum(length, 1e-12), 0.0)
+    return color, albedo, normal, depth
+
+
+def to_pixels(image: np.ndarray) -> List[List[Vec3]]:
+    """NumPy-Bild -> pixels[j][i] für save_ppm"""
+    return [[Vec3(*map(float, image[j, i])) for i in range(image.shape[1])]
+            for j in range(image.shape[0])]
+
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    width = height = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    samples_per_pixel = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    camera = Camera(
+        lookfrom=Vec3(278, 278, -800),
+        lookat=Vec3(278, 278, 0),
+        vup=Vec3(0, 1, 0),
+        vfov=40,
+        aspect_ratio=1.0
+    )
+    world = create_cornell_box()
+
+    print(f"Rendere Cornell-Box ({width}x{height}, {samples_per_pixel} Samples)...")
+    start = time.perf_counter()
+    color, albedo, normal, depth = render_with_guides(world, camera, width, height, samples_per_pixel)
+    print(f"Renderzeit: {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    denoised = atrous_denoise(color, albedo, normal, depth, iterations)
+    print(f"Entrauschen ({iterations} Iterationen): {time.perf_counter() - start:.2f} s")
+
+    raw_name = f"cornell_box_{samples_per_pixel}spp.ppm"
+    save_ppm(raw_name, to_pixels(color), width, height)
+    save_ppm(raw_name.replace(".ppm", "_denoised.ppm"), to_pixels(denoised), width, height)
+
+
+if __name__ == "__main__":
+    main()
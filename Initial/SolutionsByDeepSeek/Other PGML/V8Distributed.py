@@ -0,0 +1,379 @@
+"""
+Verteiltes Rendern für V8Code.py (Koordinator/Worker)
+
+Die Szene aus create_cornell_box wird einmal serialisiert und in ein
+gemeinsames Verzeichnis gelegt. Das Bild wird in Kacheln und Sample-Pässe
+zerlegt, die als Auftragsdateien in einer dateibasierten Warteschlange liegen.
+Worker-Prozesse (lokal oder auf anderen Rechnern mit demselben Verzeichnis,
+z.B. per NFS) holen sich Aufträge, rendern sie mit ray_color und legen die
+Teilsummen samt Sample-Anzahl zurück. Der Koordinator mischt alle Teilergebnisse
+gewichtet nach Sample-Anzahl und stellt Aufträge verlorener Worker neu ein.
+
+Aufruf:
+    python V8Distributed.py coordinator --dir queue --workers 4
+    python V8Distributed.py worker --dir queue          (auf weiteren Rechnern)
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+from V8Code import Vec3, Camera, ray_color, random_float, create_cornell_box, save_ppm
+
+# ============================================================================
+# Warteschlange im gemeinsamen Verzeichnis
+# ============================================================================
+
+SCENE_FILE = "scene.pkl"
+STOP_FILE = "STOP"
+
+
+class FileQueue:
+    """Dateibasierte Auftragswarteschlange
+
+    Aufbau des Verzeichnisses:
+        scene.pkl       einmal serialisierte Szene (Welt, Kamera, Bildgröße, Lauf)
+        todo/<id>.json  offene Aufträge
+        doing/<id>.<worker>.json  übernommene Aufträge (mtime = Lebenszeichen)
+        done/<id>.<worker>.pkl    Teilergebnisse
+
+    Ein Auftrag wird durch ein atomares os.rename von todo nach doing
+    übernommen, daher kann ihn nur genau ein Worker bekommen. Aufträge und
+    Ergebnisse tragen die Kennung des Laufs; Reste früherer Läufe werden
+    daran erkannt und verworfen.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.todo = os.path.join(root, "todo")
+        self.doing = os.path.join(root, "doing")
+        self.done = os.path.join(root, "done")
+
+    def create(self):
+        for path in (self.todo, self.doing, self.done):
+            os.makedirs(path, exist_ok=True)
+
+    def clear(self):
+        """Entfernt Aufträge und Ergebnisse abgebrochener oder früherer Läufe"""
+        for path in (self.todo, self.doing, self.done):
+            for name in os.listdir(path):
+                try:
+                    os.remove(os.path.join(path, name))
+                except OSError:
+                    pass
+
+    def put(self, task: dict):
+        _write_atomic(os.path.join(self.todo, f"{task['id']}.json"),
+                      json.dumps(task).encode())
+
+    def claim(self, worker_id: str) -> Optional[Tuple[dict, str]]:
+        """Übernimmt den nächsten offenen Auftrag oder gibt None zurück"""
+        for name in sorted(os.listdir(self.todo)):
+            if not name.endswith(".json"):
+                continue
+            task_id = name[:-len(".json")]
+            claimed = os.path.join(self.doing, f"{task_id}.{worker_id}.json")
+            try:
+                os.rename(os.path.join(self.todo, name), claimed)
+            except OSError:
+                continue  # Ein anderer Worker war schneller
+            os.utime(claimed)
+            with open(claimed) as f:
+                return json.load(f), claimed
+        return None
+
+    def finish(self, task: dict, claimed: str, worker_id: str, sums: List[float]):
+        result = {"id": task["id"], "run": task.get("run"), "tile": task["tile"],
+                  "samples": task["samples"], "sums": sums}
+        _write_atomic(os.path.join(self.done, f"{task['id']}.{worker_id}.pkl"),
+                      pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        try:
+            os.remove(claimed)
+        except OSError:
+            pass  # Auftrag wurde inzwischen neu eingestellt
+
+    def requeue_stale(self, timeout: float, dead_workers=()) -> int:
+        """Stellt Aufträge ohne aktuelles Lebenszeichen wieder in todo ein"""
+        count = 0
+        now = time.time()
+        for name in os.listdir(self.doing):
+            path = os.path.join(self.doing, name)
+            # Auftrags-IDs enthalten keinen Punkt, Rechnernamen schon
+            task_id, worker_id = name[:-len(".json")].split(".", 1)
+            try:
+                stale = now - os.path.getmtime(path) > timeout
+            except OSError:
+                continue
+            if stale or worker_id in dead_workers:
+                try:
+                    os.rename(path, os.path.join(self.todo, f"{task_id}.json"))
+                    count += 1
+                except OSError:
+                    pass
+        return count
+
+
+def _write_atomic(path: str, data: bytes):
+    """Schreibt erst in eine temporäre Datei und benennt dann um"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ============================================================================
+# Worker
+# ============================================================================
+
+def render_tile(world, camera: Camera, width: int, height: int,
+                tile: Tuple[int, int, int, int], samples: int, seed: int) -> List[float]:
+    """Rendert eine Kachel und gibt die ungemittelten Farbsummen zurück
+
+    Die Pixelabtastung entspricht der Hauptschleife in V8Code.main().
+    """
+    x0, y0, x1, y1 = tile
+    random_float.seed = seed
+    sums = []
+    for j in range(y0, y1):
+        for i in range(x0, x1):
+            pixel_color = Vec3(0, 0, 0)
+            for _ in range(samples):
+                u = (i + random_float()) / (width - 1)
+                v = (j + random_float()) / (height - 1)
+                pixel_color = pixel_color + ray_color(camera.get_ray(u, v), world)
+            sums.extend((pixel_color.x, pixel_color.y, pixel_color.z))
+    return sums
+
+
+def row_seed(seed: int, row: int) -> int:
+    """LCG-Startwert einer Zeile
+
+    Aufeinanderfolgende Startwerte liefern beim LCG korrelierte Folgen,
+    daher wird (seed, row) gehasht statt seed + row zu verwenden.
+    """
+    digest = hashlib.sha256(f"{seed}:{row}".encode()).digest()
+    return int.from_bytes(digest[:4], "little")
+
+
+def run_worker(root: str, worker_id: Optional[str] = None, poll: float = 0.2):
+    """Holt Aufträge aus der Warteschlange, bis der Koordinator STOP setzt"""
+    queue = FileQueue(root)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    scene = None
+    while not os.path.exists(os.path.join(root, STOP_FILE)):
+        claimed = queue.claim(worker_id)
+        if claimed is None:
+            time.sleep(poll)
+            continue
+        task, path = claimed
+        if scene is None or scene["run"] != task.get("run"):
+            # Neuer Lauf: Szene neu laden
+            with open(os.path.join(root, SCENE_FILE), "rb") as f:
+                scene = pickle.load(f)
+            world, camera = scene["world"], scene["camera"]
+            width, height = scene["width"], scene["height"]
+
+        x0, y0, x1, y1 = task["tile"]
+        sums = []
+        for j in range(y0, y1):
+            # Zeilenweise rendern, damit das Lebenszeichen aktuell bleibt
+            sums.extend(render_tile(world, camera, width, height,
+                                    (x0, j, x1, j + 1), task["samples"],
+                                    row_seed(task["seed"], j)))
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        queue.finish(task, path, worker_id, sums)
+
+
+# ============================================================================
+# Koordinator
+# ============================================================================
+
+def make_tasks(width: int, height: int, tile_size: int,
+               samples: int, passes: int) -> List[dict]:
+    """Zerlegt das Bild in Kacheln und jede Kachel in Sample-Pässe
+
+    Jeder Pass bekommt mindestens ein Sample; bei mehr Pässen als Samples
+    wird die Zahl der Pässe auf samples begrenzt.
+    """
+    if samples < 1:
+        raise ValueError(f"Mindestens ein Sample pro Pixel nötig, nicht {samples}")
+    if passes < 1:
+        raise ValueError(f"Mindestens ein Pass nötig, nicht {passes}")
+    passes = min(passes, samples)
+    tasks = []
+    for p in range(passes):
+        # Rest gleichmäßig auf die ersten Pässe verteilen
+        spp = samples // passes + (1 if p < samples % passes else 0)
+        for y0 in range(0, height, tile_size):
+            for x0 in range(0, width, tile_size):
+                tile = (x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height))
+                task_id = f"p{p:03d}_y{y0:05d}_x{x0:05d}"
+                # Jeder Pass bekommt eigene Zufallszahlen
+                seed = 123456789 + p * 1000003 + y0 * width + x0
+                tasks.append({"id": task_id, "tile": tile, "samples": spp, "seed": seed})
+    return tasks
+
+
+class Accumulator:
+    """Summiert Teilergebnisse pro Pixel und zählt die Samples"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.sums = [[Vec3(0, 0, 0) for _ in range(width)] for _ in range(height)]
+        self.counts = [[0] * width for _ in range(height)]
+
+    def add(self, result: dict):
+        x0, y0, x1, y1 = result["tile"]
+        sums = result["sums"]
+        k = 0
+        for j in range(y0, y1):
+            for i in range(x0, x1):
+                self.sums[j][i] = self.sums[j][i] + Vec3(sums[k], sums[k + 1], sums[k + 2])
+                self.counts[j][i] += result["samples"]
+                k += 3
+
+    def pixels(self) -> List[List[Vec3]]:
+        return [[self.sums[j][i] / max(1, self.counts[j][i]) for i in range(self.width)]
+                for j in range(self.height)]
+
+
+def coordinate(root: str, world, camera: Camera, width: int, height: int,
+               samples: int = 50, passes: int = 1, tile_size: int = 32,
+               local_workers: int = 0, timeout: float = 30.0,
+               max_restarts: int = 3) -> List[List[Vec3]]:
+    """Verteilt das Rendering und gibt die gemittelten Pixel zurück
+
+    Abgestürzte lokale Worker werden neu gestartet, jeder höchstens
+    max_restarts Mal; danach bricht der Koordinator mit RuntimeError ab.
+    """
+    queue = FileQueue(root)
+    queue.create()
+    queue.clear()
+    stop = os.path.join(root, STOP_FILE)
+    if os.path.exists(stop):
+        os.remove(stop)
+    run = os.urandom(8).hex()
+
+    # Szene genau einmal serialisieren
+    _write_atomic(os.path.join(root, SCENE_FILE), pickle.dumps(
+        {"world": world, "camera": camera, "width": width, "height": height, "run": run},
+        protocol=pickle.HIGHEST_PROTOCOL))
+
+    tasks = make_tasks(width, height, tile_size, samples, passes)
+    for task in tasks:
+        task["run"] = run
+        queue.put(task)
+    pending = {task["id"] for task in tasks}
+
+    def start_worker(worker_id: str) -> multiprocessing.Process:
+        proc = multiprocessing.Process(target=run_worker, args=(root, worker_id))
+        proc.start()
+        return proc
+
+    workers: Dict[str, multiprocessing.Process] = {}
+    restarts: Dict[str, int] = {}
+    for n in range(local_workers):
+        workers[f"local{n}"] = start_worker(f"local{n}")
+        restarts[f"local{n}"] = 0
+
+    accumulator = Accumulator(width, height)
+    try:
+        while pending:
+            for name in os.listdir(queue.done):
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(queue.done, name)
+                with open(path, "rb") as f:
+                    result = pickle.load(f)
+                os.remove(path)
+                # Doppelte Ergebnisse (Auftrag wurde neu eingestellt) und
+                # Ergebnisse anderer Läufe verwerfen
+                if result.get("run") == run and result["id"] in pending:
+                    pending.discard(result["id"])
+                    accumulator.add(result)
+                    try:
+                        os.remove(os.path.join(queue.todo, f"{result['id']}.json"))
+                    except OSError:
+                        pass
+
+            dead = {wid for wid, proc in workers.items() if not proc.is_alive()}
+            requeued = queue.requeue_stale(timeout, dead)
+            if requeued:
+                print(f"Neu eingestellte Aufträge: {requeued}")
+            for wid in dead:
+                proc = workers.pop(wid)
+                proc.join()
+                if restarts[wid] >= max_restarts:
+                    raise RuntimeError(f"Lokaler Worker {wid} ist {restarts[wid] + 1} Mal abgestürzt "
+                                       f"(Exitcode {proc.exitcode})")
+                restarts[wid] += 1
+                print(f"Worker {wid} abgestürzt (Exitcode {proc.exitcode}), starte neu")
+                workers[wid] = start_worker(wid)
+
+            print(f"Aufträge fertig: {len(tasks) - len(pending)}/{len(tasks)}", end='\r')
+            time.sleep(0.1)
+    finally:
+        with open(stop, "w"):
+            pass
+        for proc in workers.values():
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+
+    print()
+    return accumulator.pixels()
+
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Verteiltes Rendern der Cornell-Box (V8)")
+    parser.add_argument("mode", choices=["coordinator", "worker"])
+    parser.add_argument("--dir", default="render_queue", help="Gemeinsames Warteschlangenverzeichnis")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Anzahl lokaler Worker-Prozesse des Koordinators")
+    parser.add_argument("--width", type=int, default=400)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--passes", type=int, default=1, help="Sample-Pässe pro Kachel")
+    parser.add_argument("--tile", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="Sekunden ohne Lebenszeichen bis zur Neuvergabe")
+    parser.add_argument("--output", default="cornell_box.ppm")
+    args = parser.parse_args()
+
+    if args.mode == "worker":
+        run_worker(args.dir)
+        return
+
+    width = height = args.width
+    camera = Camera(
+        lookfrom=Vec3(278, 278, -800),
+        lookat=Vec3(278, 278, 0),
+        vup=Vec3(0, 1, 0),
+        vfov=40,
+        aspect_ratio=1.0
+    )
+    world = create_cornell_box()
+
+    print(f"Rendere Cornell-Box verteilt ({width}x{height}, {args.workers} lokale Worker)...")
+    pixels = coordinate(args.dir, world, camera, width, height,
+                        samples=args.samples, passes=args.passes, tile_size=args.tile,
+                        local_workers=args.workers, timeout=args.timeout)
+    save_ppm(args.output, pixels, width, height)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Aufteilung am ersten Treffer (Splitting) für V8Code.py
+
+main() verfolgt für jedes der 50 Samples eines Pixels den Kamerastrahl,
+den ersten Treffer und dessen Schattenstrahl (compute_lighting) neu.
+render_split verfolgt primary Kamerastrahlen pro Pixel; am ersten Treffer
+wird die direkte Beleuchtung einmal berechnet und secondary-mal gestreut:
+
+    L = 1/N * Σ_i 1/M * Σ_j [gültig_ij] * attenuation * (Licht_i + ray_color(gestreut_ij))
+
+Der Erwartungswert entspricht ray_color; erster Treffer und Schattenstrahl
+kosten aber nur N statt N*M Schnitttests. CountingWorld zählt die
+world.hit-Aufrufe für den Vergleich.
+
+Aufruf:
+    python V8Splitting.py [Breite] [N] [M]
+"""
+
+import math
+import sys
+import time
+from typing import List
+
+from V8Code import Vec3, Ray, Camera, Hittable, ray_color, compute_lighting, random_float, \
+    create_cornell_box, save_ppm
+
+# ============================================================================
+# Zählende Szene
+# ============================================================================
+
+class CountingWorld(Hittable):
+    """Reicht hit() an die Szene weiter und zählt die Aufrufe"""
+    def __init__(self, world: Hittable):
+        self.world = world
+        self.hits = 0
+
+    def hit(self, ray: Ray, t_min: float, t_max: float):
+        self.hits += 1
+        return self.world.hit(ray, t_min, t_max)
+
+# ============================================================================
+# Rendern
+# ============================================================================
+
+def ray_color_split(ray: Ray, world: Hittable, secondary: int) -> Vec3:
+    """ray_color mit secondary Streuungen am ersten Treffer"""
+    hit = world.hit(ray, 0.001, float('inf'))
+    if not hit:
+        t = 0.5 * (ray.direction.y + 1.0)
+        return Vec3(1.0, 1.0, 1.0) * (1.0 - t) + Vec3(0.5, 0.7, 1.0) * t
+
+    light_color = None
+    total = Vec3(0, 0, 0)
+    for _ in range(secondary):
+        scattered_valid, scattered, attenuation = hit.material.scatter(ray, hit)
+        if not scattered_valid:
+            continue
+        if light_color is None:
+            # Hängt nur vom Treffer ab, einmal reicht
+            light_color = compute_lighting(hit.point, hit.normal, world)
+        reflected_color = ray_color(scattered, world, 1)
+        total = total + Vec3(
+            attenuation.x * (light_color.x + reflected_color.x),
+            attenuation.y * (light_color.y + reflected_color.y),
+            attenuation.z * (light_color.z + reflected_color.z)
+        )
+    return total / secondary
+
+
+def render_split(world: Hittable, camera: Camera, width: int, height: int,
+                 primary: int, secondary: int) -> List[List[Vec3]]:
+    """Pixel wie in main() (pixels[j][i]) mit primary x secondary Pfaden"""
+    pixels = [[Vec3(0, 0, 0) for _ in range(width)] for _ in range(height)]
+    for j in range(height):
+        for i in range(width):
+            pixel_color = Vec3(0, 0, 0)
+            for _ in range(primary):
+                u = (i + random_float()) / (width - 1)
+                v = (j + random_float()) / (height - 1)
+                pixel_color = pixel_color + ray_color_split(camera.get_ray(u, v), world, secondary)
+            pixels[j][i] = pixel_color / primary
+    return pixels
+
+
+def render_standard(world: Hittable, camera: Camera, width: int, height: int,
+                    samples: int) -> List[List[Vec3]]:
+    """Wie main(): jedes Sample mit eigenem Kamerastrahl und ray_color"""
+    pixels = [[Vec3(0, 0, 0) for _ in range(width)] for _ in range(height)]
+    for j in range(height):
+        for i in range(width):
+            pixel_color = Vec3(0, 0, 0)
+            for _ in range(samples):
+                u = (i + random_float()) / (width - 1)
+                v = (j + random_float()) / (height - 1)
+                pixel_color = pixel_color + ray_color(camera.get_ray(u, v), world)
+            pixels[j][i] = pixel_color / samples
+    return pixels
+
+
+def rmse(pixels: List[List[Vec3]], reference: List[List[Vec3]]) -> float:
+    """Auf [0, 1] begrenzt wie in save_ppm; das Lichtmaterial (Albedo 15) erzeugt sonst Ausreißer"""
+    def clamp(c: Vec3) -> Vec3:
+        return Vec3(max(0, min(1, c.x)), max(0, min(1, c.y)), max(0, min(1, c.z)))
+
+    total, count = 0.0, 0
+    for row, ref_row in zip(pixels, reference):
+        for a, b in zip(row, ref_row):
+            d = clamp(a) - clamp(b)
+            total += d.dot(d)
+            count += 3
+    return math.sqrt(total / count)
+
+# ============================================================================
+# Hauptprogramm
+# ============================================================================
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    primary = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    secondary = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    samples = primary * secondary
+
+    camera = Camera(lookfrom=Vec3(278, 278, -800), lookat=Vec3(278, 278, 0), vup=Vec3(0, 1, 0),
+                    vfov=40, aspect_ratio=1.0)
+    world = create_cornell_box()
+
+    random_float.seed = 1
+    print(f"Referenz mit {8 * samples} Samples...")
+    reference = render_standard(world, camera, width, width, 8 * samples)
+
+    random_float.seed = 2
+    counting = CountingWorld(world)
+    start = time.perf_counter()
+    standard = render_standard(counting, camera, width, width, samples)
+    print(f"    Standard: {time.perf_counter() - start:6.1f} s, {counting.hits:9d} Schnitttests, "
+          f"RMSE {rmse(standard, reference):.4f}")
+
+    random_float.seed = 2
+    counting = CountingWorld(world)
+    start = time.perf_counter()
+    split = render_split(counting, camera, width, width, primary, secondary)
+    print(f"   Split {primary}x{secondary}: {time.perf_counter() - start:6.1f} s, {counting.hits:9d} Schnitttests, "
+          f"RMSE {rmse(split, reference):.4f}")
+    save_ppm("cornell_box_split.ppm", split, width, width)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 import math
+import os
+import sys
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 import struct
 
+# Gemeinsame Wand-Rechtecke aus Initial/Shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Shared"))
+import AxisRects as axis_rects
+
 # ============================================================================
 # Mathematik-Bibliothek
 # ============================================================================
@@ -138,6 +144,22 @@ class Plane:
         
         return HitRecord(t, point, normal, self.material, front_face)
 
+# ============================================================================
+# Begrenzte Wände
+# ============================================================================
+
+def _rect_hit(t: float, point: Vec3, normal: Vec3, material: Material, ray: Ray) -> HitRecord:
+    front_face = ray.direction.dot(normal) < 0
+    return HitRecord(t, point, normal if front_face else normal * -1, material, front_face)
+
+# Achsenparallele Rechtecke: eine Division und zwei Bereichsprüfungen statt
+# Ebenentest mit nachgelagerter Größenprüfung wie in Plane.hit
+RectX, RectY, RectZ = axis_rects.rect_classes(Vec3, make_hit=_rect_hit)
+
+def planes_to_rects(objects: list) -> list:
+    """Ersetzt die Wand-Ebenen durch Rechtecke mit denselben Grenzen (Punkt ± size)"""
+    return axis_rects.planes_to_rects(objects, Plane, Sphere, (RectX, RectY, RectZ))
+
 # ============================================================================
 # Raytracer Core
 # ============================================================================
@@ -307,6 +329,9 @@ def create_cornell_box():
     world.add(Sphere(Vec3(-1.2, -1, -1), 1.0, sphere_material))
     world.add(Sphere(Vec3(1.5, -1, 0.5), 1.0, mirror))
     
+    # Wände als begrenzte Rechtecke
+    world.objects = planes_to_rects(world.objects)
+    
     return world
 
 def main():
@@ -0,0 +1,199 @@
+"""
+Bildfolgen (Turntable/Animation) für V13CodeDNS.py
+
+Kamera und Objekte bekommen Keyframes (Zeit in [0, 1], linear interpoliert).
+Bewegte Objekte sind TriangleMesh-Netze aus V13Mesh.py: pro Bild werden die
+Ruhe-Eckpunkte transformiert und die BVH nur angepasst (refit_bvh: Hüllen von
+unten nach oben neu berechnen, Aufteilung und Dreiecksreihenfolge bleiben),
+statt sie neu aufzubauen. Alles Statische (Wände, Kugel, Materialien) wird
+pro Worker einmal aufgebaut und für alle Bilder wiederverwendet, ebenso die
+Strahlentabelle der Kamera, solange sich die Kamera nicht bewegt.
+
+Die Bilder werden über einen ProcessPoolExecutor verteilt und als
+nummerierte PNGs (frame_0000.png, ...) gespeichert; am Ende wird der
+Durchsatz in Bildern pro Stunde ausgegeben.
+
+Aufruf:
+    python V13Animation.py [Bilder] [Breite] [Worker] [Ausgabeordner]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from PIL import Image
+
+from V13CodeDNS import Ray, Camera, trace_ray
+from V13Instance import compose, rotate_y, translate
+from V13Mesh import TriangleMesh, build_cornell_box_mesh
+
+# ----------------------------------------------------------------------
+# Keyframes
+# ----------------------------------------------------------------------
+def interpolate(keys, t):
+    """Lineare Interpolation in [(Zeit, Wert), ...] (Werte Zahl oder Vektor)."""
+    if t <= keys[0][0]:
+        return np.asarray(keys[0][1], dtype=np.float64)
+    for (t0, v0), (t1, v1) in zip(keys, keys[1:]):
+        if t <= t1:
+            s = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+            return (1 - s) * np.asarray(v0, dtype=np.float64) + s * np.asarray(v1, dtype=np.float64)
+    return np.asarray(keys[-1][1], dtype=np.float64)
+
+def orbit_keys(center, radius, height, start_deg, end_deg, steps=8):
+    """Kamerapositionen auf einem Kreisbogen um center (als Keyframes)."""
+    keys = []
+    for k in range(steps + 1):
+        a = np.radians(start_deg + (end_deg - start_deg) * k / steps)
+        keys.append((k / steps, (center[0] + radius * np.sin(a), height, center[2] + radius * np.cos(a))))
+    return keys
+
+# ----------------------------------------------------------------------
+# BVH-Refit und bewegte Netze
+# ----------------------------------------------------------------------
+def refit_bvh(mesh):
+    """Berechnet node_bounds nach geänderten Eckpunkten neu (gleiche Topologie).
+
+    Kinder haben in build_bvh immer einen größeren Index als ihr Elternknoten,
+    ein Durchlauf in absteigender Reihenfolge reicht daher.
+    """
+    tri = mesh.vertices[mesh.faces]
+    tri_lo = tri.min(axis=1)
+    tri_hi = tri.max(axis=1)
+    bounds = mesh.node_bounds
+    for node in range(len(mesh.node_data) - 1, -1, -1):
+        first, count = mesh.node_data[node]
+        if count > 0:
+            bounds[node, 0] = tri_lo[first:first + count].min(axis=0)
+            bounds[node, 1] = tri_hi[first:first + count].max(axis=0)
+        else:
+            bounds[node, 0] = np.minimum(bounds[first, 0], bounds[first + 1, 0])
+            bounds[node, 1] = np.maximum(bounds[first, 1], bounds[first + 1, 1])
+
+class AnimatedMesh:
+    """Bewegt ein TriangleMesh der Szene über Keyframes.
+
+    keys: [(Zeit, (Drehung um y in Grad, dx, dy, dz)), ...]; gedreht wird
+    um den Mittelpunkt der Ruhelage.
+    """
+    def __init__(self, mesh, keys):
+        self.mesh = mesh
+        self.keys = keys
+        self.rest = mesh.vertices.copy()
+        lo, hi = self.rest.min(axis=0), self.rest.max(axis=0)
+        self.pivot = (lo + hi) / 2
+
+    def transform(self, t):
+        angle, dx, dy, dz = interpolate(self.keys, t)
+        return compose(translate(*(self.pivot + (dx, dy, dz))), rotate_y(angle), translate(*(-self.pivot)))
+
+    def apply(self, t):
+        m = self.transform(t)
+        mesh = self.mesh
+        mesh.vertices = self.rest @ m[:3, :3].T + m[:3, 3]
+        v0 = mesh.vertices[mesh.faces[:, 0]]
+        mesh.edge1 = mesh.vertices[mesh.faces[:, 1]] - v0
+        mesh.edge2 = mesh.vertices[mesh.faces[:, 2]] - v0
+        refit_bvh(mesh)
+
+# ----------------------------------------------------------------------
+# Sequenz
+# ----------------------------------------------------------------------
+class Sequence:
+    """Szene plus Keyframes für Kamera und Netze; rendert einzelne Bilder."""
+    def __init__(self, scene, camera_keys, look_at_keys, animated=(), up=(0, 1, 0),
+                 viewport_height=0.5, viewport_distance=1.0):
+        self.scene = scene
+        self.camera_keys = camera_keys
+        self.look_at_keys = look_at_keys
+        self.animated = list(animated)
+        self.up = np.array(up, dtype=np.float64)
+        self.viewport_height = viewport_height
+        self.viewport_distance = viewport_distance
+        self._ray_table = (None, None)
+
+    def camera(self, t):
+        return Camera(position=interpolate(self.camera_keys, t), look_at=interpolate(self.look_at_keys, t),
+                      up=self.up, viewport_height=self.viewport_height,
+                      viewport_distance=self.viewport_distance)
+
+    def ray_table(self, camera, width, height):
+        """Richtungen wie Camera.get_ray für alle Pixel; wiederverwendet bei gleicher Kamera."""
+        key = (camera.position.tobytes(), camera.direction.tobytes(), camera.up.tobytes(), width, height)
+        if self._ray_table[0] == key:
+            return self._ray_table[1]
+        half_height = camera.viewport_height / 2.0
+        half_width = half_height * (width / height)
+        ndc_x = 2.0 * np.arange(width) / width - 1.0
+        ndc_y = 1.0 - 2.0 * np.arange(height) / height
+        pixel_local = (camera.right * (ndc_x[None, :, None] * half_width)
+                       + camera.up * (ndc_y[:, None, None] * half_height))
+        table = camera.direction * camera.viewport_distance + pixel_local
+        self._ray_table = (key, table)
+        return table
+
+    def render_frame(self, t, width, height):
+        for anim in self.animated:
+            anim.apply(t)
+        camera = self.camera(t)
+        table = self.ray_table(camera, width, height)
+        image = np.zeros((height, width, 3), dtype=np.float64)
+        for y in range(height):
+            for x in range(width):
+                image[y, x] = trace_ray(Ray(camera.position, table[y, x]), self.scene, 0)
+        return Image.fromarray((image * 255).astype(np.uint8))
+
+def turntable():
+    """Cornell-Box mit drehendem Quader und Kamera auf einem Bogen von ±20°."""
+    scene = build_cornell_box_mesh()
+    box = next(s for s in scene.shapes if isinstance(s, TriangleMesh))
+    return Sequence(scene,
+                    camera_keys=orbit_keys((0, 1, -2), 10.0, 1.0, -20, 20),
+                    look_at_keys=[(0.0, (0, 0.5, -2)), (1.0, (0, 0.5, -2))],
+                    animated=[AnimatedMesh(box, [(0.0, (0, 0, 0, 0)), (1.0, (360, 0, 0, 0))])])
+
+# ----------------------------------------------------------------------
+# Verteilung auf Prozesse
+# ----------------------------------------------------------------------
+_sequence = None
+
+def _init_worker(builder):
+    global _sequence
+    _sequence = builder()
+
+def _render_one(index, frames, width, height, out_dir):
+    start = time.perf_counter()
+    t = index / max(frames - 1, 1)
+    path = os.path.join(out_dir, f"frame_{index:04d}.png")
+    _sequence.render_frame(t, width, height).save(path)
+    return index, time.perf_counter() - start
+
+def render_sequence(builder, frames, width, height, out_dir="frames", workers=None):
+    """Rendert alle Bilder; builder() baut die Sequenz einmal pro Worker.
+
+    Gibt (Sekunden gesamt, Bilder pro Stunde) zurück.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(builder,)) as pool:
+        futures = [pool.submit(_render_one, i, frames, width, height, out_dir) for i in range(frames)]
+        for future in as_completed(futures):
+            index, seconds = future.result()
+            print(f"Bild {index:4d} fertig ({seconds:.1f} s)")
+    total = time.perf_counter() - start
+    return total, frames * 3600.0 / total
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+    out_dir = sys.argv[4] if len(sys.argv) > 4 else "frames"
+
+    print(f"Rendere {frames} Bilder mit {width}x{width} Pixeln auf {workers} Prozessen...")
+    total, per_hour = render_sequence(turntable, frames, width, width, out_dir, workers)
+    print(f"Fertig nach {total:.1f} s: {per_hour:.0f} Bilder pro Stunde, gespeichert in '{out_dir}'")
@@ -0,0 +1,205 @@
+"""
+Gecachter G-Buffer für V13CodeDNS.py: Sichtbarkeit einmal, Licht beliebig oft
+
+Die Primärstrahlen (und die Reflexionsstrahlen, die ja ebenfalls nur von
+Geometrie und Kamera abhängen) werden einmal mit scene.intersect verfolgt.
+Pro Pixel und Tiefe landen Trefferpunkt, Normale, Material-ID und
+Blickrichtung in einem G-Buffer, der als NPZ unter dem SHA-256 von
+Geometrie, Materialien, Kamera und Auflösung abgelegt wird. Die Lichter
+gehen bewusst nicht in den Schlüssel ein. Gespeichert wird in der
+Genauigkeit aus V13Precision.py (Standard float64).
+
+relight rechnet daraus mit NumPy für eine beliebige Liste von Punktlichtern
+Schattenstrahlen, Lambert-Shading und die Reflexionsmischung in derselben
+Reihenfolge wie trace_ray. Wer nur an den Lichtern dreht, zahlt also keine
+Kamerastrahlen mehr, sondern nur noch die Schattenstrahlen.
+
+Aufruf:
+    python V13GBuffer.py [Breite] [vergleichen]
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from V13CodeDNS import Ray, PointLight, Camera, build_cornell_box, reflect, render
+from V13Kernels import pack_scene
+from V13Precision import cast_packed, epsilons, get_precision, occluded, scene_scale
+
+MAGIC = b"V13GBUF\x01"
+CACHE_DIR = ".gbuffer_cache"
+RAY_OFFSET = 1e-4
+
+# ----------------------------------------------------------------------
+# Schlüssel und Aufbau
+# ----------------------------------------------------------------------
+def gbuffer_key(scene, camera, width, height, max_depth=3, precision=None):
+    """SHA-256 über Geometrie, Materialien, Kamera, Auflösung und Genauigkeit (ohne Lichter)."""
+    packed = pack_scene(scene)
+    h = hashlib.sha256(MAGIC + (precision or get_precision()).encode())
+    for name in ("kinds", "prims", "prim_mat", "materials"):
+        h.update(np.ascontiguousarray(packed[name]).tobytes())
+    for arr in (camera.position, camera.direction, camera.right, camera.up):
+        h.update(np.asarray(arr, dtype=np.float64).tobytes())
+    h.update(np.array([camera.viewport_height, camera.viewport_distance], dtype=np.float64).tobytes())
+    h.update(np.array([width, height, max_depth], dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+def build_gbuffer(scene, camera, width, height, max_depth=3, precision=None):
+    """Verfolgt Primär- und Reflexionsstrahlen wie trace_ray, ohne Licht.
+
+    Ebene d enthält den Treffer in Rekursionstiefe d; material = -1 heißt
+    kein Treffer (oder die Kette ist vorher abgebrochen).
+    """
+    packed = pack_scene(scene)
+    index = {}
+    for shape, m in zip(scene.shapes, packed["prim_mat"]):
+        index[id(shape.material)] = int(m)
+
+    layers = max_depth + 1
+    point = np.zeros((layers, height, width, 3), dtype=np.float64)
+    normal = np.zeros((layers, height, width, 3), dtype=np.float64)
+    view = np.zeros((layers, height, width, 3), dtype=np.float64)
+    material = np.full((layers, height, width), -1, dtype=np.int32)
+
+    for y in range(height):
+        for x in range(width):
+            ray = camera.get_ray(x, y, width, height)
+            for depth in range(layers):
+                hit = scene.intersect(ray)
+                if hit is None:
+                    break
+                shape, t, p, n, mat = hit
+                point[depth, y, x] = p
+                normal[depth, y, x] = n
+                view[depth, y, x] = ray.direction
+                material[depth, y, x] = index[id(mat)]
+                if mat.reflectivity <= 0:
+                    break
+                ray = Ray(p + n * RAY_OFFSET, reflect(-ray.direction, n))
+
+    # Verfolgt wird wie in trace_ray mit float64, gespeichert in der Vorgabe
+    dtype = np.dtype(precision or get_precision())
+    return {
+        "point": point.astype(dtype),
+        "normal": normal.astype(dtype),
+        "view": view.astype(dtype),
+        "material": material,
+        "materials": packed["materials"].astype(dtype),
+    }
+
+def save_gbuffer(path, gbuffer):
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **gbuffer)
+    os.replace(tmp, path)
+
+def load_gbuffer(path):
+    with np.load(path) as archive:
+        return {name: archive[name] for name in archive.files}
+
+def cached_gbuffer(scene, camera, width, height, max_depth=3, cache_dir=CACHE_DIR, precision=None):
+    """Lädt den G-Buffer aus dem Cache oder baut und speichert ihn.
+
+    Gibt (gbuffer, aus_cache) zurück.
+    """
+    key = gbuffer_key(scene, camera, width, height, max_depth, precision)
+    path = os.path.join(cache_dir, key + ".npz")
+    if os.path.exists(path):
+        return load_gbuffer(path), True
+    gbuffer = build_gbuffer(scene, camera, width, height, max_depth, precision)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_gbuffer(path, gbuffer)
+    return gbuffer, False
+
+# ----------------------------------------------------------------------
+# Shading aus dem G-Buffer
+# ----------------------------------------------------------------------
+def relight(gbuffer, scene, lights=None):
+    """Bild (H, W, 3) in [0, 1] für die gegebenen Lichter (Standard: scene.lights).
+
+    scene liefert nur noch die Geometrie für die Schattenstrahlen; sie muss
+    zu der passen, aus der der G-Buffer gebaut wurde. Gerechnet wird in der
+    Genauigkeit, in der der G-Buffer gespeichert ist.
+    """
+    lights = scene.lights if lights is None else lights
+    dtype = gbuffer["point"].dtype
+    packed = pack_scene(scene)
+    eps = epsilons(dtype.name, scene_scale(packed))
+    packed = cast_packed(packed, dtype.name)
+    materials = gbuffer["materials"]
+    layers, height, width = gbuffer["material"].shape
+
+    color = np.zeros((height * width, 3), dtype=dtype)
+    for depth in range(layers - 1, -1, -1):
+        mat_id = gbuffer["material"][depth].reshape(-1)
+        hit = np.flatnonzero(mat_id >= 0)
+        m = materials[mat_id[hit]]
+        point = gbuffer["point"][depth].reshape(-1, 3)[hit]
+        normal = gbuffer["normal"][depth].reshape(-1, 3)[hit]
+
+        local = m[:, 3:6].copy()
+        origins = point + normal * dtype.type(eps.ray)
+        for light in lights:
+            light_dir = light.position.astype(dtype) - point
+            light_dist = np.sqrt(np.sum(light_dir * light_dir, axis=1))
+            light_dir = light_dir / light_dist[:, None]
+            # Ray normiert die Richtung erneut
+            dirs = light_dir / np.sqrt(np.sum(light_dir * light_dir, axis=1))[:, None]
+            lit = ~occluded(packed, origins, dirs, light_dist - dtype.type(eps.ray), eps)
+            ndotl = np.maximum(0.0, np.sum(normal * light_dir, axis=1))
+            local[lit] += m[lit, 0:3] * light.color.astype(dtype) * ndotl[lit, None]
+
+        # Reflexionsanteil aus der tieferen Ebene, danach Clipping wie trace_ray
+        refl = m[:, 6]
+        mirror = refl > 0
+        local[mirror] += refl[mirror, None] * color[hit[mirror]]
+        layer = np.zeros_like(color)
+        layer[hit] = np.clip(local, 0, 1)
+        color = layer
+
+    return color.reshape(height, width, 3)
+
+def to_image(color):
+    return Image.fromarray((color * 255).astype(np.uint8))
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    compare = len(sys.argv) > 2 and sys.argv[2] == "vergleichen"
+
+    scene = build_cornell_box()
+    camera = Camera(position=(0, 1, 8), look_at=(0, 1, -2), up=(0, 1, 0),
+                    viewport_height=0.5, viewport_distance=1.0)
+
+    start = time.perf_counter()
+    gbuffer, hit_cache = cached_gbuffer(scene, camera, width, width)
+    print(f"G-Buffer {'aus Cache geladen' if hit_cache else 'aufgebaut'}: "
+          f"{time.perf_counter() - start:.2f} s")
+
+    # Verschiedene Lichtaufstellungen auf demselben G-Buffer
+    setups = {
+        "original": scene.lights,
+        "links": [PointLight(position=(-1.5, 2.5, -1), color=(1, 0.9, 0.8), intensity=1.2)],
+        "zwei": [PointLight(position=(1.5, 2.8, -3), color=(0.6, 0.6, 1.0)),
+                 PointLight(position=(-1.5, 0.5, -0.5), color=(1.0, 0.6, 0.6))],
+    }
+    for name, lights in setups.items():
+        start = time.perf_counter()
+        color = relight(gbuffer, scene, lights)
+        print(f"Licht '{name}': {time.perf_counter() - start:.2f} s")
+        to_image(color).save(f"cornellbox_gbuffer_{name}.png")
+
+    if compare:
+        start = time.perf_counter()
+        reference = render(scene, camera, width, width)
+        print(f"Volles Rendern: {time.perf_counter() - start:.2f} s")
+        original = np.asarray(to_image(relight(gbuffer, scene)))
+        diff = np.abs(original.astype(int) - np.asarray(reference).astype(int))
+        print(f"Abweichende Pixel gegenüber render: {int(np.count_nonzero(diff.max(axis=2)))}, "
+              f"max. {int(diff.max())}")
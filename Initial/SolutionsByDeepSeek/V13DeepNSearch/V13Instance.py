@@ -0,0 +1,181 @@
+"""
+Instanzen: geteilte Geometrie mit affiner Transformation
+
+Ein Instance-Objekt verweist auf eine bereits aufgebaute Geometrie (z.B. ein
+TriangleMesh samt BVH oder eine Kugel) und speichert nur eine 4x4-Matrix mit
+vorberechneter Inverse. Beim Schnitttest wird der Strahl in den Objektraum
+transformiert, Treffpunkt und Normale danach zurück in den Weltraum.
+Speicher und Aufbauzeit hängen so von der Zahl der verschiedenen Netze ab,
+nicht von der Zahl der Kopien.
+"""
+
+import sys
+
+import numpy as np
+
+from V13CodeDNS import Shape, Ray, Sphere, Triangle, PointLight, Scene, Camera, Material, render
+from V13Mesh import TriangleMesh, box_mesh
+
+# ----------------------------------------------------------------------
+# Transformationen (4x4, homogen)
+# ----------------------------------------------------------------------
+def translate(x, y, z):
+    m = np.eye(4)
+    m[:3, 3] = (x, y, z)
+    return m
+
+def scale(sx, sy=None, sz=None):
+    sy = sx if sy is None else sy
+    sz = sx if sz is None else sz
+    return np.diag([sx, sy, sz, 1.0])
+
+def rotate_y(degrees):
+    c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+    m = np.eye(4)
+    m[0, 0], m[0, 2], m[2, 0], m[2, 2] = c, s, -s, c
+    return m
+
+def frame(corner, u, v):
+    """Bildet das Einheitsquadrat [0,1]^2 (z=0) auf corner + a*u + b*v ab."""
+    u = np.asarray(u, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    w = np.cross(u, v)
+    m = np.eye(4)
+    m[:3, 0] = u
+    m[:3, 1] = v
+    m[:3, 2] = w / np.linalg.norm(w)
+    m[:3, 3] = corner
+    return m
+
+def compose(*matrices):
+    """compose(A, B, C) = A @ B @ C, d.h. C wird zuerst angewandt."""
+    m = np.eye(4)
+    for x in matrices:
+        m = m @ x
+    return m
+
+# ----------------------------------------------------------------------
+# Instanz
+# ----------------------------------------------------------------------
+class Instance(Shape):
+    def __init__(self, shape, transform, material=None):
+        self.shape = shape
+        self.transform = np.asarray(transform, dtype=np.float64)
+        # Inverse und Normalenmatrix einmalig vorberechnen
+        self.inverse = np.linalg.inv(self.transform)
+        self.linear = self.transform[:3, :3]
+        self.inv_linear = self.inverse[:3, :3]
+        self.normal_matrix = self.inv_linear.T
+        self.offset = self.transform[:3, 3]
+        self.inv_offset = self.inverse[:3, 3]
+        self.material = material if material is not None else getattr(shape, "material", None)
+        self._override = material is not None
+
+    def intersect(self, ray):
+        local_dir = self.inv_linear @ ray.direction
+        length = np.linalg.norm(local_dir)
+        if length == 0.0:
+            return None
+        # Ray normalisiert die Richtung; t im Objektraum daher umrechnen
+        local = Ray(self.inv_linear @ ray.origin + self.inv_offset, local_dir)
+        hit = self.shape.intersect(local)
+        if hit is None:
+            return None
+        t_local, _, normal, material = hit
+        t = t_local / length
+        point = ray.origin + t * ray.direction
+        normal = self.normal_matrix @ normal
+        normal /= np.linalg.norm(normal)
+        return (t, point, normal, self.material if self._override else material)
+
+    @property
+    def bounds(self):
+        lo, hi = shape_bounds(self.shape)
+        corners = np.array([[x, y, z] for x in (lo[0], hi[0])
+                            for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+        world = corners @ self.linear.T + self.offset
+        return np.array([world.min(axis=0), world.max(axis=0)])
+
+def shape_bounds(shape):
+    """Achsenparallele Hülle (2,3) der bekannten Primitive."""
+    if isinstance(shape, (TriangleMesh, Instance)):
+        return shape.bounds
+    if isinstance(shape, Sphere):
+        return np.array([shape.center - shape.radius, shape.center + shape.radius])
+    if isinstance(shape, Triangle):
+        v = np.array([shape.v0, shape.v1, shape.v2])
+        return np.array([v.min(axis=0), v.max(axis=0)])
+    raise TypeError(f"Keine Hülle für {type(shape).__name__}")
+
+def unit_quad(material):
+    """Einheitsquadrat in der xy-Ebene, Normale +z (zwei Dreiecke)."""
+    return TriangleMesh([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)],
+                        [(0, 1, 2), (0, 2, 3)], material)
+
+def unit_cube(material):
+    return box_mesh((-0.5, -0.5, -0.5), (0.5, 0.5, 0.5), material)
+
+# ----------------------------------------------------------------------
+# Szenenaufbau mit geteilter Geometrie
+# ----------------------------------------------------------------------
+def build_cornell_box_instanced(copies=1):
+    """build_cornell_box mit einem Quadrat für alle Wände und einem Würfel.
+
+    copies > 1 stellt zusätzlich (copies - 1) gedrehte, verkleinerte
+    Würfelkopien auf den Boden; sie teilen sich Netz und BVH des Würfels.
+    """
+    scene = Scene()
+
+    white = Material(diffuse=(0.8, 0.8, 0.8))
+    red   = Material(diffuse=(0.8, 0.2, 0.2))
+    green = Material(diffuse=(0.2, 0.8, 0.2))
+    blue  = Material(diffuse=(0.2, 0.2, 0.8), reflectivity=0.3)
+    grey  = Material(diffuse=(0.6, 0.6, 0.6), reflectivity=0.2)
+
+    quad = unit_quad(white)
+    walls = [
+        ((-2, -1, -4), (4, 0, 0), (0, 0, 4), white),   # Boden
+        ((-2, 3, -4), (0, 0, 4), (4, 0, 0), white),    # Decke
+        ((-2, -1, -4), (4, 0, 0), (0, 4, 0), white),   # Rückwand
+        ((-2, -1, -4), (0, 4, 0), (0, 0, 4), red),     # Linke Wand
+        ((2, -1, -4), (0, 0, 4), (0, 4, 0), green),    # Rechte Wand
+    ]
+    for corner, u, v, material in walls:
+        scene.add_shape(Instance(quad, frame(corner, u, v), material))
+
+    scene.add_shape(Sphere(center=(0, 0.5, -2), radius=0.7, material=blue))
+
+    cube = unit_cube(grey)
+    scene.add_shape(Instance(cube, translate(0, -0.5, -1)))
+    for k in range(1, copies):
+        x = -1.6 + 3.2 * ((k * 0.618) % 1.0)
+        z = -3.6 + 2.8 * ((k * 0.382) % 1.0)
+        scene.add_shape(Instance(cube, compose(translate(x, -0.85, z),
+                                               rotate_y(37 * k), scale(0.3))))
+
+    scene.add_light(PointLight(position=(0, 2.8, -2), color=(1, 1, 1), intensity=1.2))
+    return scene
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    scene = build_cornell_box_instanced(copies)
+
+    meshes = {id(s.shape): s.shape for s in scene.shapes if isinstance(s, Instance)}
+    print(f"{len(scene.shapes)} Objekte, {len(meshes)} verschiedene Netze, "
+          f"{sum(m.nbytes for m in meshes.values())} Byte Geometrie")
+
+    camera = Camera(
+        position=(0, 1, 8),
+        look_at=(0, 1, -2),
+        up=(0, 1, 0),
+        viewport_height=0.5,
+        viewport_distance=1.0
+    )
+    width, height = 512, 512
+    print("Rendere Cornell-Box...")
+    img = render(scene, camera, width, height)
+    img.save("cornellbox.png")
+    print("Bild gespeichert als cornellbox.png")
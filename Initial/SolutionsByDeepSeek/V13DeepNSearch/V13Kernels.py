@@ -0,0 +1,386 @@
+"""
+Optionale Numba-Kernels für V13CodeDNS.py
+
+Die Szene wird in flache Arrays gepackt (ein Primitiv pro Zeile, Reihenfolge
+wie in scene.shapes), darauf laufen mit @njit(parallel=True) übersetzte
+Kernels für Strahlerzeugung, nächsten Treffer, beliebigen Treffer
+(Schattenstrahl) und Lambert-Shading samt Reflexion. Die Kernels rechnen
+dieselben Formeln in derselben Reihenfolge wie trace_ray, das Ergebnis
+stimmt daher mit dem reinen Python-Pfad überein.
+
+Arrays, Framebuffer und Epsilons folgen der Genauigkeitsvorgabe aus
+Initial/Shared/Precision.py (set_precision, V13_PRECISION); mit float64
+gelten genau die Werte aus V13CodeDNS.
+
+Ist Numba nicht installiert, wird automatisch render aus V13CodeDNS
+verwendet. Die übersetzten Kernels legt Numba im __pycache__ neben dieser
+Datei ab (cache=True), die Übersetzungszeit fällt also nur einmal pro
+Rechner an.
+
+Aufruf:
+    python V13Kernels.py [Breite] [numba|python]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from V13CodeDNS import Sphere, Triangle, Camera, build_cornell_box, trace_ray
+
+# Genauigkeitsvorgabe aus Initial/Shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Shared"))
+from Precision import cast_packed, epsilons, get_dtype
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Ersatz ohne Numba: Funktionen bleiben unverändert"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+# Art des Primitivs in der gepackten Tabelle
+KIND_SPHERE = 0
+KIND_TRIANGLE = 1
+KIND_PLANE = 2
+
+# Spalten: Kugel     center(3), radius
+#          Dreieck   v0(3), edge1(3), edge2(3), normal(3)
+#          Ebene     point(3), normal(3)
+PRIM_COLUMNS = 12
+
+# ----------------------------------------------------------------------
+# Packen der Szene
+# ----------------------------------------------------------------------
+def pack_scene(scene, precision=None):
+    """Scene -> dict mit kinds, prims, prim_mat, materials, lights.
+
+    Float-Arrays in der Genauigkeit precision (Standard: globale Vorgabe).
+    """
+    dtype = get_dtype(precision)
+    materials, index = [], {}
+    kinds = np.zeros(len(scene.shapes), dtype=np.int32)
+    prims = np.zeros((len(scene.shapes), PRIM_COLUMNS), dtype=dtype)
+    prim_mat = np.zeros(len(scene.shapes), dtype=np.int32)
+
+    for i, shape in enumerate(scene.shapes):
+        m = shape.material
+        if id(m) not in index:
+            index[id(m)] = len(materials)
+            materials.append(np.concatenate([m.diffuse, m.emission, [m.reflectivity]]))
+        prim_mat[i] = index[id(m)]
+
+        if isinstance(shape, Sphere):
+            kinds[i] = KIND_SPHERE
+            prims[i, 0:3] = shape.center
+            prims[i, 3] = shape.radius
+        elif isinstance(shape, Triangle):
+            kinds[i] = KIND_TRIANGLE
+            prims[i, 0:3] = shape.v0
+            prims[i, 3:6] = shape.edge1
+            prims[i, 6:9] = shape.edge2
+            prims[i, 9:12] = shape.normal
+        elif type(shape).__name__ == "Plane":   # Plane aus V13SceneFile
+            kinds[i] = KIND_PLANE
+            prims[i, 0:3] = shape.point
+            prims[i, 3:6] = shape.normal
+        else:
+            raise TypeError(f"Nicht packbar: {type(shape).__name__}")
+
+    lights = np.array([np.concatenate([l.position, l.color]) for l in scene.lights],
+                      dtype=dtype).reshape(-1, 6)
+    return {
+        "kinds": kinds,
+        "prims": prims,
+        "prim_mat": prim_mat,
+        "materials": np.array(materials, dtype=dtype).reshape(-1, 7),
+        "lights": lights,
+    }
+
+def scene_scale(packed, camera=None):
+    """Größter Koordinatenbetrag der Szene (und der Kamera)."""
+    prims = packed["prims"]
+    scale = float(np.abs(prims[:, 0:3]).max()) if len(prims) else 1.0
+    if camera is not None:
+        scale = max(scale, float(np.abs(camera.position).max()))
+    return max(scale, 1.0)
+
+# ----------------------------------------------------------------------
+# Schnitttests (skalare Kernels)
+# ----------------------------------------------------------------------
+@njit(cache=True, inline="always")
+def _sphere_t(p, ox, oy, oz, dx, dy, dz, ray_eps):
+    ocx = ox - p[0]
+    ocy = oy - p[1]
+    ocz = oz - p[2]
+    a = dx * dx + dy * dy + dz * dz
+    b = 2.0 * (ocx * dx + ocy * dy + ocz * dz)
+    c = (ocx * ocx + ocy * ocy + ocz * ocz) - p[3] * p[3]
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return -1.0
+    sqrt_disc = np.sqrt(disc)
+    t1 = (-b - sqrt_disc) / (2 * a)
+    t2 = (-b + sqrt_disc) / (2 * a)
+    if t1 > ray_eps:
+        return min(t1, t2)
+    if t2 > ray_eps:
+        return t2
+    return -1.0
+
+@njit(cache=True, inline="always")
+def _triangle_t(p, ox, oy, oz, dx, dy, dz, ray_eps, parallel_eps):
+    # Möller–Trumbore wie Triangle.intersect
+    hx = dy * p[8] - dz * p[7]
+    hy = dz * p[6] - dx * p[8]
+    hz = dx * p[7] - dy * p[6]
+    a = p[3] * hx + p[4] * hy + p[5] * hz
+    if abs(a) < parallel_eps:
+        return -1.0
+    f = 1.0 / a
+    sx = ox - p[0]
+    sy = oy - p[1]
+    sz = oz - p[2]
+    u = f * (sx * hx + sy * hy + sz * hz)
+    if u < 0.0 or u > 1.0:
+        return -1.0
+    qx = sy * p[5] - sz * p[4]
+    qy = sz * p[3] - sx * p[5]
+    qz = sx * p[4] - sy * p[3]
+    v = f * (dx * qx + dy * qy + dz * qz)
+    if v < 0.0 or u + v > 1.0:
+        return -1.0
+    t = f * (p[6] * qx + p[7] * qy + p[8] * qz)
+    if t > ray_eps:
+        return t
+    return -1.0
+
+@njit(cache=True, inline="always")
+def _plane_t(p, ox, oy, oz, dx, dy, dz, ray_eps, parallel_eps):
+    denom = p[3] * dx + p[4] * dy + p[5] * dz
+    if abs(denom) < parallel_eps:
+        return -1.0
+    t = ((p[0] - ox) * p[3] + (p[1] - oy) * p[4] + (p[2] - oz) * p[5]) / denom
+    if t > ray_eps:
+        return t
+    return -1.0
+
+@njit(cache=True)
+def closest_hit(kinds, prims, ox, oy, oz, dx, dy, dz, ray_eps, parallel_eps):
+    """Index und t des nächsten Treffers, (-1, inf) ohne Treffer."""
+    best = -1
+    closest_t = np.inf
+    for i in range(kinds.shape[0]):
+        k = kinds[i]
+        if k == 0:
+            t = _sphere_t(prims[i], ox, oy, oz, dx, dy, dz, ray_eps)
+        elif k == 1:
+            t = _triangle_t(prims[i], ox, oy, oz, dx, dy, dz, ray_eps, parallel_eps)
+        else:
+            t = _plane_t(prims[i], ox, oy, oz, dx, dy, dz, ray_eps, parallel_eps)
+        if t > 0.0 and t < closest_t:
+            closest_t = t
+            best = i
+    return best, closest_t
+
+@njit(cache=True)
+def any_hit(kinds, prims, ox, oy, oz, dx, dy, dz, t_max, ray_eps, parallel_eps):
+    """True, sobald irgendein Primitiv vor t_max getroffen wird."""
+    for i in range(kinds.shape[0]):
+        k = kinds[i]
+        if k == 0:
+            t = _sphere_t(prims[i], ox, oy, oz, dx, dy, dz, ray_eps)
+        elif k == 1:
+            t = _triangle_t(prims[i], ox, oy, oz, dx, dy, dz, ray_eps, parallel_eps)
+        else:
+            t = _plane_t(prims[i], ox, oy, oz, dx, dy, dz, ray_eps, parallel_eps)
+        if t > 0.0 and t < t_max:
+            return True
+    return False
+
+# ----------------------------------------------------------------------
+# Strahlerzeugung und Shading
+# ----------------------------------------------------------------------
+@njit(cache=True, parallel=True)
+def generate_rays(position, direction, right, up, viewport_height, viewport_distance,
+                  width, height):
+    """Normierte Strahlrichtungen (height, width, 3) wie Camera.get_ray."""
+    dirs = np.empty((height, width, 3), dtype=direction.dtype)
+    half_height = viewport_height / 2.0
+    aspect = width / height
+    half_width = half_height * aspect
+    for y in prange(height):
+        for x in range(width):
+            ndc_x = (2.0 * x / width - 1.0)
+            ndc_y = (1.0 - 2.0 * y / height)
+            rx = direction[0] * viewport_distance + (right[0] * (ndc_x * half_width) + up[0] * (ndc_y * half_height))
+            ry = direction[1] * viewport_distance + (right[1] * (ndc_x * half_width) + up[1] * (ndc_y * half_height))
+            rz = direction[2] * viewport_distance + (right[2] * (ndc_x * half_width) + up[2] * (ndc_y * half_height))
+            n = np.sqrt(rx * rx + ry * ry + rz * rz)
+            dirs[y, x, 0] = rx / n
+            dirs[y, x, 1] = ry / n
+            dirs[y, x, 2] = rz / n
+    return dirs
+
+@njit(cache=True)
+def shade(kinds, prims, prim_mat, materials, lights, ox, oy, oz, dx, dy, dz, max_depth,
+          ray_eps, parallel_eps):
+    """Iterative Fassung von trace_ray (Lambert + Reflexion, Clipping je Tiefe)."""
+    local = np.zeros((max_depth + 1, 3), dtype=prims.dtype)
+    refl = np.zeros(max_depth + 1, dtype=prims.dtype)
+    levels = 0
+    for depth in range(max_depth + 1):
+        i, t = closest_hit(kinds, prims, ox, oy, oz, dx, dy, dz, ray_eps, parallel_eps)
+        if i < 0:
+            break
+        levels += 1
+        px = ox + t * dx
+        py = oy + t * dy
+        pz = oz + t * dz
+        p = prims[i]
+        if kinds[i] == 0:
+            nx = px - p[0]
+            ny = py - p[1]
+            nz = pz - p[2]
+            n = np.sqrt(nx * nx + ny * ny + nz * nz)
+            nx /= n
+            ny /= n
+            nz /= n
+        elif kinds[i] == 1:
+            nx, ny, nz = p[9], p[10], p[11]
+        else:
+            nx, ny, nz = p[3], p[4], p[5]
+        m = materials[prim_mat[i]]
+
+        cr, cg, cb = m[3], m[4], m[5]
+        for l in range(lights.shape[0]):
+            lx = lights[l, 0] - px
+            ly = lights[l, 1] - py
+            lz = lights[l, 2] - pz
+            dist = np.sqrt(lx * lx + ly * ly + lz * lz)
+            lx /= dist
+            ly /= dist
+            lz /= dist
+            # Ray normiert die Richtung erneut
+            n = np.sqrt(lx * lx + ly * ly + lz * lz)
+            if any_hit(kinds, prims, px + nx * ray_eps, py + ny * ray_eps, pz + nz * ray_eps,
+                       lx / n, ly / n, lz / n, dist - ray_eps, ray_eps, parallel_eps):
+                continue
+            ndotl = max(0.0, nx * lx + ny * ly + nz * lz)
+            cr += m[0] * lights[l, 3] * ndotl
+            cg += m[1] * lights[l, 4] * ndotl
+            cb += m[2] * lights[l, 5] * ndotl
+        local[depth, 0] = cr
+        local[depth, 1] = cg
+        local[depth, 2] = cb
+        refl[depth] = m[6]
+        if m[6] <= 0:
+            break
+
+        # Reflexion wie in trace_ray: reflect(-ray.direction, normal)
+        ix, iy, iz = -dx, -dy, -dz
+        k = 2 * (ix * nx + iy * ny + iz * nz)
+        rx = ix - k * nx
+        ry = iy - k * ny
+        rz = iz - k * nz
+        n = np.sqrt(rx * rx + ry * ry + rz * rz)
+        ox, oy, oz = px + nx * ray_eps, py + ny * ray_eps, pz + nz * ray_eps
+        dx, dy, dz = rx / n, ry / n, rz / n
+
+    # Von der tiefsten Ebene zurück aufsummieren, jeweils auf [0, 1] begrenzt
+    r = g = b = 0.0
+    for depth in range(levels - 1, -1, -1):
+        if refl[depth] > 0:
+            r = local[depth, 0] + refl[depth] * r
+            g = local[depth, 1] + refl[depth] * g
+            b = local[depth, 2] + refl[depth] * b
+        else:
+            r, g, b = local[depth, 0], local[depth, 1], local[depth, 2]
+        r = min(max(r, 0.0), 1.0)
+        g = min(max(g, 0.0), 1.0)
+        b = min(max(b, 0.0), 1.0)
+    return r, g, b
+
+@njit(cache=True, parallel=True)
+def render_kernel(kinds, prims, prim_mat, materials, lights, origin, dirs, max_depth,
+                  ray_eps, parallel_eps):
+    height, width = dirs.shape[0], dirs.shape[1]
+    image = np.zeros((height, width, 3), dtype=dirs.dtype)
+    for y in prange(height):
+        for x in range(width):
+            r, g, b = shade(kinds, prims, prim_mat, materials, lights,
+                            origin[0], origin[1], origin[2],
+                            dirs[y, x, 0], dirs[y, x, 1], dirs[y, x, 2], max_depth,
+                            ray_eps, parallel_eps)
+            image[y, x, 0] = r
+            image[y, x, 1] = g
+            image[y, x, 2] = b
+    return image
+
+# ----------------------------------------------------------------------
+# Auswahl des Backends
+# ----------------------------------------------------------------------
+def default_backend():
+    """'numba', falls importierbar, sonst 'python'; per V13_BACKEND überschreibbar."""
+    return os.environ.get("V13_BACKEND", "numba" if HAVE_NUMBA else "python")
+
+def render_python(scene, camera, width, height, max_depth=3, precision=None):
+    """V13CodeDNS.render, aber mit wählbarer Rekursionstiefe."""
+    image = np.zeros((height, width, 3), dtype=get_dtype(precision))
+    for y in range(height):
+        for x in range(width):
+            image[y, x] = trace_ray(camera.get_ray(x, y, width, height), scene, 0, max_depth)
+    return Image.fromarray((image * 255).astype(np.uint8))
+
+def render(scene, camera, width, height, backend=None, max_depth=3, precision=None):
+    """Wie V13CodeDNS.render, wahlweise mit den Numba-Kernels."""
+    backend = backend or default_backend()
+    if backend == "python":
+        return render_python(scene, camera, width, height, max_depth, precision)
+    if backend != "numba":
+        raise ValueError(f"Unbekanntes Backend: {backend}")
+    if not HAVE_NUMBA:
+        raise ImportError("Backend 'numba' gewählt, aber numba ist nicht installiert")
+
+    dtype = get_dtype(precision)
+    packed = pack_scene(scene, precision)
+    eps = epsilons(precision, scene_scale(packed, camera))
+    view = cast_packed({"position": camera.position, "direction": camera.direction,
+                        "right": camera.right, "up": camera.up}, precision)
+    dirs = generate_rays(view["position"], view["direction"], view["right"], view["up"],
+                         dtype.type(camera.viewport_height), dtype.type(camera.viewport_distance),
+                         width, height)
+    image = render_kernel(packed["kinds"], packed["prims"], packed["prim_mat"],
+                          packed["materials"], packed["lights"], view["position"],
+                          dirs, max_depth, dtype.type(eps.ray), dtype.type(eps.parallel))
+    return Image.fromarray((image * 255).astype(np.uint8))
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    backend = sys.argv[2] if len(sys.argv) > 2 else default_backend()
+
+    scene = build_cornell_box()
+    camera = Camera(
+        position=(0, 1, 8),
+        look_at=(0, 1, -2),
+        up=(0, 1, 0),
+        viewport_height=0.5,
+        viewport_distance=1.0
+    )
+    print(f"Rendere Cornell-Box ({size}x{size}, Backend {backend})...")
+    start = time.perf_counter()
+    img = render(scene, camera, size, size, backend)
+    print(f"Renderzeit: {time.perf_counter() - start:.2f} s")
+    img.save("cornellbox.png")
+    print("Bild gespeichert als cornellbox.png")
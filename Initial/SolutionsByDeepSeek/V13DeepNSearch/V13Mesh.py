@@ -0,0 +1,359 @@
+"""
+Indiziertes Dreiecksnetz (TriangleMesh) mit OBJ/PLY-Loader und BVH
+
+Ein Triangle-Objekt aus V13CodeDNS speichert v0/v1/v2/edge1/edge2/normal als
+eigene NumPy-Arrays und kostet damit mehrere hundert Byte pro Dreieck. Ein
+TriangleMesh hält stattdessen alle Eckpunkte und Flächen in zusammenhängenden
+Arrays (geteilte Eckpunkte nur einmal), die Kanten werden einmalig
+vorberechnet. Der Schnitttest läuft über eine BVH pro Netz, in deren Blättern
+bis zu LEAF_SIZE Dreiecke vektorisiert getestet werden.
+"""
+
+import sys
+from array import array
+
+import numpy as np
+
+from V13CodeDNS import Shape, Material, Camera, render, build_cornell_box
+
+LEAF_SIZE = 8
+EPSILON = 1e-8
+T_MIN = 1e-4
+
+# ----------------------------------------------------------------------
+# Dreiecksnetz
+# ----------------------------------------------------------------------
+class TriangleMesh(Shape):
+    """Dreiecksnetz mit Eckpunkt-/Indexpuffer und eigener BVH.
+
+    Speicher pro Dreieck: 3 Indizes (12 Byte) + edge1/edge2 (48 Byte)
+    + anteilig die BVH-Knoten; die Eckpunkte werden geteilt.
+    """
+    def __init__(self, vertices, faces, material):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float64).reshape(-1, 3)
+        faces = np.ascontiguousarray(faces, dtype=np.int32).reshape(-1, 3)
+        self.material = material
+
+        # BVH bauen; dabei werden die Flächen so umsortiert, dass jedes Blatt
+        # einen zusammenhängenden Bereich belegt
+        order, self.node_bounds, self.node_data = build_bvh(self.vertices[faces])
+        self.faces = np.ascontiguousarray(faces[order])
+
+        v0 = self.vertices[self.faces[:, 0]]
+        self.edge1 = self.vertices[self.faces[:, 1]] - v0
+        self.edge2 = self.vertices[self.faces[:, 2]] - v0
+
+    def __len__(self):
+        return len(self.faces)
+
+    @property
+    def nbytes(self):
+        return (self.vertices.nbytes + self.faces.nbytes + self.edge1.nbytes +
+                self.edge2.nbytes + self.node_bounds.nbytes + self.node_data.nbytes)
+
+    @property
+    def bounds(self):
+        return self.node_bounds[0]
+
+    def _intersect_leaf(self, origin, direction, start, count, t_max):
+        """Möller–Trumbore für alle Dreiecke eines Blatts gleichzeitig."""
+        sl = slice(start, start + count)
+        e1 = self.edge1[sl]
+        e2 = self.edge2[sl]
+        h = np.cross(direction, e2)
+        a = np.einsum('ij,ij->i', e1, h)
+        valid = np.abs(a) > EPSILON
+        f = np.divide(1.0, a, out=np.zeros_like(a), where=valid)
+        s = origin - self.vertices[self.faces[sl, 0]]
+        u = f * np.einsum('ij,ij->i', s, h)
+        q = np.cross(s, e1)
+        v = f * (q @ direction)
+        t = f * np.einsum('ij,ij->i', e2, q)
+        valid &= (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0) & (t > T_MIN) & (t < t_max)
+        if not valid.any():
+            return None
+        t = np.where(valid, t, np.inf)
+        k = int(np.argmin(t))
+        return float(t[k]), start + k
+
+    def intersect(self, ray):
+        origin = ray.origin
+        direction = ray.direction
+        with np.errstate(divide='ignore'):
+            inv_dir = 1.0 / direction
+
+        best_t = np.inf
+        best_face = -1
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            lo, hi = self.node_bounds[node]
+            # Slab-Test gegen die Box des Knotens
+            with np.errstate(invalid='ignore'):
+                t0 = (lo - origin) * inv_dir
+                t1 = (hi - origin) * inv_dir
+            t_near = np.nanmax(np.minimum(t0, t1))
+            t_far = np.nanmin(np.maximum(t0, t1))
+            if t_near > t_far or t_far < T_MIN or t_near > best_t:
+                continue
+            first, count = self.node_data[node]
+            if count > 0:
+                hit = self._intersect_leaf(origin, direction, first, count, best_t)
+                if hit is not None:
+                    best_t, best_face = hit
+            else:
+                # Innerer Knoten: first ist das linke Kind, das rechte folgt direkt
+                stack.append(first)
+                stack.append(first + 1)
+
+        if best_face < 0:
+            return None
+        normal = np.cross(self.edge1[best_face], self.edge2[best_face])
+        normal /= np.linalg.norm(normal)
+        point = origin + best_t * direction
+        return (best_t, point, normal, self.material)
+
+# ----------------------------------------------------------------------
+# BVH-Aufbau (flache Arrays)
+# ----------------------------------------------------------------------
+def build_bvh(triangles):
+    """Baut eine BVH über Dreiecke (F,3,3) durch Median-Teilung.
+
+    Rückgabe: (Reihenfolge der Dreiecke, node_bounds (N,2,3),
+    node_data (N,2) int32). Für Blätter ist node_data = (Start, Anzahl),
+    für innere Knoten (Index des linken Kindes, 0); das rechte Kind liegt
+    direkt dahinter.
+    """
+    count = len(triangles)
+    tri_lo = triangles.min(axis=1)
+    tri_hi = triangles.max(axis=1)
+    centroids = triangles.mean(axis=1)
+    order = np.arange(count, dtype=np.int64)
+
+    max_nodes = max(1, 2 * ((count + LEAF_SIZE - 1) // LEAF_SIZE) + 1) * 2
+    node_bounds = np.zeros((max_nodes, 2, 3), dtype=np.float64)
+    node_data = np.zeros((max_nodes, 2), dtype=np.int32)
+    node_count = 1
+
+    stack = [(0, 0, count)]
+    while stack:
+        node, start, end = stack.pop()
+        idx = order[start:end]
+        if len(idx):
+            node_bounds[node, 0] = tri_lo[idx].min(axis=0)
+            node_bounds[node, 1] = tri_hi[idx].max(axis=0)
+        n = end - start
+        if n <= LEAF_SIZE:
+            node_data[node] = (start, n)
+            continue
+
+        c = centroids[idx]
+        axis = int(np.argmax(c.max(axis=0) - c.min(axis=0)))
+        # Median-Teilung entlang der längsten Achse der Schwerpunkte
+        mid = n // 2
+        part = np.argpartition(c[:, axis], mid)
+        order[start:end] = idx[part]
+
+        if node_count + 2 > len(node_bounds):
+            node_bounds = np.concatenate([node_bounds, np.zeros_like(node_bounds)])
+            node_data = np.concatenate([node_data, np.zeros_like(node_data)])
+        left = node_count
+        node_count += 2
+        node_data[node] = (left, 0)
+        stack.append((left, start, start + mid))
+        stack.append((left + 1, start + mid, end))
+
+    return order, node_bounds[:node_count].copy(), node_data[:node_count].copy()
+
+# ----------------------------------------------------------------------
+# Loader
+# ----------------------------------------------------------------------
+def load_obj(path):
+    """Liest Eckpunkte und Flächen einer OBJ-Datei zeilenweise.
+
+    Polygone werden als Fächer trianguliert, Texturkoordinaten und
+    Normalen (v/vt/vn) ignoriert, negative Indizes unterstützt.
+    """
+    verts = array('d')
+    faces = array('i')
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("v "):
+                x, y, z = line.split()[1:4]
+                verts.extend((float(x), float(y), float(z)))
+            elif line.startswith("f "):
+                n_verts = len(verts) // 3
+                idx = []
+                for token in line.split()[1:]:
+                    i = int(token.split("/", 1)[0])
+                    idx.append(i - 1 if i > 0 else n_verts + i)
+                for k in range(1, len(idx) - 1):
+                    faces.extend((idx[0], idx[k], idx[k + 1]))
+    vertices = np.frombuffer(verts, dtype=np.float64).reshape(-1, 3)
+    return vertices, np.frombuffer(faces, dtype=np.int32).reshape(-1, 3)
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+def load_ply(path):
+    """Liest eine PLY-Datei (ascii oder binär) mit vertex- und face-Element."""
+    with open(path, "rb") as f:
+        if f.readline().strip() != b"ply":
+            raise ValueError(f"Keine PLY-Datei: {path}")
+        fmt = None
+        elements = []   # [name, anzahl, [(name, typ) | (name, ("list", n_typ, i_typ))]]
+        while True:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"Unvollständiger PLY-Kopf: {path}")
+            words = line.decode("ascii").split()
+            if not words or words[0] == "comment":
+                continue
+            if words[0] == "format":
+                fmt = words[1]
+            elif words[0] == "element":
+                elements.append([words[1], int(words[2]), []])
+            elif words[0] == "property":
+                if words[1] == "list":
+                    elements[-1][2].append((words[4], ("list", PLY_TYPES[words[2]], PLY_TYPES[words[3]])))
+                else:
+                    elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+            elif words[0] == "end_header":
+                break
+
+        endian = {"binary_little_endian": "<", "binary_big_endian": ">"}.get(fmt)
+        vertices = faces = None
+        for name, count, props in elements:
+            if fmt == "ascii":
+                data = _read_ply_ascii(f, count, props)
+            else:
+                data = _read_ply_binary(f, count, props, endian)
+            if name == "vertex":
+                vertices = np.stack([data["x"], data["y"], data["z"]], axis=1).astype(np.float64)
+            elif name == "face":
+                faces = data["vertex_indices" if "vertex_indices" in data else "vertex_index"]
+    if vertices is None or faces is None:
+        raise ValueError(f"PLY-Datei ohne vertex/face: {path}")
+    return vertices, faces
+
+def _triangulate(polygons):
+    out = array('i')
+    for p in polygons:
+        for k in range(1, len(p) - 1):
+            out.extend((p[0], p[k], p[k + 1]))
+    return np.frombuffer(out, dtype=np.int32).reshape(-1, 3)
+
+def _read_ply_ascii(f, count, props):
+    columns = {name: [] for name, _ in props}
+    for _ in range(count):
+        values = f.readline().split()
+        k = 0
+        for name, kind in props:
+            if isinstance(kind, tuple):
+                n = int(values[k])
+                columns[name].append([int(v) for v in values[k + 1:k + 1 + n]])
+                k += 1 + n
+            else:
+                columns[name].append(float(values[k]))
+                k += 1
+    return {name: (_triangulate(col) if isinstance(kind, tuple) else np.array(col))
+            for (name, kind), col in zip(props, columns.values())}
+
+def _read_ply_binary(f, count, props, endian):
+    if not any(isinstance(kind, tuple) for _, kind in props):
+        # Nur Skalare: das ganze Element in einem Stück lesen
+        dtype = np.dtype([(name, endian + kind) for name, kind in props])
+        data = np.frombuffer(f.read(dtype.itemsize * count), dtype=dtype, count=count)
+        return {name: data[name] for name, _ in props}
+
+    if len(props) == 1:
+        # Schneller Pfad: reine Dreiecksliste mit fester Satzlänge
+        name, (_, n_type, i_type) = props[0]
+        dtype = np.dtype([("n", endian + n_type), ("i", endian + i_type, 3)])
+        start = f.tell()
+        data = np.frombuffer(f.read(dtype.itemsize * count), dtype=dtype, count=count)
+        if len(data) == count and np.all(data["n"] == 3):
+            return {name: data["i"].astype(np.int32)}
+        f.seek(start)
+
+    columns = {name: [] for name, _ in props}
+    for _ in range(count):
+        for name, kind in props:
+            if isinstance(kind, tuple):
+                n_dt = np.dtype(endian + kind[1])
+                i_dt = np.dtype(endian + kind[2])
+                n = int(np.frombuffer(f.read(n_dt.itemsize), dtype=n_dt)[0])
+                columns[name].append(np.frombuffer(f.read(i_dt.itemsize * n), dtype=i_dt).tolist())
+            else:
+                dt = np.dtype(endian + kind)
+                columns[name].append(np.frombuffer(f.read(dt.itemsize), dtype=dt)[0])
+    return {name: (_triangulate(col) if isinstance(kind, tuple) else np.array(col))
+            for (name, kind), col in zip(props, columns.values())}
+
+def load_mesh(path, material, scale=1.0, offset=(0, 0, 0)):
+    """Lädt eine OBJ- oder PLY-Datei als TriangleMesh (skaliert und verschoben)."""
+    if path.lower().endswith(".ply"):
+        vertices, faces = load_ply(path)
+    else:
+        vertices, faces = load_obj(path)
+    vertices = vertices * scale + np.asarray(offset, dtype=np.float64)
+    return TriangleMesh(vertices, faces, material)
+
+# ----------------------------------------------------------------------
+# Quader als indiziertes Netz
+# ----------------------------------------------------------------------
+def box_mesh(lo, hi, material):
+    """Achsenparalleler Quader aus 8 Eckpunkten und 12 Dreiecken (Normalen außen)."""
+    (x0, y0, z0), (x1, y1, z1) = lo, hi
+    vertices = [(x0, y0, z0), (x1, y0, z0), (x1, y1, z0), (x0, y1, z0),
+                (x0, y0, z1), (x1, y0, z1), (x1, y1, z1), (x0, y1, z1)]
+    faces = [(4, 5, 6), (4, 6, 7),   # z = z1
+             (0, 2, 1), (0, 3, 2),   # z = z0
+             (0, 4, 7), (0, 7, 3),   # x = x0
+             (1, 2, 6), (1, 6, 5),   # x = x1
+             (0, 1, 5), (0, 5, 4),   # y = y0
+             (3, 7, 6), (3, 6, 2)]   # y = y1
+    return TriangleMesh(vertices, faces, material)
+
+def build_cornell_box_mesh(mesh_path=None, scale=1.0, offset=(0, -1, -1)):
+    """build_cornell_box, aber der Quader ist ein TriangleMesh.
+
+    Optional wird zusätzlich ein Netz aus einer OBJ/PLY-Datei eingefügt.
+    """
+    scene = build_cornell_box()
+    # Die letzten 12 Dreiecke sind der graue Quader
+    grey = scene.shapes[-1].material
+    scene.shapes = scene.shapes[:-12]
+    scene.add_shape(box_mesh((-0.5, -1, -1.5), (0.5, 0, -0.5), grey))
+    if mesh_path:
+        scene.add_shape(load_mesh(mesh_path, Material(diffuse=(0.7, 0.7, 0.7)), scale, offset))
+    return scene
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    mesh_path = sys.argv[1] if len(sys.argv) > 1 else None
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    scene = build_cornell_box_mesh(mesh_path, scale)
+    for shape in scene.shapes:
+        if isinstance(shape, TriangleMesh):
+            print(f"Netz: {len(shape)} Dreiecke, {shape.nbytes / len(shape):.1f} Byte pro Dreieck")
+
+    camera = Camera(
+        position=(0, 1, 8),
+        look_at=(0, 1, -2),
+        up=(0, 1, 0),
+        viewport_height=0.5,
+        viewport_distance=1.0
+    )
+    width, height = 512, 512
+    print("Rendere Cornell-Box...")
+    img = render(scene, camera, width, height)
+    img.save("cornellbox.png")
+    print("Bild gespeichert als cornellbox.png")
@@ -0,0 +1,273 @@
+"""
+Globale Rechengenauigkeit (float32/float64) für die gebündelten NumPy-Pfade
+
+V13CodeDNS.py rechnet jeden Strahl einzeln und legt alles als float64 an.
+Für gebündelte Strahlen (ein Array pro Wellenfront) verdoppelt float64 aber
+Speicherbandbreite und Cache-Druck, ohne dass man es im 8-Bit-Bild sieht.
+Hier gilt eine globale Vorgabe (set_precision oder Umgebungsvariable
+V13_PRECISION, aus Initial/Shared/Precision.py), der Szenen-Arrays,
+Strahlen, Framebuffer und alle gebündelten Kernels folgen, auch relight in
+V13GBuffer.py und die Numba-Kernels in V13Kernels.py.
+
+Die Epsilons aus V13CodeDNS (1e-4 für Strahlversatz und t_min, 1e-8 für
+parallele Strahlen) gelten für float64. Mit float32 wachsen sie mit der
+Maschinengenauigkeit und der Szenengröße mit, siehe epsilons.
+
+render_batched verfolgt alle Pixel als Wellenfront (Primärstrahlen,
+Schattenstrahlen, Reflexionen bis max_depth) in Blöcken von batch_size
+Strahlen; benchmark vergleicht den Durchsatz beider Genauigkeiten, für
+render_batched und, falls installiert, für die Numba-Kernels. Mit
+float64 stimmt das Ergebnis mit render überein, bis auf einzelne Pixel an
+Kanten, an denen zwei Primitive beim selben t getroffen werden und die
+letzte Stelle der Rundung entscheidet.
+
+Aufruf:
+    python V13Precision.py [Breite] [Wiederholungen]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from V13CodeDNS import Camera, build_cornell_box, render
+from V13Kernels import HAVE_NUMBA, KIND_SPHERE, KIND_TRIANGLE, pack_scene, scene_scale
+from V13Kernels import render as render_numba
+
+# Die Vorgabe selbst liegt in Initial/Shared/Precision.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Shared"))
+from Precision import (PRECISIONS, RAY_EPSILON, PARALLEL_EPSILON, Epsilons, set_precision,
+                       get_precision, get_dtype, epsilons, cast_packed)
+
+# ----------------------------------------------------------------------
+# Gebündelte Schnitttests
+# ----------------------------------------------------------------------
+def hit_t(kind, p, o, d, eps):
+    """t je Strahl für ein Primitiv wie dessen intersect, inf ohne Treffer."""
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if kind == KIND_SPHERE:
+            oc = o - p[0:3]
+            a = np.sum(d * d, axis=1)
+            b = 2.0 * np.sum(oc * d, axis=1)
+            c = np.sum(oc * oc, axis=1) - p[3] * p[3]
+            disc = b * b - 4 * a * c
+            sqrt_disc = np.sqrt(np.maximum(disc, 0.0))
+            t1 = (-b - sqrt_disc) / (2 * a)
+            t2 = (-b + sqrt_disc) / (2 * a)
+            t = np.where(t1 > eps.ray, np.minimum(t1, t2),
+                         np.where(t2 > eps.ray, t2, np.inf))
+            return np.where(disc < 0, np.inf, t)
+        if kind == KIND_TRIANGLE:
+            edge1, edge2 = p[3:6], p[6:9]
+            h = np.cross(d, edge2)
+            a = h @ edge1
+            f = 1.0 / a
+            s = o - p[0:3]
+            u = f * np.sum(s * h, axis=1)
+            q = np.cross(s, edge1)
+            v = f * np.sum(d * q, axis=1)
+            t = f * (q @ edge2)
+            ok = ((np.abs(a) >= eps.parallel) & (u >= 0.0) & (u <= 1.0) &
+                  (v >= 0.0) & (u + v <= 1.0) & (t > eps.ray))
+            return np.where(ok, t, np.inf)
+        # Ebene
+        n = p[3:6]
+        denom = d @ n
+        t = ((p[0:3] - o) @ n) / denom
+        return np.where((np.abs(denom) >= eps.parallel) & (t > eps.ray), t, np.inf)
+
+def occluded(packed, origins, dirs, t_max, eps):
+    """True je Strahl, falls irgendein Primitiv vor t_max getroffen wird."""
+    blocked = np.zeros(len(origins), dtype=bool)
+    for kind, p in zip(packed["kinds"], packed["prims"]):
+        open_ = ~blocked
+        if not open_.any():
+            break
+        t = hit_t(kind, p, origins[open_], dirs[open_], eps)
+        blocked[open_] = t < t_max[open_]
+    return blocked
+
+def closest(packed, origins, dirs, eps):
+    """(Index, t) des nächsten Treffers je Strahl, Index -1 ohne Treffer."""
+    best_t = np.full(len(origins), np.inf, dtype=origins.dtype)
+    best = np.full(len(origins), -1, dtype=np.int32)
+    for i, (kind, p) in enumerate(zip(packed["kinds"], packed["prims"])):
+        t = hit_t(kind, p, origins, dirs, eps)
+        closer = t < best_t
+        best_t[closer] = t[closer]
+        best[closer] = i
+    return best, best_t
+
+def _normalize(v):
+    return v / np.sqrt(np.sum(v * v, axis=1))[:, None]
+
+# ----------------------------------------------------------------------
+# Wellenfront-Renderer
+# ----------------------------------------------------------------------
+def primary_rays(camera, width, height, dtype):
+    """Normierte Strahlrichtungen (height * width, 3) wie Camera.get_ray."""
+    y, x = np.mgrid[0:height, 0:width]
+    ndc_x = (2.0 * x.ravel() / width - 1.0).astype(dtype)
+    ndc_y = (1.0 - 2.0 * y.ravel() / height).astype(dtype)
+    half_height = camera.viewport_height / 2.0
+    half_width = half_height * (width / height)
+    direction, right, up = (np.asarray(a, dtype=dtype) for a in
+                            (camera.direction, camera.right, camera.up))
+    pixel_local = right * (ndc_x * dtype.type(half_width))[:, None] + \
+        up * (ndc_y * dtype.type(half_height))[:, None]
+    return _normalize(direction * dtype.type(camera.viewport_distance) + pixel_local)
+
+def trace_batch(packed, lights, origins, dirs, max_depth, eps, stats):
+    """Farben (N, 3) für einen Block Strahlen, wie trace_ray."""
+    dtype = origins.dtype
+    n = len(origins)
+    local = np.zeros((max_depth + 1, n, 3), dtype=dtype)
+    refl = np.zeros((max_depth + 1, n), dtype=dtype)
+    alive = np.arange(n)
+
+    for depth in range(max_depth + 1):
+        if not len(alive):
+            break
+        stats["rays"] += len(alive)
+        index, t = closest(packed, origins, dirs, eps)
+        hit = index >= 0
+        alive, index, t = alive[hit], index[hit], t[hit]
+        origins, dirs = origins[hit], dirs[hit]
+
+        point = origins + t[:, None] * dirs
+        kinds = packed["kinds"][index]
+        prims = packed["prims"][index]
+        normal = np.where((kinds == KIND_TRIANGLE)[:, None], prims[:, 9:12], prims[:, 3:6])
+        sphere = kinds == KIND_SPHERE
+        if sphere.any():
+            normal[sphere] = _normalize(point[sphere] - prims[sphere, 0:3])
+
+        m = packed["materials"][packed["prim_mat"][index]]
+        color = m[:, 3:6].copy()
+        shadow_origins = point + normal * dtype.type(eps.ray)
+        for light in lights:
+            light_dir = light[0:3] - point
+            light_dist = np.sqrt(np.sum(light_dir * light_dir, axis=1))
+            light_dir = light_dir / light_dist[:, None]
+            stats["rays"] += len(point)
+            lit = ~occluded(packed, shadow_origins, _normalize(light_dir),
+                            light_dist - dtype.type(eps.ray), eps)
+            ndotl = np.maximum(0.0, np.sum(normal * light_dir, axis=1))
+            color[lit] += m[lit, 0:3] * light[3:6] * ndotl[lit, None]
+        local[depth, alive] = color
+        refl[depth, alive] = m[:, 6]
+
+        # Reflexion wie in trace_ray: reflect(-ray.direction, normal)
+        mirror = m[:, 6] > 0
+        alive, point, normal, dirs = alive[mirror], point[mirror], normal[mirror], dirs[mirror]
+        incident = -dirs
+        reflected = incident - 2 * np.sum(incident * normal, axis=1)[:, None] * normal
+        origins = point + normal * dtype.type(eps.ray)
+        dirs = _normalize(reflected)
+
+    # Von der tiefsten Ebene zurück, jeweils auf [0, 1] begrenzt
+    result = np.zeros((n, 3), dtype=dtype)
+    for depth in range(max_depth, -1, -1):
+        result = np.clip(local[depth] + refl[depth][:, None] * result, 0, 1)
+    return result
+
+def render_batched(scene, camera, width, height, max_depth=3, precision=None,
+                   batch_size=1 << 16, stats=None):
+    """Wie V13CodeDNS.render, gebündelt in der gewählten Genauigkeit."""
+    dtype = get_dtype(precision)
+    packed = pack_scene(scene, precision)
+    eps = epsilons(precision, scene_scale(packed, camera))
+    lights = packed["lights"]
+    stats = stats if stats is not None else {}
+    stats.setdefault("rays", 0)
+
+    dirs = primary_rays(camera, width, height, dtype)
+    origin = np.asarray(camera.position, dtype=dtype)
+    image = np.empty((height * width, 3), dtype=dtype)
+    for start in range(0, len(dirs), batch_size):
+        block = dirs[start:start + batch_size]
+        origins = np.broadcast_to(origin, block.shape).copy()
+        image[start:start + batch_size] = trace_batch(packed, lights, origins, block,
+                                                      max_depth, eps, stats)
+    return image.reshape(height, width, 3)
+
+def to_image(image):
+    return Image.fromarray((image * 255).astype(np.uint8))
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def benchmark(scene, camera, width, height, repeats=3):
+    """Durchsatz pro Genauigkeit (bestes von repeats) und Abweichung zu float64.
+
+    results[precision] gilt für render_batched; ist Numba installiert, stehen
+    die Zeiten der Numba-Kernels in results["numba"][precision].
+    """
+    results, images = {}, {}
+    for precision in PRECISIONS:
+        best = float("inf")
+        for _ in range(repeats):
+            stats = {"rays": 0}
+            start = time.perf_counter()
+            image = render_batched(scene, camera, width, height, precision=precision, stats=stats)
+            best = min(best, time.perf_counter() - start)
+        images[precision] = np.asarray(to_image(image)).astype(int)
+        results[precision] = {"seconds": best, "rays": stats["rays"],
+                              "mrays_per_s": stats["rays"] / best / 1e6,
+                              "eps": epsilons(precision, scene_scale(pack_scene(scene, precision), camera))}
+    diff = np.abs(images["float32"] - images["float64"]).max(axis=2)
+    results["float32"]["pixels_differ"] = int(np.count_nonzero(diff))
+    results["float32"]["max_diff"] = int(diff.max())
+
+    if HAVE_NUMBA:
+        numba_results, numba_images = {}, {}
+        for precision in PRECISIONS:
+            # Übersetzung für diesen Typ nicht mitmessen
+            render_numba(scene, camera, 8, 8, "numba", precision=precision)
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                image = render_numba(scene, camera, width, height, "numba", precision=precision)
+                best = min(best, time.perf_counter() - start)
+            numba_images[precision] = np.asarray(image).astype(int)
+            numba_results[precision] = {"seconds": best,
+                                        "mpixels_per_s": width * height / best / 1e6}
+        diff = np.abs(numba_images["float32"] - numba_images["float64"]).max(axis=2)
+        numba_results["float32"]["pixels_differ"] = int(np.count_nonzero(diff))
+        numba_results["float32"]["max_diff"] = int(diff.max())
+        results["numba"] = numba_results
+    return results, images
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    scene = build_cornell_box()
+    camera = Camera(position=(0, 1, 8), look_at=(0, 1, -2), up=(0, 1, 0),
+                    viewport_height=0.5, viewport_distance=1.0)
+
+    print(f"Benchmark {width}x{width}, bestes von {repeats}:")
+    results, images = benchmark(scene, camera, width, width, repeats)
+    for precision in PRECISIONS:
+        r = results[precision]
+        print(f"  {precision}: {r['seconds']:.2f} s, {r['rays']} Strahlen, "
+              f"{r['mrays_per_s']:.2f} MStrahlen/s (Versatz {r['eps'].ray:.1e}, "
+              f"parallel {r['eps'].parallel:.1e})")
+    r = results["float32"]
+    print(f"  Speedup float32: {results['float64']['seconds'] / r['seconds']:.2f}x, "
+          f"{r['pixels_differ']} Pixel abweichend (max. {r['max_diff']}/255)")
+    if "numba" in results:
+        print("Numba-Kernels:")
+        numba_results = results["numba"]
+        for precision in PRECISIONS:
+            r = numba_results[precision]
+            print(f"  {precision}: {r['seconds']:.2f} s, {r['mpixels_per_s']:.2f} MPixel/s")
+        r = numba_results["float32"]
+        print(f"  Speedup float32: {numba_results['float64']['seconds'] / r['seconds']:.2f}x, "
+              f"{r['pixels_differ']} Pixel abweichend (max. {r['max_diff']}/255)")
+    Image.fromarray(images[get_precision()].astype(np.uint8)).save("cornellbox_batched.png")
@@ -0,0 +1,268 @@
+"""
+Szenenbeschreibung als Datei (JSON/TOML) mit kompiliertem Binär-Cache
+
+Statt die Szene in build_cornell_box per Code aufzubauen, wird sie aus einer
+Beschreibungsdatei gelesen. Beim ersten Laden wird die Beschreibung in ein
+Binärformat übersetzt (gepackte Float-Arrays pro Primitivtyp plus
+Materialtabelle) und unter dem SHA-256 des Dateiinhalts abgelegt. Jedes
+weitere Laden ist dann ein einziges mmap ohne Parsen und ohne Vektor-Aufbau.
+
+Aufbau einer Szenendatei (JSON, TOML analog):
+    camera:    position, look_at, up, viewport_height, viewport_distance
+    materials: name -> diffuse, emission, reflectivity
+    lights:    Liste aus position, color, intensity
+    objects:   Liste aus
+               sphere   (center, radius)
+               triangle (vertices: 3 Punkte)
+               quad     (corner, u, v)
+               rect     (axis, offset, min, max, flip) - achsenparalleles Rechteck
+               plane    (point, normal)
+               jeweils mit material
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from V13CodeDNS import Shape, Sphere, Triangle, Material, PointLight, Scene, Camera, render, normalize, dot
+
+MAGIC = b"V13SCN\x00\x01"
+ALIGN = 64
+CACHE_DIR = ".scene_cache"
+
+# Reihenfolge der Materialspalten in der gepackten Tabelle
+MATERIAL_COLUMNS = 7   # diffuse(3), emission(3), reflectivity
+
+# ----------------------------------------------------------------------
+# Ebene (unbegrenzt)
+# ----------------------------------------------------------------------
+class Plane(Shape):
+    def __init__(self, point, normal, material):
+        self.point = np.array(point, dtype=np.float64)
+        self.normal = normalize(np.array(normal, dtype=np.float64))
+        self.material = material
+
+    def intersect(self, ray):
+        denom = dot(self.normal, ray.direction)
+        if abs(denom) < 1e-8:
+            return None
+        t = dot(self.point - ray.origin, self.normal) / denom
+        if t > 1e-4:
+            point = ray.origin + t * ray.direction
+            return (t, point, self.normal, self.material)
+        return None
+
+# ----------------------------------------------------------------------
+# Einlesen der Beschreibung
+# ----------------------------------------------------------------------
+def parse_source(path, data):
+    """Liest JSON oder TOML (nach Dateiendung) in ein dict."""
+    if path.endswith(".toml"):
+        import tomllib  # ab Python 3.11 in der Standardbibliothek
+        return tomllib.loads(data.decode("utf-8"))
+    return json.loads(data.decode("utf-8"))
+
+def rect_to_quad(obj):
+    """Achsenparalleles Rechteck -> (corner, u, v).
+
+    axis ist die Normalenachse, offset die Lage der Ebene auf dieser Achse,
+    min/max die Grenzen auf den beiden anderen Achsen (zyklisch: x->(y,z),
+    y->(z,x), z->(x,y)). flip dreht die Normale um.
+    """
+    axis = "xyz".index(obj["axis"])
+    a, b = (axis + 1) % 3, (axis + 2) % 3
+    (a0, b0), (a1, b1) = obj["min"], obj["max"]
+    corner = [0.0, 0.0, 0.0]
+    corner[axis] = obj["offset"]
+    corner[a] = a0
+    corner[b] = b0
+    u = [0.0, 0.0, 0.0]
+    v = [0.0, 0.0, 0.0]
+    u[a] = a1 - a0
+    v[b] = b1 - b0
+    if obj.get("flip", False):
+        u, v = v, u
+    return corner, u, v
+
+def compile_scene(desc):
+    """Übersetzt die Beschreibung in gepackte Arrays und einen Kopf (dict)."""
+    names = list(desc.get("materials", {}))
+    index = {name: i for i, name in enumerate(names)}
+    materials = np.zeros((len(names), MATERIAL_COLUMNS), dtype=np.float64)
+    for i, name in enumerate(names):
+        m = desc["materials"][name]
+        materials[i, 0:3] = m.get("diffuse", (0, 0, 0))
+        materials[i, 3:6] = m.get("emission", (0, 0, 0))
+        materials[i, 6] = m.get("reflectivity", 0.0)
+
+    spheres, triangles, quads, planes = [], [], [], []
+    sphere_mat, triangle_mat, quad_mat, plane_mat = [], [], [], []
+    for obj in desc.get("objects", []):
+        kind = obj["type"]
+        mat = index[obj["material"]]
+        if kind == "sphere":
+            spheres.append(list(obj["center"]) + [obj["radius"]])
+            sphere_mat.append(mat)
+        elif kind == "triangle":
+            triangles.append(obj["vertices"])
+            triangle_mat.append(mat)
+        elif kind == "quad":
+            quads.append([obj["corner"], obj["u"], obj["v"]])
+            quad_mat.append(mat)
+        elif kind == "rect":
+            quads.append(list(rect_to_quad(obj)))
+            quad_mat.append(mat)
+        elif kind == "plane":
+            planes.append([obj["point"], obj["normal"]])
+            plane_mat.append(mat)
+        else:
+            raise ValueError(f"Unbekannter Objekttyp: {kind}")
+
+    lights = np.array([list(l["position"]) +
+                       [c * l.get("intensity", 1.0) for c in l.get("color", (1, 1, 1))]
+                       for l in desc.get("lights", [])], dtype=np.float64).reshape(-1, 6)
+
+    arrays = {
+        "materials": materials,
+        "spheres": np.array(spheres, dtype=np.float64).reshape(-1, 4),
+        "sphere_mat": np.array(sphere_mat, dtype=np.int32),
+        "triangles": np.array(triangles, dtype=np.float64).reshape(-1, 3, 3),
+        "triangle_mat": np.array(triangle_mat, dtype=np.int32),
+        "quads": np.array(quads, dtype=np.float64).reshape(-1, 3, 3),
+        "quad_mat": np.array(quad_mat, dtype=np.int32),
+        "planes": np.array(planes, dtype=np.float64).reshape(-1, 2, 3),
+        "plane_mat": np.array(plane_mat, dtype=np.int32),
+        "lights": lights,
+    }
+    header = {"material_names": names, "camera": desc.get("camera", {})}
+    return header, arrays
+
+# ----------------------------------------------------------------------
+# Binärformat
+# ----------------------------------------------------------------------
+def write_compiled(path, header, arrays):
+    """Schreibt Kopf und Arrays; jedes Array beginnt an einer 64-Byte-Grenze.
+
+    Layout: MAGIC | uint64 Kopflänge | Kopf (JSON) | Arrays
+    """
+    entries = {}
+    offset = 0
+    for name, arr in arrays.items():
+        offset = (offset + ALIGN - 1) // ALIGN * ALIGN
+        entries[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+    header = dict(header, arrays=entries)
+    head = json.dumps(header).encode("utf-8")
+    data_start = (len(MAGIC) + 8 + len(head) + ALIGN - 1) // ALIGN * ALIGN
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(head)))
+        f.write(head)
+        for name, arr in arrays.items():
+            f.seek(data_start + entries[name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+class CompiledScene:
+    """Gemappte Binärszene; die Arrays sind schreibgeschützte Sichten ins mmap."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Keine kompilierte Szene: {path}")
+        (head_len,) = struct.unpack_from("<Q", self._mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._mm[start:start + head_len].decode("utf-8"))
+        data_start = (start + head_len + ALIGN - 1) // ALIGN * ALIGN
+        self.arrays = {}
+        for name, e in self.header["arrays"].items():
+            dtype = np.dtype(e["dtype"])
+            count = int(np.prod(e["shape"])) if e["shape"] else 1
+            arr = np.frombuffer(self._mm, dtype=dtype, count=count,
+                                offset=data_start + e["offset"])
+            self.arrays[name] = arr.reshape(e["shape"])
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    @property
+    def camera(self):
+        return self.header["camera"]
+
+    @property
+    def material_names(self):
+        return self.header["material_names"]
+
+# ----------------------------------------------------------------------
+# Laden mit Cache
+# ----------------------------------------------------------------------
+def load_compiled(path, cache_dir=None):
+    """Lädt die kompilierte Form einer Szenendatei, kompiliert bei Bedarf.
+
+    Der Cache-Schlüssel ist der Hash des Dateiinhalts; eine geänderte
+    Szenendatei erzeugt daher automatisch einen neuen Eintrag.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    key = hashlib.sha256(MAGIC + data).hexdigest()
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    compiled = os.path.join(cache_dir, key + ".bin")
+    if not os.path.exists(compiled):
+        os.makedirs(cache_dir, exist_ok=True)
+        header, arrays = compile_scene(parse_source(path, data))
+        write_compiled(compiled, header, arrays)
+    return CompiledScene(compiled)
+
+def build_scene(packed):
+    """Erzeugt Scene und Camera aus V13CodeDNS aus einer kompilierten Szene."""
+    materials = [Material(diffuse=row[0:3], emission=row[3:6], reflectivity=float(row[6]))
+                 for row in packed["materials"]]
+    scene = Scene()
+    for s, m in zip(packed["spheres"], packed["sphere_mat"]):
+        scene.add_shape(Sphere(center=s[0:3], radius=float(s[3]), material=materials[m]))
+    for v, m in zip(packed["triangles"], packed["triangle_mat"]):
+        scene.add_shape(Triangle(v[0], v[1], v[2], materials[m]))
+    for (c, u, v), m in zip(packed["quads"], packed["quad_mat"]):
+        # Quad als zwei Dreiecke, Normale in Richtung u x v
+        scene.add_shape(Triangle(c, c + u, c + u + v, materials[m]))
+        scene.add_shape(Triangle(c, c + u + v, c + v, materials[m]))
+    for (p, n), m in zip(packed["planes"], packed["plane_mat"]):
+        scene.add_shape(Plane(p, n, materials[m]))
+    for l in packed["lights"]:
+        scene.add_light(PointLight(position=l[0:3], color=l[3:6]))
+
+    cam = packed.camera
+    camera = Camera(
+        position=cam.get("position", (0, 1, 8)),
+        look_at=np.array(cam.get("look_at", (0, 1, -2)), dtype=np.float64),
+        up=np.array(cam.get("up", (0, 1, 0)), dtype=np.float64),
+        viewport_height=cam.get("viewport_height", 0.5),
+        viewport_distance=cam.get("viewport_distance", 1.0)
+    )
+    return scene, camera
+
+def load_scene(path, cache_dir=None):
+    """Kurzform: Szenendatei -> (Scene, Camera)."""
+    return build_scene(load_compiled(path, cache_dir))
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "cornell_box.json")
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+
+    scene, camera = load_scene(source)
+    print(f"Rendere {source} ({size}x{size})...")
+    img = render(scene, camera, size, size)
+    img.save("cornellbox.png")
+    print("Bild gespeichert als cornellbox.png")
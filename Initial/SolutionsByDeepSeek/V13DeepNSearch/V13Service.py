@@ -0,0 +1,330 @@
+"""
+Lokaler Render-Dienst (asyncio) für die V13-Renderer
+
+Statt für jedes Bild ein neues Skript zu starten (Interpreter, NumPy und
+Numba jedes Mal neu), läuft ein Dienst auf localhost (HTTP) oder einem
+Unix-Socket. Aufträge bestehen aus einer Szenenbeschreibung im Format von
+V13SceneFile.py (als JSON-Objekt) und Einstellungen; sie landen in einer
+Prioritätswarteschlange (kleinere Zahl zuerst, bei Gleichstand in
+Eingangsreihenfolge) und laufen in einem vorgewärmten Prozess-Pool mit
+höchstens workers gleichzeitigen Renders. Jeder Worker importiert beim
+Start alle Renderer und rendert ein Miniaturbild, sodass die
+Numba-Übersetzung nicht im ersten Auftrag anfällt.
+
+Schnittstelle (HTTP/1.1, ohne Netzwerkzugriff nach außen):
+    POST /render   JSON {"scene": {...}, "width", "height", "backend", "priority"}
+                   -> PNG als Chunked-Stream, Statistik in X-Render-*-Headern
+    GET  /stats    -> JSON mit Warteschlange, laufenden und fertigen Aufträgen
+
+backend ist "numba" (V13Kernels), "batched" (V13Precision) oder "python"
+(V13CodeDNS). Ohne "scene" wird cornell_box.json gerendert. Breite und Höhe
+müssen zwischen 1 und max_size (MAX_SIZE) liegen, sonst antwortet der
+Dienst mit 400. Stürzt ein Worker ab, scheitert sein Auftrag mit 500 und
+der Pool wird neu angelegt.
+
+Aufruf:
+    python V13Service.py serve [Port|unix:Pfad] [Worker] [Maximalgröße]
+    python V13Service.py render Szene.json Ausgabe.png [Breite] [Priorität] [Port|unix:Pfad]
+"""
+
+import asyncio
+import concurrent.futures
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from V13SceneFile import build_scene, compile_scene
+
+DEFAULT_PORT = 8713
+DEFAULT_SCENE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cornell_box.json")
+BACKENDS = ("numba", "batched", "python")
+CHUNK_SIZE = 1 << 16
+MAX_BODY = 64 << 20
+MAX_SIZE = 4096
+
+# ----------------------------------------------------------------------
+# Arbeit im Worker-Prozess
+# ----------------------------------------------------------------------
+class InlineScene(dict):
+    """Kompilierte Szene im Speicher, wie CompiledScene für build_scene"""
+    def __init__(self, header, arrays):
+        super().__init__(arrays)
+        self.camera = header.get("camera", {})
+
+def render_image(desc, width, height, backend):
+    """Rendert eine Szenenbeschreibung, gibt (PIL-Bild, Aufbauzeit) zurück."""
+    start = time.perf_counter()
+    scene, camera = build_scene(InlineScene(*compile_scene(desc)))
+    build_time = time.perf_counter() - start
+    if backend == "numba":
+        from V13Kernels import render
+        image = render(scene, camera, width, height, "numba")
+    elif backend == "batched":
+        from V13Precision import render_batched, to_image
+        image = to_image(render_batched(scene, camera, width, height))
+    elif backend == "python":
+        from V13CodeDNS import render
+        image = render(scene, camera, width, height)
+    else:
+        raise ValueError(f"Unbekanntes Backend: {backend}")
+    return image, build_time
+
+def warm_worker():
+    """Initialisierung eines Workers: Importe und Numba-Kernels vorab laden."""
+    with open(DEFAULT_SCENE, "rb") as f:
+        desc = json.loads(f.read().decode("utf-8"))
+    from V13Kernels import HAVE_NUMBA
+    for backend in ("numba", "batched") if HAVE_NUMBA else ("batched",):
+        render_image(desc, 8, 8, backend)
+
+def run_job(desc, width, height, backend):
+    """Einstiegspunkt im Worker: PNG-Bytes und Statistik."""
+    start = time.perf_counter()
+    image, build_time = render_image(desc, width, height, backend)
+    render_time = time.perf_counter() - start - build_time
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue(), {
+        "build_seconds": build_time,
+        "render_seconds": render_time,
+        "encode_seconds": time.perf_counter() - start - build_time - render_time,
+        "worker_pid": os.getpid(),
+    }
+
+# ----------------------------------------------------------------------
+# Dienst
+# ----------------------------------------------------------------------
+class RenderService:
+    def __init__(self, workers=2, max_size=MAX_SIZE):
+        self.workers = workers
+        self.max_size = max_size
+        self.queue = asyncio.PriorityQueue()
+        self.counter = itertools.count()
+        self.stats = {"queued": 0, "running": 0, "done": 0, "failed": 0, "pool_restarts": 0}
+        self.pool = None
+        self.dispatchers = []
+
+    def new_pool(self):
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, initializer=warm_worker)
+
+    async def start(self):
+        self.pool = self.new_pool()
+        # Alle Worker sofort starten (und damit aufwärmen)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.pool, time.sleep, 0)
+                               for _ in range(self.workers)])
+        self.dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+
+    async def submit(self, desc, width, height, backend, priority=0):
+        """Stellt einen Auftrag ein und wartet auf (png, stats)."""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unbekanntes Backend: {backend}")
+        for name, value in (("Breite", width), ("Höhe", height)):
+            if not 1 <= value <= self.max_size:
+                raise ValueError(f"{name} muss zwischen 1 und {self.max_size} liegen, nicht {value}")
+        job_id = next(self.counter)
+        future = asyncio.get_running_loop().create_future()
+        self.stats["queued"] += 1
+        await self.queue.put((priority, job_id, (desc, width, height, backend), time.perf_counter(), future))
+        png, stats = await future
+        return png, dict(stats, job_id=job_id, priority=priority)
+
+    async def dispatch(self):
+        """Holt Aufträge nach Priorität; je Dispatcher höchstens ein laufender Render."""
+        loop = asyncio.get_running_loop()
+        while True:
+            priority, job_id, args, queued_at, future = await self.queue.get()
+            self.stats["queued"] -= 1
+            if future.cancelled():
+                continue
+            self.stats["running"] += 1
+            queue_time = time.perf_counter() - queued_at
+            pool = self.pool
+            try:
+                png, stats = await loop.run_in_executor(pool, run_job, *args)
+            except Exception as e:
+                # Abgestürzter Worker: der ganze Pool ist unbrauchbar. Nur der
+                # erste Dispatcher, der es bemerkt, legt einen neuen an.
+                if isinstance(e, BrokenProcessPool) and self.pool is pool:
+                    self.stats["pool_restarts"] += 1
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = self.new_pool()
+                self.stats["failed"] += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.stats["done"] += 1
+                if not future.done():
+                    future.set_result((png, dict(stats, queue_seconds=queue_time)))
+            finally:
+                self.stats["running"] -= 1
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    async def handle(self, reader, writer):
+        try:
+            method, path, body = await read_request(reader)
+            if method == "GET" and path == "/stats":
+                await send_response(writer, 200, "application/json",
+                                    json.dumps(dict(self.stats, workers=self.workers)).encode())
+            elif method == "POST" and path == "/render":
+                job = json.loads(body.decode("utf-8") or "{}")
+                desc = job.get("scene")
+                if desc is None:
+                    with open(DEFAULT_SCENE, "rb") as f:
+                        desc = json.loads(f.read().decode("utf-8"))
+                width = int(job.get("width", 256))
+                height = int(job.get("height", width))
+                try:
+                    png, stats = await self.submit(desc, width, height, job.get("backend", "numba"),
+                                                   int(job.get("priority", 0)))
+                except KeyError as e:
+                    await send_response(writer, 400, "text/plain", f"Fehlender Eintrag: {e}".encode())
+                except (ValueError, TypeError) as e:
+                    await send_response(writer, 400, "text/plain", str(e).encode())
+                else:
+                    headers = {f"X-Render-{key.replace('_', '-').title()}":
+                               f"{value:.4f}" if isinstance(value, float) else str(value)
+                               for key, value in stats.items()}
+                    await send_response(writer, 200, "image/png", png, headers)
+            else:
+                await send_response(writer, 404, "text/plain", b"Nicht gefunden")
+        except (ValueError, json.JSONDecodeError) as e:
+            await send_response(writer, 400, "text/plain", str(e).encode())
+        except Exception as e:
+            await send_response(writer, 500, "text/plain", f"{type(e).__name__}: {e}".encode())
+        finally:
+            writer.close()
+
+async def read_request(reader):
+    """Anfragezeile, Header und Rumpf (Content-Length) einer HTTP-Anfrage."""
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    parts = request_line.split()
+    if len(parts) != 3:
+        raise ValueError(f"Ungültige Anfrage: {request_line!r}")
+    headers = await read_headers(reader)
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY:
+        raise ValueError("Anfrage zu groß")
+    body = await reader.readexactly(length) if length else b""
+    return parts[0], parts[1].split("?")[0], body
+
+async def read_headers(reader):
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            return headers
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+async def send_response(writer, status, content_type, body, headers=None):
+    """Antwort mit Chunked-Transfer, der Rumpf geht in CHUNK_SIZE-Stücken raus."""
+    reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+    lines = [f"HTTP/1.1 {status} {reasons[status]}",
+             f"Content-Type: {content_type}",
+             "Transfer-Encoding: chunked",
+             "Connection: close"]
+    lines += [f"{key}: {value}" for key, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    for start in range(0, len(body), CHUNK_SIZE):
+        chunk = body[start:start + CHUNK_SIZE]
+        writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+async def serve(address=DEFAULT_PORT, workers=2, max_size=MAX_SIZE):
+    service = RenderService(workers, max_size)
+    await service.start()
+    if isinstance(address, str) and address.startswith("unix:"):
+        server = await asyncio.start_unix_server(service.handle, path=address[5:])
+    else:
+        server = await asyncio.start_server(service.handle, "127.0.0.1", int(address))
+    print(f"Render-Dienst bereit auf {address} mit {workers} Workern")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+async def request(method, path, payload=None, address=DEFAULT_PORT):
+    """Schickt eine Anfrage an den Dienst, gibt (Status, Header, Rumpf) zurück."""
+    if isinstance(address, str) and address.startswith("unix:"):
+        reader, writer = await asyncio.open_unix_connection(address[5:])
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", int(address))
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = await read_headers(reader)
+    chunks = []
+    while True:
+        size = int((await reader.readline()).strip(), 16)
+        if size == 0:
+            break
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+    writer.close()
+    return status, headers, b"".join(chunks)
+
+async def render_remote(desc=None, width=256, height=None, backend="numba", priority=0,
+                        address=DEFAULT_PORT):
+    """Rendert über den Dienst, gibt (PNG-Bytes, Statistik) zurück."""
+    payload = {"width": width, "height": height or width, "backend": backend, "priority": priority}
+    if desc is not None:
+        payload["scene"] = desc
+    status, headers, body = await request("POST", "/render", payload, address)
+    if status != 200:
+        raise RuntimeError(f"Dienst meldet {status}: {body.decode('utf-8', 'replace')}")
+    stats = {key[len("x-render-"):]: value for key, value in headers.items()
+             if key.startswith("x-render-")}
+    return body, stats
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    if mode == "serve":
+        address = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PORT
+        workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+        max_size = int(sys.argv[4]) if len(sys.argv) > 4 else MAX_SIZE
+        try:
+            asyncio.run(serve(address, workers, max_size))
+        except KeyboardInterrupt:
+            pass
+    elif mode == "render":
+        source = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SCENE
+        output = sys.argv[3] if len(sys.argv) > 3 else "cornellbox.png"
+        width = int(sys.argv[4]) if len(sys.argv) > 4 else 256
+        priority = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+        address = sys.argv[6] if len(sys.argv) > 6 else DEFAULT_PORT
+        with open(source, "rb") as f:
+            desc = json.loads(f.read().decode("utf-8"))
+        start = time.perf_counter()
+        png, stats = asyncio.run(render_remote(desc, width, priority=priority, address=address))
+        with open(output, "wb") as f:
+            f.write(png)
+        print(f"{output} in {time.perf_counter() - start:.2f} s: " +
+              ", ".join(f"{key}={value}" for key, value in stats.items()))
+    else:
+        raise ValueError(f"Unbekannter Modus: {mode}")
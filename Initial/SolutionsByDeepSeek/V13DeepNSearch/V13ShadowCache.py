@@ -0,0 +1,377 @@
+"""
+Schattencache für statische Punktlichter in V13CodeDNS.py
+
+trace_ray schickt an jedem Treffer einen Schattenstrahl gegen alle Objekte
+zum Punktlicht, obwohl sich Licht und Geometrie während eines Bildes nicht
+bewegen. ShadowGrid teilt die Szene einmal pro Licht in ein Voxelgitter und
+stuft jede Zelle, in der Oberflächen liegen, konservativ ein:
+
+- VISIBLE: kein Objekt schneidet den Schaft (konvexe Hülle aus Licht und
+  Zelle), der Punkt ist ohne Strahl beleuchtet.
+- OCCLUDED: ein einzelnes konvexes Objekt (Kugel, Dreieck) schneidet die
+  Strecken von allen Zellecken zum Licht und damit, weil die Menge dieser
+  Punkte konvex ist, die Strecken aller Punkte der Zelle.
+- BOUNDARY: sonst; der Schattenstrahl wird exakt verfolgt, aber nur gegen
+  die Objekte, die den Schaft nicht sicher verfehlen.
+
+Betrachtet wird nicht die ganze Zelle, sondern die Hüllbox der
+Oberflächenstücke in ihr, vergrößert um die Verschiebung des
+Strahlursprungs. Ein Dreieck, dessen Ebene diese Box nicht vom Licht trennt
+(z.B. der Boden für eine Zelle am Boden), kann keinen Punkt der Zelle
+verdecken. Der Schafttest ist ein Test auf trennende Achsen mit einer
+festen Achsenauswahl: findet er keine, gilt das Objekt als Kandidat.
+
+Aufruf:
+    python V13ShadowCache.py [Breite] [Gitterauflösung]
+"""
+
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from V13CodeDNS import Ray, Sphere, Triangle, Camera, build_cornell_box, dot, reflect, \
+    render as render_exact
+
+# Zustände der Gitterzellen
+VISIBLE = 0
+OCCLUDED = 1
+BOUNDARY = 2
+EMPTY = 3       # keine Oberfläche bekannt: exakter Strahl gegen alles
+
+# Ursprungsverschiebung und Mindestabstand der Schattenstrahlen in trace_ray
+RAY_OFFSET = 1e-4
+# Abstand, den ein verdeckendes Objekt zur Zelle und zum Licht halten muss
+OCCLUDER_MARGIN = 4 * RAY_OFFSET
+EPS = 1e-9
+
+# ----------------------------------------------------------------------
+# Hilfsfunktionen
+# ----------------------------------------------------------------------
+def _clip_polygon(poly, lo, hi):
+    """Sutherland-Hodgman: Polygon (Liste von Tupeln) an der Box [lo, hi] abschneiden."""
+    for axis in range(3):
+        for bound, sign in ((lo[axis], 1.0), (hi[axis], -1.0)):
+            if not poly:
+                return poly
+            out = []
+            prev = poly[-1]
+            d_prev = sign * (prev[axis] - bound)
+            for cur in poly:
+                d_cur = sign * (cur[axis] - bound)
+                if (d_cur >= 0) != (d_prev >= 0):
+                    s = d_prev / (d_prev - d_cur)
+                    out.append(tuple(p + s * (c - p) for p, c in zip(prev, cur)))
+                if d_cur >= 0:
+                    out.append(cur)
+                prev, d_prev = cur, d_cur
+            poly = out
+    return poly
+
+def _box_corners(lo, hi):
+    return np.array([(x, y, z) for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+
+def _unit(axes):
+    """Achsen normieren; entartete Achsen werden 0 und trennen nie."""
+    length = np.linalg.norm(axes, axis=-1, keepdims=True)
+    return np.where(length > EPS, axes / np.maximum(length, EPS), 0.0)
+
+def _separated(proj_a, proj_b):
+    """Trennt eine Achse die Projektionen (..., Achsen, Punkte)?"""
+    return ((proj_a.max(-1) < proj_b.min(-1) - EPS) | (proj_b.max(-1) < proj_a.min(-1) - EPS)).any(-1)
+
+# ----------------------------------------------------------------------
+# Sichtbarkeitsgitter für ein Licht
+# ----------------------------------------------------------------------
+class ShadowGrid:
+    def __init__(self, scene, light, resolution=32):
+        self.light = np.array(light.position, dtype=np.float64)
+        self.shapes = list(scene.shapes)
+        self.triangles = [s for s in self.shapes if isinstance(s, Triangle)]
+        self.spheres = [s for s in self.shapes if isinstance(s, Sphere)]
+        # andere Formen (z.B. TriangleMesh, Instance) nur über ihre Hüllbox
+        self.others = [s for s in self.shapes if not isinstance(s, (Triangle, Sphere))]
+        for shape in self.others:
+            if getattr(shape, 'bounds', None) is None:
+                raise TypeError(f"Keine Hülle für {type(shape).__name__}")
+
+        bounds = [self._bounds(s) for s in self.shapes]
+        self.lo = np.min([b[0] for b in bounds], axis=0) - 1e-3
+        hi = np.max([b[1] for b in bounds], axis=0) + 1e-3
+        self.cell = (hi - self.lo).max() / resolution
+        self.dims = np.maximum(np.ceil((hi - self.lo) / self.cell).astype(int), 1)
+
+        self.states = np.full(tuple(self.dims), EMPTY, dtype=np.int8)
+        self.candidates = {}
+        self.stats = {VISIBLE: 0, OCCLUDED: 0, BOUNDARY: 0, EMPTY: 0}
+        self._classify(self._surface_boxes())
+
+    @staticmethod
+    def _bounds(shape):
+        if isinstance(shape, Sphere):
+            return shape.center - shape.radius, shape.center + shape.radius
+        if isinstance(shape, Triangle):
+            v = np.array([shape.v0, shape.v1, shape.v2])
+            return v.min(axis=0), v.max(axis=0)
+        return np.asarray(shape.bounds[0]), np.asarray(shape.bounds[1])
+
+    def _cell_range(self, lo, hi):
+        i0 = np.clip(np.floor((lo - self.lo) / self.cell).astype(int), 0, self.dims - 1)
+        i1 = np.clip(np.floor((hi - self.lo) / self.cell).astype(int), 0, self.dims - 1)
+        return [(i, j, k) for i in range(i0[0], i1[0] + 1)
+                for j in range(i0[1], i1[1] + 1) for k in range(i0[2], i1[2] + 1)]
+
+    def _cell_box(self, index):
+        lo = self.lo + np.array(index) * self.cell
+        return lo, lo + self.cell
+
+    def _surface_boxes(self):
+        """Zelle -> Hüllbox (lo, hi) der Oberflächenstücke in dieser Zelle"""
+        boxes = {}
+
+        def extend(index, lo, hi):
+            if index in boxes:
+                old_lo, old_hi = boxes[index]
+                boxes[index] = (np.minimum(old_lo, lo), np.maximum(old_hi, hi))
+            else:
+                boxes[index] = (lo, hi)
+
+        for tri in self.triangles:
+            poly = [tuple(tri.v0), tuple(tri.v1), tuple(tri.v2)]
+            lo, hi = self._bounds(tri)
+            for index in self._cell_range(lo, hi):
+                c_lo, c_hi = self._cell_box(index)
+                piece = _clip_polygon(poly, c_lo, c_hi)
+                if piece:
+                    pts = np.array(piece)
+                    extend(index, pts.min(axis=0), pts.max(axis=0))
+
+        for sphere in self.spheres:
+            lo, hi = self._bounds(sphere)
+            for index in self._cell_range(lo, hi):
+                c_lo, c_hi = self._cell_box(index)
+                nearest = np.clip(sphere.center, c_lo, c_hi)
+                farthest = np.where(sphere.center - c_lo > c_hi - sphere.center, c_lo, c_hi)
+                # Oberfläche schneidet die Zelle
+                if np.linalg.norm(nearest - sphere.center) <= sphere.radius <= \
+                        np.linalg.norm(farthest - sphere.center):
+                    extend(index, np.maximum(c_lo, lo), np.minimum(c_hi, hi))
+
+        for shape in self.others:
+            lo, hi = self._bounds(shape)
+            for index in self._cell_range(lo, hi):
+                c_lo, c_hi = self._cell_box(index)
+                extend(index, np.maximum(c_lo, lo), np.minimum(c_hi, hi))
+        return boxes
+
+    def _classify(self, boxes):
+        L = self.light
+        tri_v = np.array([[t.v0, t.v1, t.v2] for t in self.triangles]).reshape(-1, 3, 3)
+        tri_n = np.array([t.normal for t in self.triangles]).reshape(-1, 3)
+        tri_d = np.einsum('tc,tc->t', tri_n, tri_v[:, 0])
+        tri_e = np.roll(tri_v, -1, axis=1) - tri_v                     # (T, 3, 3) Kanten
+        light_side = tri_n @ L - tri_d
+        sph_c = np.array([s.center for s in self.spheres]).reshape(-1, 3)
+        sph_r = np.array([s.radius for s in self.spheres])
+        box_axes = np.eye(3)
+        # Achsen aus Dreieck allein: Normale, Boxachsen, Kanten x Boxachsen
+        tri_axes_static = _unit(np.concatenate([
+            tri_n[:, None], np.broadcast_to(box_axes, (len(tri_n), 3, 3)),
+            np.cross(tri_e[:, :, None], box_axes[None, None]).reshape(-1, 9, 3)], axis=1))
+
+        for index, (s_lo, s_hi) in boxes.items():
+            lo, hi = s_lo - 2 * RAY_OFFSET, s_hi + 2 * RAY_OFFSET
+            corners = _box_corners(lo, hi)
+            hull = np.vstack([L[None], corners])                        # (9, 3)
+            shaft = corners - L                                         # (8, 3)
+
+            # Dreiecke: Ebene trennt Licht und Box nicht -> kann nicht verdecken
+            tight = _box_corners(s_lo, s_hi) @ tri_n.T - tri_d          # (8, T)
+            far = (-np.sign(light_side) * tight).max(axis=0)
+            blocking = (far > EPS) & (np.abs(light_side) > EPS)
+
+            tri_axes = np.concatenate([
+                tri_axes_static,
+                _unit(np.cross(tri_e[:, :, None], shaft[None, None]).reshape(-1, 24, 3))], axis=1)
+            sep = _separated(np.einsum('hc,tac->tah', hull, tri_axes),
+                             np.einsum('tvc,tac->tav', tri_v, tri_axes))
+            tri_candidates = np.nonzero(blocking & ~sep)[0]
+
+            # Kugeln: Boxachsen, Licht -> Mittelpunkt, Lote von den Schaftkanten
+            # und vom nächsten Boxpunkt auf den Mittelpunkt
+            w = sph_c - L
+            foot = (w @ shaft.T) / np.einsum('kc,kc->k', shaft, shaft)  # (S, 8)
+            perp = w[:, None] - foot[..., None] * shaft[None]
+            sph_axes = _unit(np.concatenate([
+                np.broadcast_to(box_axes, (len(sph_c), 3, 3)), w[:, None], perp,
+                (sph_c - np.clip(sph_c, lo, hi))[:, None]], axis=1))
+            proj = np.einsum('hc,sac->sah', hull, sph_axes)
+            center = np.einsum('sc,sac->sa', sph_c, sph_axes)
+            sph_sep = ((proj.max(-1) < center - sph_r[:, None] - EPS) |
+                       (proj.min(-1) > center + sph_r[:, None] + EPS)).any(-1)
+            sph_candidates = np.nonzero(~sph_sep)[0]
+
+            other_candidates = [s for s in self.others
+                                if not self._box_separated(hull, *self._bounds(s))]
+
+            if (any(self._triangle_occludes(i, lo, hi, corners) for i in tri_candidates) or
+                    any(self._sphere_occludes(i, lo, hi, corners) for i in sph_candidates)):
+                self.states[index] = OCCLUDED
+            elif len(tri_candidates) or len(sph_candidates) or other_candidates:
+                self.states[index] = BOUNDARY
+                self.candidates[index] = ([self.triangles[i] for i in tri_candidates] +
+                                          [self.spheres[i] for i in sph_candidates] + other_candidates)
+            else:
+                self.states[index] = VISIBLE
+
+    @staticmethod
+    def _box_separated(hull, lo, hi):
+        """Schaft gegen Hüllbox (nur Boxachsen: konservativ)"""
+        return bool((hull.max(axis=0) < lo - EPS).any() or (hull.min(axis=0) > hi + EPS).any())
+
+    def _triangle_occludes(self, i, lo, hi, corners):
+        """Schneidet Dreieck i die Strecken aller Zellecken zum Licht?"""
+        tri = self.triangles[i]
+        L = self.light
+        if abs(dot(tri.normal, L - tri.v0)) <= OCCLUDER_MARGIN:
+            return False
+        # Dreieck darf die (vergrößerte) Box nicht berühren
+        m_lo, m_hi = lo - OCCLUDER_MARGIN, hi + OCCLUDER_MARGIN
+        v = np.array([tri.v0, tri.v1, tri.v2])
+        e = np.roll(v, -1, axis=0) - v
+        axes = _unit(np.vstack([tri.normal, np.eye(3), np.cross(e[:, None], np.eye(3)[None]).reshape(9, 3)]))
+        if not _separated((_box_corners(m_lo, m_hi) @ axes.T).T, (v @ axes.T).T):
+            return False
+        # Möller-Trumbore für alle Ecken, Parameter s in (0, 1) entlang Ecke -> Licht
+        d = L - corners
+        h = np.cross(d, tri.edge2)
+        a = h @ tri.edge1
+        ok = np.abs(a) > EPS
+        f = 1.0 / np.where(ok, a, 1.0)
+        s = corners - tri.v0
+        u = f * np.einsum('kc,kc->k', s, h)
+        q = np.cross(s, tri.edge1)
+        w = f * np.einsum('kc,kc->k', d, q)
+        t = f * (q @ tri.edge2)
+        return bool(np.all(ok & (u > EPS) & (w > EPS) & (u + w < 1 - EPS) & (t > 0) & (t < 1)))
+
+    def _sphere_occludes(self, i, lo, hi, corners):
+        """Schneidet Kugel i die Strecken aller Zellecken zum Licht?"""
+        sphere = self.spheres[i]
+        c, r = sphere.center, sphere.radius
+        if np.linalg.norm(self.light - c) <= r + OCCLUDER_MARGIN:
+            return False
+        if np.linalg.norm(np.clip(c, lo, hi) - c) <= r + OCCLUDER_MARGIN:
+            return False
+        d = self.light - corners
+        s = np.clip(np.einsum('kc,kc->k', c - corners, d) / np.einsum('kc,kc->k', d, d), 0.0, 1.0)
+        dist = np.linalg.norm(corners + s[:, None] * d - c, axis=1)
+        return bool(np.all(dist < r - EPS))
+
+    def in_shadow(self, point, normal, light_dir, light_dist):
+        """Liefert dasselbe Ergebnis wie der Schattenstrahl in trace_ray."""
+        index = tuple(np.floor((point - self.lo) / self.cell).astype(int))
+        inside = all(0 <= i < n for i, n in zip(index, self.dims))
+        state = self.states[index] if inside else EMPTY
+        self.stats[state] += 1
+        if state == VISIBLE:
+            return False
+        if state == OCCLUDED:
+            return True
+        shapes = self.candidates[index] if state == BOUNDARY else self.shapes
+        shadow_ray = Ray(point + normal * RAY_OFFSET, light_dir)
+        for shape in shapes:
+            hit = shape.intersect(shadow_ray)
+            if hit is not None and hit[0] < light_dist - RAY_OFFSET:
+                return True
+        return False
+
+    def summary(self):
+        counts = np.bincount(self.states.ravel(), minlength=4)
+        return (f"{counts[VISIBLE]} sichtbar, {counts[OCCLUDED]} verdeckt, "
+                f"{counts[BOUNDARY]} Rand, {counts[EMPTY]} leer")
+
+class ShadowCache:
+    """Ein ShadowGrid pro Punktlicht der Szene"""
+    def __init__(self, scene, resolution=32):
+        self.grids = [ShadowGrid(scene, light, resolution) for light in scene.lights]
+
+    def rays_saved(self):
+        total = sum(sum(g.stats.values()) for g in self.grids)
+        saved = sum(g.stats[VISIBLE] + g.stats[OCCLUDED] for g in self.grids)
+        return saved, total
+
+# ----------------------------------------------------------------------
+# Raytracer mit Schattencache
+# ----------------------------------------------------------------------
+def trace_ray(ray, scene, depth, shadows, max_depth=3):
+    if depth > max_depth:
+        return np.zeros(3)
+
+    hit = scene.intersect(ray)
+    if hit is None:
+        return np.zeros(3)
+
+    shape, t, point, normal, material = hit
+    color = material.emission.copy()
+
+    for light, grid in zip(scene.lights, shadows.grids):
+        light_dir = light.position - point
+        light_dist = np.linalg.norm(light_dir)
+        light_dir = light_dir / light_dist
+
+        # ohne Beitrag ist auch kein Schattentest nötig
+        ndotl = max(0.0, dot(normal, light_dir))
+        if ndotl > 0 and not grid.in_shadow(point, normal, light_dir, light_dist):
+            color += material.diffuse * light.color * ndotl
+
+    if material.reflectivity > 0:
+        incident = -ray.direction
+        reflected_dir = reflect(incident, normal)
+        reflected_ray = Ray(point + normal * 1e-4, reflected_dir)
+        reflected_color = trace_ray(reflected_ray, scene, depth+1, shadows, max_depth)
+        color += material.reflectivity * reflected_color
+
+    return np.clip(color, 0, 1)
+
+def render(scene, camera, width, height, shadows=None):
+    if shadows is None:
+        shadows = ShadowCache(scene)
+    image = np.zeros((height, width, 3), dtype=np.float64)
+    for y in range(height):
+        for x in range(width):
+            ray = camera.get_ray(x, y, width, height)
+            image[y, x] = trace_ray(ray, scene, 0, shadows)
+    img = (image * 255).astype(np.uint8)
+    return Image.fromarray(img)
+
+# ----------------------------------------------------------------------
+# Hauptprogramm
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    resolution = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    scene = build_cornell_box()
+    camera = Camera(position=(0, 1, 8), look_at=(0, 1, -2), up=(0, 1, 0),
+                    viewport_height=0.5, viewport_distance=1.0)
+
+    start = time.perf_counter()
+    shadows = ShadowCache(scene, resolution)
+    build_time = time.perf_counter() - start
+    for grid in shadows.grids:
+        print(f"Gitter {tuple(int(d) for d in grid.dims)}: {grid.summary()} ({build_time:.2f} s)")
+
+    start = time.perf_counter()
+    img = render(scene, camera, width, width, shadows)
+    cached_time = time.perf_counter() - start
+    saved, total = shadows.rays_saved()
+    print(f"Mit Cache: {cached_time:.2f} s, {saved}/{total} Schattenstrahlen gespart")
+
+    start = time.perf_counter()
+    reference = render_exact(scene, camera, width, width)
+    exact_time = time.perf_counter() - start
+    same = np.array_equal(np.asarray(img), np.asarray(reference))
+    print(f"Ohne Cache: {exact_time:.2f} s, Bilder {'identisch' if same else 'verschieden'}")
+    img.save("cornellbox_shadowcache.png")